@@ -1,22 +1,103 @@
-import os, webbrowser
-from datetime import datetime
+import os, gc, io, re, sys, csv, gzip, json, time, sqlite3, bisect, hashlib, logging, threading, weakref, webbrowser
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 from threading import Timer
 from functools import wraps
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+import click
+from flask import (Flask, Blueprint, Response, render_template, stream_template, stream_with_context,
+                   request, redirect, url_for, flash, session, g, current_app, has_request_context)
 import mysql.connector
 
 # ─────────────────────────────────────────────────────────────────────────────
-# DB CONFIG  (same schema for all, different MySQL users)
+# CONFIG  → read from the environment by config_from_env(); create_app(config)
+# lays its overrides on top. Keys are app.config names, env vars are in SETTINGS.
 # ─────────────────────────────────────────────────────────────────────────────
-BASE_DB_CONFIG = {
-    "host": "localhost",
-    "database": "Disaster_relief2",
+def _flag(raw):
+    return raw == "1"
+
+SETTINGS = {        # app.config key -> (env var, type, default)
+    # MySQL server (same schema for all, different MySQL users)
+    "DB_HOST": ("DB_HOST", str, "localhost"),
+    "DB_PORT": ("DB_PORT", int, "3306"),
+    "DB_NAME": ("DB_NAME", str, "Disaster_relief2"),
+    # Fallback user (only used BEFORE login, e.g. to show login page safely)
+    "DB_ROOT_USER":     ("DB_ROOT_USER", str, "root"),
+    "DB_ROOT_PASSWORD": ("DB_ROOT_PASSWORD", str, "Geethika@2006"),
+    "SECRET_KEY":       ("FLASK_SECRET", str, "dev-secret"),
+    "RELIEF_ACCOUNTS":  ("RELIEF_ACCOUNTS", str, None),         # JSON file replacing LOGIN_ACCOUNTS
+
+    # Connection pool tuning (one pool per MySQL user)
+    "POOL_SIZE":      ("DB_POOL_SIZE", int, "8"),               # max open conns per user
+    "POOL_TIMEOUT":   ("DB_POOL_TIMEOUT", float, "10"),         # secs to wait for a free conn
+    "POOL_RECYCLE":   ("DB_POOL_RECYCLE", int, "1800"),         # reopen conns older than this
+    "POOL_PING_IDLE": ("DB_POOL_PING_IDLE", int, "30"),         # ping conns idle longer than this
+
+    # CRUD listing: rows per page, rows pulled per fetchmany() while streaming
+    "CRUD_PAGE_SIZE": ("CRUD_PAGE_SIZE", int, "100"),
+    "FETCH_BATCH":    ("DB_FETCH_BATCH", int, "500"),
+
+    # Bulk import: rows per executemany() transaction, per-row errors kept in the report
+    "IMPORT_BATCH":      ("IMPORT_BATCH", int, "1000"),
+    "IMPORT_MAX_ERRORS": ("IMPORT_MAX_ERRORS", int, "1000"),
+
+    # Instrumentation: statements slower than this (ms) go to the slow-query log
+    "SLOW_QUERY_MS":  ("SLOW_QUERY_MS", float, "200"),
+    "SLOW_QUERY_LOG": ("SLOW_QUERY_LOG", str, None),            # file path; unset → stderr
+    "METRICS_TOKEN":  ("METRICS_TOKEN", str, None),             # if set, /metrics needs "Bearer <token>"
+
+    # Low-stock watchlist: burn-rate window (days) and max rows returned
+    "LOW_STOCK_BURN_DAYS": ("LOW_STOCK_BURN_DAYS", int, "7"),
+    "LOW_STOCK_LIMIT":     ("LOW_STOCK_LIMIT", int, "500"),
+
+    # /queries report cache: max entries, seconds to live, biggest result worth keeping
+    "REPORT_CACHE_SIZE":     ("REPORT_CACHE_SIZE", int, "256"),
+    "REPORT_CACHE_TTL":      ("REPORT_CACHE_TTL", float, "300"),
+    "REPORT_CACHE_MAX_ROWS": ("REPORT_CACHE_MAX_ROWS", int, "5000"),
+
+    # JSON API: smallest body worth gzipping, max rows per table page
+    "API_GZIP_MIN":    ("API_GZIP_MIN", int, "1024"),
+    "API_MAX_PAGE":    ("API_MAX_PAGE", int, "1000"),
+
+    # Live aid feed (SSE): events kept for Last-Event-ID replay, heartbeat secs, max open streams,
+    # secs between each worker's polls of AidFeedEvent (while it has streams open)
+    "FEED_BACKLOG":     ("FEED_BACKLOG", int, "1000"),
+    "FEED_HEARTBEAT":   ("FEED_HEARTBEAT", float, "15"),
+    "FEED_MAX_CLIENTS": ("FEED_MAX_CLIENTS", int, "64"),        # per worker; gunicorn.conf.py adds threads for them
+    "FEED_POLL":        ("FEED_POLL", float, "1"),
+
+    # Write-behind intake for dbops distribute / assign_volunteer: SQLite journal path (unset → off),
+    # ops per drain batch, max retry backoff (s), drainer lease (s), days to keep applied ops
+    "INTAKE_JOURNAL":   ("INTAKE_JOURNAL", str, None),
+    "INTAKE_BATCH":     ("INTAKE_BATCH", int, "100"),
+    "INTAKE_RETRY_MAX": ("INTAKE_RETRY_MAX", float, "60"),
+    "INTAKE_LEASE":     ("INTAKE_LEASE", float, "30"),
+    "INTAKE_KEEP_DAYS": ("INTAKE_KEEP_DAYS", int, "7"),
+
+    # Victim search index: secs between polls of the VictimChanges log (writes from other workers),
+    # secs before a full rebuild when that log is missing (migration 0006 not applied), hours of log
+    # kept, most changed victims refetched in one poll (more → rebuild), max candidates scored per
+    # lookup, build on the first logged-in request instead of the first lookup, and an account name
+    # to build it with in the gunicorn master before forking (workers share it copy-on-write)
+    "VICTIM_INDEX_POLL":    ("VICTIM_INDEX_POLL", float, "5"),
+    "VICTIM_INDEX_TTL":     ("VICTIM_INDEX_TTL", float, "900"),
+    "VICTIM_CHANGES_KEEP":  ("VICTIM_CHANGES_KEEP_HOURS", float, "168"),
+    "VICTIM_CATCHUP_MAX":   ("VICTIM_CATCHUP_MAX", int, "50000"),
+    "VICTIM_SEARCH_SCAN":   ("VICTIM_SEARCH_SCAN", int, "2000"),
+    "VICTIM_INDEX_WARM":    ("VICTIM_INDEX_WARM", _flag, "0"),
+    "VICTIM_INDEX_PRELOAD": ("VICTIM_INDEX_PRELOAD", str, ""),
+
+    # Dashboard summary cache (shared across requests)
+    "DASHBOARD_TTL": ("DASHBOARD_TTL", float, "60"),            # secs before a full refresh
 }
 
 # UI login accounts → map to MySQL user + password + role
 #  - Username/password here are what you type in the LOGIN FORM
 #  - db_user/db_pass are the actual MySQL instances you created
+#  - RELIEF_ACCOUNTS (path to a JSON file with the same shape) replaces these in deployments
 LOGIN_ACCOUNTS = {
     "admin": {
         "password": "admin123",
@@ -38,10 +119,29 @@ LOGIN_ACCOUNTS = {
     },
 }
 
-# Fallback user (only used BEFORE login, e.g. to show login page safely)
-ROOT_FALLBACK = {"user": "root", "password": "Geethika@2006"}
+def load_accounts(path):
+    with open(path, encoding="utf-8") as fh:
+        accounts = json.load(fh)
+    for name, account in accounts.items():
+        missing = {"password", "role", "db_user", "db_pass"} - set(account)
+        if missing:
+            raise ValueError(f"{path}: account '{name}' is missing {', '.join(sorted(missing))}")
+    return accounts
 
-SECRET_KEY = os.environ.get("FLASK_SECRET", "dev-secret")
+def config_from_env(environ=None):
+    """SETTINGS read from `environ` (default os.environ); unset keys get their defaults."""
+    environ = os.environ if environ is None else environ
+    config = {}
+    for key, (var, cast, default) in SETTINGS.items():
+        raw = environ.get(var, default)
+        config[key] = None if raw is None else cast(raw)
+    return config
+
+DEFAULTS = config_from_env({})         # built-in values, for constructor defaults
+
+def cfg(key):
+    """A setting of the app handling this request / CLI command."""
+    return current_app.config[key]
 
 # Map tabs -> (table name, primary key, ordered columns)
 TABLES = {
@@ -63,14 +163,32 @@ TABLES = {
         ["VolunteerID","VictimID","ResourceID","DistDate","Qty"]),
 }
 
+# Columns the CRUD pages may filter on: each leads a PK, UNIQUE, FK or
+# migration index that continues in PK order, so an equality filter seeks and
+# reads the page off the index with no sort (DistDate: migrations/0007).
+CRUD_FILTERS = {
+    "Disaster":        ("DisasterID",),
+    "ReliefCamp":      ("CampID", "District", "DisasterID"),
+    "Volunteer":       ("VolunteerID", "Phone"),
+    "Victim":          ("VictimID", "CampID"),
+    "Resource":        ("ResourceID",),
+    "Stocked_At":      ("CampID", "ResourceID"),
+    "AssignedTo":      ("CampID", "VolunteerID"),
+    "AidDistribution": ("VolunteerID", "VictimID", "ResourceID", "DistDate"),
+}
+
 # ─────────────────────────────────────────────────────────────────────────────
-# App setup
+# App setup  → every route, hook and CLI command hangs off this blueprint;
+# create_app() (bottom of the file) builds the app, its pools, caches and hubs.
 # ─────────────────────────────────────────────────────────────────────────────
-app = Flask(__name__)
-app.config["SECRET_KEY"] = SECRET_KEY
+bp = Blueprint("relief", __name__, cli_group=None)
+
+def state():
+    """The ReliefState (pools, caches, hubs) of the current app."""
+    return current_app.extensions["relief"]
 
 # Navbar / layout helper
-@app.context_processor
+@bp.app_context_processor
 def inject_nav():
     role = session.get("role")
     can_crud = (role == "Admin")
@@ -80,61 +198,554 @@ def inject_nav():
         "can_crud": can_crud,
         "tabs": tabs,
         "db_user": session.get("db_user"),
+        "intake_enabled": state().intake is not None,
     }
 
 # ─────────────────────────────────────────────────────────────────────────────
-# DB helpers
+# Instrumentation  → per-request DB stats (g.db_stats), slow-query log, /metrics
+#   Metrics live in this process; with several workers each one is scraped on its own.
 # ─────────────────────────────────────────────────────────────────────────────
-def _conn_creds():
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STORED_FUNCTIONS = ("camp_occupancy_for", "CountVictimsInCamp")
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}           # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            base = ",".join(f'{k}="{_label_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if base else ""
+            for upper, n in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{upper}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return "\n".join(lines)
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, n, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + n
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, n in items:
+            base = ",".join(f'{k}="{_label_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{base}}} {n}")
+        return "\n".join(lines)
+
+def _label_escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+METRICS = {
+    "route":   Histogram("relief_http_request_seconds", "Request latency by route.",
+                         ("endpoint", "method", "status")),
+    "route_db": Histogram("relief_http_request_db_seconds", "DB time spent per request, by route.",
+                          ("endpoint",)),
+    "stmt":    Histogram("relief_db_statement_seconds", "DB statement latency by kind and normalized SQL.",
+                         ("kind", "stmt")),
+    "acquire": Histogram("relief_db_conn_acquire_seconds", "Time to check a connection out of the pool.",
+                         ("db_user",)),
+    "rows":    Counter("relief_db_rows_total", "Rows returned or affected, by statement kind.", ("kind",)),
+    "errors":  Counter("relief_db_errors_total", "Failed DB statements, by statement kind.", ("kind",)),
+    "slow":    Counter("relief_db_slow_statements_total", "Statements over SLOW_QUERY_MS.", ("kind",)),
+}
+
+slow_log = logging.getLogger("relief.slow_query")
+
+def _log_slow_queries_to(path):
+    """Send the slow-query log to `path` too (SLOW_QUERY_LOG); once per path, however many apps."""
+    path = os.path.abspath(path)
+    if any(getattr(h, "baseFilename", None) == path for h in slow_log.handlers):
+        return
+    handler = logging.FileHandler(path, delay=True)      # opened on first write, per worker
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_log.addHandler(handler)
+    slow_log.setLevel(logging.INFO)
+
+_SQL_LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\b\d+(?:\.\d+)?\b|%s")
+_SQL_LISTS    = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals / placeholders with ? so similar statements group."""
+    s = " ".join(sql.split()).rstrip(";")
+    s = _SQL_LITERALS.sub("?", s)
+    return _SQL_LISTS.sub("(?, ...)", s)
+
+def _statement_label(kind, sql):
+    if kind == "query":
+        m = re.match(r"\s*SELECT\s+(\w+)\s*\(", sql, re.I)
+        if m and m.group(1) in STORED_FUNCTIONS:
+            return "function", m.group(1)
+    return kind, normalize_sql(sql)[:200]
+
+def _request_stats():
+    if not g:
+        return None
+    stats = g.get("db_stats")
+    if stats is None:
+        stats = g.db_stats = {"queries": 0, "db_time": 0.0, "rows": 0, "conn_wait": 0.0}
+    return stats
+
+def record_statement(kind, sql, seconds, rows=0, error=None):
+    kind, label = _statement_label(kind, sql)
+    METRICS["stmt"].observe(seconds, kind, label)
+    METRICS["rows"].inc(max(rows or 0, 0), kind)
+    if error is not None:
+        METRICS["errors"].inc(1, kind)
+    stats = _request_stats()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_time"] += seconds
+        stats["rows"] += max(rows or 0, 0)
+    ms = seconds * 1000
+    if ms >= cfg("SLOW_QUERY_MS"):
+        METRICS["slow"].inc(1, kind)
+        route = request.endpoint if has_request_context() else "-"
+        slow_log.warning("slow %s %.1fms rows=%s route=%s %s%s", kind, ms, rows, route, label,
+                         f" error={error}" if error is not None else "")
+
+@contextmanager
+def track_statement(kind, sql):
     """
-    Use the MySQL user stored in the session.
-    Before login, fall back to root.
+    Time one DB call. The body may set rec["rows"]; failures are counted and re-raised.
     """
-    user = session.get("db_user", ROOT_FALLBACK["user"])
-    password = session.get("db_pass", ROOT_FALLBACK["password"])
+    rec = {"rows": 0}
+    started = time.perf_counter()
+    try:
+        yield rec
+    except Exception as e:
+        record_statement(kind, sql, time.perf_counter() - started, rec["rows"], error=e)
+        raise
+    record_statement(kind, sql, time.perf_counter() - started, rec["rows"])
+
+@bp.before_app_request
+def _start_timer():
+    g._t0 = time.perf_counter()
+
+@bp.after_app_request
+def _db_headers(resp):
+    g._status = resp.status_code
+    stats = g.get("db_stats")
+    if stats:
+        resp.headers["X-DB-Queries"] = str(stats["queries"])
+        resp.headers["Server-Timing"] = (f'db;dur={stats["db_time"] * 1000:.1f}, '
+                                         f'conn;dur={stats["conn_wait"] * 1000:.1f}')
+    return resp
+
+@bp.teardown_app_request
+def _observe_request(exc):
+    # Runs after a streamed body has finished, so streamed routes are timed end to end.
+    t0 = g.get("_t0")
+    if t0 is None:
+        return
+    endpoint = request.endpoint or "unknown"
+    status = 500 if exc is not None else g.get("_status", 200)
+    METRICS["route"].observe(time.perf_counter() - t0, endpoint, request.method, str(status))
+    stats = g.get("db_stats")
+    if stats:
+        METRICS["route_db"].observe(stats["db_time"], endpoint)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DB helpers
+# ─────────────────────────────────────────────────────────────────────────────
+def _db_creds(user, password):
     return {
-        "host": BASE_DB_CONFIG["host"],
-        "database": BASE_DB_CONFIG["database"],
+        "host": cfg("DB_HOST"),
+        "port": cfg("DB_PORT"),
+        "database": cfg("DB_NAME"),
         "user": user,
         "password": password,
     }
 
+def _conn_creds():
+    """
+    Use the MySQL user stored in the session.
+    Before login, fall back to root.
+    CLI commands (no request) use the account picked by use_cli_account().
+    """
+    if g and "db_creds" in g:
+        return g.db_creds
+    if not has_request_context():
+        return _db_creds(cfg("DB_ROOT_USER"), cfg("DB_ROOT_PASSWORD"))
+    user = session.get("db_user", cfg("DB_ROOT_USER"))
+    password = session.get("db_pass", cfg("DB_ROOT_PASSWORD"))
+    return _db_creds(user, password)
+
+class PoolExhausted(mysql.connector.Error):
+    pass
+
+class _PooledConn:
+    __slots__ = ("pool", "conn", "born", "used")
+
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+        self.born = self.used = time.monotonic()
+
+class ConnectionPool:
+    """
+    Bounded pool of connections for ONE MySQL user.
+    Idle conns are pinged on checkout and closed once older than `recycle` secs.
+    """
+    def __init__(self, creds, size=DEFAULTS["POOL_SIZE"], timeout=DEFAULTS["POOL_TIMEOUT"],
+                 recycle=DEFAULTS["POOL_RECYCLE"], ping_idle=DEFAULTS["POOL_PING_IDLE"]):
+        self.creds = dict(creds)
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+        self._idle = []                                  # LIFO → warmest conn first
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolExhausted(msg=f"No free DB connection for '{self.creds['user']}' "
+                                    f"after {self.timeout}s (pool size {self.size})")
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    return _PooledConn(self, mysql.connector.connect(**self.creds))
+                now = time.monotonic()
+                if now - item.born > self.recycle:
+                    self._close(item)
+                    continue
+                if now - item.used > self.ping_idle and not self._alive(item):
+                    self._close(item)
+                    continue
+                return item
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, item, discard=False):
+        try:
+            if not discard:
+                try:
+                    item.conn.rollback()                 # end any open read snapshot
+                except mysql.connector.Error:
+                    discard = True
+            if discard:
+                self._close(item)
+            else:
+                item.used = time.monotonic()
+                with self._lock:
+                    self._idle.append(item)
+        finally:
+            self._slots.release()
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for item in idle:
+            self._close(item)
+
+    @staticmethod
+    def _alive(item):
+        try:
+            return item.conn.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(item):
+        try:
+            item.conn.close()
+        except Exception:
+            pass
+
+class PoolRegistry:
+    """One app's pools: db_user -> ConnectionPool, all sized from the same settings."""
+    def __init__(self, **settings):
+        self.settings = settings                         # ConnectionPool keyword args
+        self.pools = {}
+        self._lock = threading.Lock()
+        _REGISTRIES.add(self)
+
+    def get(self, creds):
+        with self._lock:
+            pool = self.pools.get(creds["user"])
+            if pool is None or pool.creds != creds:
+                if pool is not None:
+                    pool.close_idle()                    # creds changed → drop old conns
+                pool = self.pools[creds["user"]] = ConnectionPool(creds, **self.settings)
+            return pool
+
+    def pop(self, user):
+        with self._lock:
+            return self.pools.pop(user, None)
+
+    def items(self):
+        with self._lock:
+            return sorted(self.pools.items())
+
+    def _forget(self):
+        self._lock = threading.Lock()
+        _INHERITED_POOLS.extend(self.pools.values())
+        self.pools = {}
+
+def _pool_for(creds):
+    return state().pools.get(creds)
+
+def _forget_pools_after_fork():
+    """
+    A forked worker must not reuse (or close) the parent's sockets, so it starts with no pools.
+    The inherited connection objects stay referenced so they never send COM_QUIT from here.
+    """
+    for registry in list(_REGISTRIES):
+        registry._forget()
+
+_REGISTRIES = weakref.WeakSet()
+_INHERITED_POOLS = []
+if hasattr(os, "register_at_fork"):              # not on Windows (waitress is threads only anyway)
+    os.register_at_fork(after_in_child=_forget_pools_after_fork)
+
+def use_cli_account(username):
+    """
+    Point this app context's DB helpers at a LOGIN_ACCOUNTS entry (for flask CLI commands).
+    """
+    account = cfg("LOGIN_ACCOUNTS").get(username)
+    if account is None:
+        raise click.BadParameter(f"no such account: {username}", param_hint="--account")
+    g.db_creds = _db_creds(account["db_user"], account["db_pass"])
+
 def get_conn():
-    return mysql.connector.connect(**_conn_creds())
+    """
+    One pooled connection per request, shared by every helper below.
+    It goes back to the pool in _release_conn() at teardown.
+    """
+    item = g.get("_db_conn")
+    if item is None:
+        creds = _conn_creds()
+        started = time.perf_counter()
+        item = _pool_for(creds).acquire()
+        waited = time.perf_counter() - started
+        METRICS["acquire"].observe(waited, creds["user"])
+        _request_stats()["conn_wait"] += waited
+        g._db_conn = item
+    return item.conn
+
+def _release_conn(exc):          # teardown_appcontext, registered by create_app()
+    item = g.pop("_db_conn", None)
+    if item is not None:
+        item.pool.release(item, discard=exc is not None)
 
 def query_dicts(sql, params=None):
     conn = get_conn()
     cur = conn.cursor(dictionary=True)
-    cur.execute(sql, params or ())
-    rows = cur.fetchall()
-    cur.close(); conn.close()
-    return rows
+    try:
+        with track_statement("query", sql) as rec:
+            cur.execute(sql, params or ())
+            rows = cur.fetchall()
+            rec["rows"] = len(rows)
+        return rows
+    finally:
+        cur.close()
 
 def execute(sql, params=None):
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute(sql, params or ())
-    conn.commit()
-    cur.close(); conn.close()
+    try:
+        with track_statement("execute", sql) as rec:
+            cur.execute(sql, params or ())
+            conn.commit()
+            rec["rows"] = cur.rowcount
+        return cur.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def iter_dicts(sql, params=None, batch=None):
+    """
+    Like query_dicts() but streams rows from an unbuffered (server-side) cursor,
+    pulling `batch` rows (default FETCH_BATCH) at a time instead of materialising the whole result.
+    """
+    batch = batch or cfg("FETCH_BATCH")
+    conn = get_conn()
+    cur = conn.cursor(dictionary=True)
+    # Only time spent inside execute/fetchmany counts; the consumer's time between batches doesn't.
+    spent, n, error = 0.0, 0, None
+    try:
+        t = time.perf_counter()
+        try:
+            cur.execute(sql, params or ())
+            while True:
+                rows = cur.fetchmany(batch)
+                spent += time.perf_counter() - t
+                if not rows:
+                    break
+                n += len(rows)
+                yield from rows
+                t = time.perf_counter()
+        except mysql.connector.Error as e:
+            spent += time.perf_counter() - t
+            error = e
+            raise
+    finally:
+        record_statement("stream", sql, spent, n, error=error)
+        if conn.unread_result:          # consumer stopped early → drain before reuse
+            try:
+                cur.fetchall()
+            except mysql.connector.Error:
+                pass
+        cur.close()
 
 def scalar(sql, params=None):
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute(sql, params or ())
-    row = cur.fetchone()
-    cur.close(); conn.close()
+    try:
+        with track_statement("query", sql) as rec:
+            cur.execute(sql, params or ())
+            row = cur.fetchone()
+            rec["rows"] = 0 if row is None else 1
+    finally:
+        cur.close()
     return None if row is None else row[0]
 
 def call_proc(name, params=None):
     conn = get_conn()
     cur = conn.cursor()
-    cur.callproc(name, params or ())
-    out = []
-    for r in cur.stored_results():
-        out.extend(r.fetchall())
-    conn.commit()
-    cur.close(); conn.close()
-    return out
+    try:
+        with track_statement("procedure", f"CALL {name}") as rec:
+            cur.callproc(name, params or ())
+            out = []
+            for r in cur.stored_results():
+                out.extend(r.fetchall())
+            conn.commit()
+            rec["rows"] = len(out)
+        return out
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Write notifications
+#   crud_list / dbops call note_write() after every successful write so that
+#   caches built on top of the DB can stay exact without re-querying.
+#   Each app's listeners are in ReliefState.write_listeners (see create_app()).
+# ─────────────────────────────────────────────────────────────────────────────
+def note_write(table, delta=None):
+    """
+    table: base table that changed
+    delta: net change in its row count (0 when rows were only updated), or None if unknown
+    """
+    for fn in state().write_listeners:
+        fn(table, delta)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dashboard summary (cached)
+# ─────────────────────────────────────────────────────────────────────────────
+DASHBOARD_COUNTS = {            # stat key -> counted table
+    "camps":      "ReliefCamp",
+    "volunteers": "Volunteer",
+    "victims":    "Victim",
+    "aid_rows":   "AidDistribution",
+}
+RECENT_AID_TABLES = {"AidDistribution", "Volunteer", "Victim", "Resource"}
+
+# Statements DashboardSummary runs (explain-check EXPLAINs these same strings)
+DASHBOARD_STATS_SQL = "SELECT " + ",\n       ".join(
+    f"(SELECT COUNT(*) FROM {table}) AS {key}" for key, table in DASHBOARD_COUNTS.items())
+RECENT_AID_SQL = """
+    SELECT a.DistDate AS Date, vol.Name AS Volunteer, vic.Name AS Victim,
+           r.ItemName AS Resource, a.Qty, vic.CampID
+    FROM AidDistribution a
+    JOIN Volunteer vol ON vol.VolunteerID = a.VolunteerID
+    JOIN Victim    vic ON vic.VictimID    = a.VictimID
+    JOIN Resource  r   ON r.ResourceID    = a.ResourceID
+    ORDER BY a.DistDate DESC, a.VictimID ASC
+    LIMIT 10
+"""
+
+class DashboardSummary:
+    """
+    Per-app TTL cache for the dashboard, shared across requests.
+    All four counters come from one SELECT; writes adjust them in place.
+    """
+    def __init__(self, ttl=DEFAULTS["DASHBOARD_TTL"]):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = None
+        self._stats_at = 0.0
+        self._recent = None
+        self._recent_at = 0.0
+        self._gen = 0           # bumped on every write → drops refreshes that raced with it
+
+    def stats(self):
+        with self._lock:
+            if self._stats is not None and time.monotonic() - self._stats_at < self.ttl:
+                return dict(self._stats)
+            gen = self._gen
+        stats = query_dicts(DASHBOARD_STATS_SQL)[0]
+        with self._lock:
+            if gen == self._gen:
+                self._stats, self._stats_at = dict(stats), time.monotonic()
+        return stats
+
+    def recent_aid(self):
+        with self._lock:
+            if self._recent is not None and time.monotonic() - self._recent_at < self.ttl:
+                return list(self._recent)
+            gen = self._gen
+        rows = query_dicts(RECENT_AID_SQL)
+        with self._lock:
+            if gen == self._gen:
+                self._recent, self._recent_at = list(rows), time.monotonic()
+        return rows
+
+    def note_write(self, table, delta=None):
+        with self._lock:
+            self._gen += 1
+            for key, counted in DASHBOARD_COUNTS.items():
+                if counted != table or self._stats is None:
+                    continue
+                if delta is None:
+                    self._stats = None
+                else:
+                    self._stats[key] += delta
+            if table in RECENT_AID_TABLES:
+                self._recent = None
+
+    def invalidate(self):
+        with self._lock:
+            self._gen += 1
+            self._stats = self._recent = None
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Auth helpers
@@ -148,14 +759,14 @@ def login_required(role=None, any_of:tuple|list|None=None):
         def inner(*args, **kwargs):
             if "db_user" not in session:
                 flash("Please log in first.", "warning")
-                return redirect(url_for("login"))
+                return redirect(url_for("relief.login"))
             current = session.get("role")
             if role and current != role:
                 flash("Unauthorized access!", "danger")
-                return redirect(url_for("index"))
+                return redirect(url_for("relief.index"))
             if any_of and current not in any_of:
                 flash("Unauthorized access!", "danger")
-                return redirect(url_for("index"))
+                return redirect(url_for("relief.index"))
             return fn(*args, **kwargs)
         return inner
     return wrapper
@@ -163,28 +774,24 @@ def login_required(role=None, any_of:tuple|list|None=None):
 # ─────────────────────────────────────────────────────────────────────────────
 # Login / Logout  → uses REAL MySQL users via mapping
 # ─────────────────────────────────────────────────────────────────────────────
-@app.route("/login", methods=["GET", "POST"])
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = (request.form.get("username") or "").strip()
         password = request.form.get("password") or ""
 
-        account = LOGIN_ACCOUNTS.get(username)
+        account = cfg("LOGIN_ACCOUNTS").get(username)
         if not account or password != account["password"]:
             flash("Invalid username or password!", "danger")
             return render_template("login.html")
 
         # Double-check that this mapped MySQL user actually works
+        # (checks out a conn from that user's pool, so it is warm for the next request)
         db_user = account["db_user"]
         db_pass = account["db_pass"]
         try:
-            test_conn = mysql.connector.connect(
-                host=BASE_DB_CONFIG["host"],
-                database=BASE_DB_CONFIG["database"],
-                user=db_user,
-                password=db_pass,
-            )
-            test_conn.close()
+            pool = _pool_for(_db_creds(db_user, db_pass))
+            pool.release(pool.acquire())
         except mysql.connector.Error as e:
             flash(f"MySQL login failed for '{db_user}': {e}", "danger")
             return render_template("login.html")
@@ -200,49 +807,353 @@ def login():
             f"Connected as MySQL user: {db_user}",
             "success",
         )
-        return redirect(url_for("index"))
+        return redirect(url_for("relief.index"))
 
     return render_template("login.html")
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     session.clear()
     flash("Logged out successfully.", "info")
-    return redirect(url_for("login"))
+    return redirect(url_for("relief.login"))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Home dashboard
 # ─────────────────────────────────────────────────────────────────────────────
-@app.get("/")
+@bp.get("/")
 @login_required()
 def index():
-    stats = {
-        "camps":      scalar("SELECT COUNT(*) FROM ReliefCamp"),
-        "volunteers": scalar("SELECT COUNT(*) FROM Volunteer"),
-        "victims":    scalar("SELECT COUNT(*) FROM Victim"),
-        "aid_rows":   scalar("SELECT COUNT(*) FROM AidDistribution"),
-    }
-    recent_aid = query_dicts("""
-        SELECT a.DistDate AS Date, vol.Name AS Volunteer, vic.Name AS Victim,
-               r.ItemName AS Resource, a.Qty, vic.CampID
-        FROM AidDistribution a
-        JOIN Volunteer vol ON vol.VolunteerID = a.VolunteerID
-        JOIN Victim    vic ON vic.VictimID    = a.VictimID
-        JOIN Resource  r   ON r.ResourceID    = a.ResourceID
-        ORDER BY a.DistDate DESC, a.VictimID ASC
-        LIMIT 10
-    """)
+    stats = state().dashboard.stats()
+    recent_aid = state().dashboard.recent_aid()
     return render_template("index.html", stats=stats, recent_aid=recent_aid)
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Live aid feed (server-sent events)
+# Each aid write is published once, as a row in AidFeedEvent (migrations/0010).
+# One poller thread per worker reads new rows back in EventID order and fans
+# them out to that worker's open streams from memory, so every worker streams
+# every worker's events under the same IDs and screens cost nothing per refresh.
+# ─────────────────────────────────────────────────────────────────────────────
+FEED_EPOCH_SQL = "SELECT Epoch FROM AidFeedEpoch LIMIT 1"
+FEED_TAIL_SQL = "SELECT EventID, Event, Data FROM AidFeedEvent ORDER BY EventID DESC LIMIT %s"
+FEED_POLL_SQL = """
+    SELECT EventID, Event, Data, CreatedAt < NOW(6) - INTERVAL %s SECOND AS Settled
+    FROM AidFeedEvent
+    WHERE EventID > %s
+    ORDER BY EventID
+    LIMIT %s
+"""
+FEED_INSERT_SQL = "INSERT INTO AidFeedEvent (Event, Data) VALUES (%s, %s)"
+
+class AidFeed:
+    """
+    Fan-out hub with a bounded backlog for Last-Event-ID replay.
+    Event IDs are "<epoch>-<seq>". With AidFeedEvent, seq is its EventID and
+    epoch the AidFeedEpoch token, both shared by every worker. Without it
+    (migration 0010 not applied) the hub falls back to this process's own
+    events, numbered from 1 under a random per-process epoch. Either way an ID
+    from another epoch can't be continued here and gets a resync.
+    """
+    SETTLE = 2                          # secs a lower EventID may still commit after a higher one
+    POLL_LIMIT = 500
+
+    def __init__(self, app, backlog=DEFAULTS["FEED_BACKLOG"], max_clients=DEFAULTS["FEED_MAX_CLIENTS"],
+                 poll=DEFAULTS["FEED_POLL"]):
+        self.app = app
+        self.poll = poll
+        self.max_clients = max_clients
+        self.shared = None              # True: AidFeedEvent; False: in-process; None: not known yet
+        self._events = deque(maxlen=backlog)     # (seq, event id, event, json data)
+        self._shared_epoch = None
+        self._reset()
+        _FEEDS.add(self)
+
+    def _reset(self):
+        """Fresh process-local state: at start, and in a forked worker (threads and streams don't survive fork)."""
+        self._cond = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._local_epoch = os.urandom(4).hex()
+        self._events.clear()
+        self._seq = 0
+        self._polling = False
+        self.clients = 0
+
+    @property
+    def epoch(self):
+        return self._shared_epoch if self.shared else self._local_epoch
+
+    def _append(self, seq, event, data):
+        self._events.append((seq, f"{self.epoch}-{seq}", event, data))
+        self._seq = seq
+
+    def publish(self, event, data):
+        """Call after the write is committed; the event goes out on its own transaction."""
+        data = json.dumps(data, default=json_default)
+        if self.shared is not False:
+            try:
+                execute(FEED_INSERT_SQL, (event, data))
+                self.shared = True
+                return                  # the pollers deliver it, this worker's included
+            except mysql.connector.Error as e:
+                if e.errno != 1146:
+                    logging.getLogger("relief").warning("aid feed event not published: %s", e)
+                    return
+                self._local_only()
+        with self._cond:
+            self._append(self._seq + 1, event, data)
+            self._cond.notify_all()
+
+    def _local_only(self):
+        if self.shared is not False:
+            logging.getLogger("relief").warning("AidFeedEvent is missing (migration 0010); "
+                                                "the aid feed only carries this worker's events")
+        with self._cond:
+            self.shared = False
+            self._events.clear()
+            self._seq = 0
+
+    def ensure(self, creds):
+        """
+        Make sure the poller runs (call after join(), in the request). A
+        starting poller first loads the last events from the table, so a
+        client coming over from another worker can be replayed here.
+        """
+        with self._start_lock:
+            with self._cond:
+                if self.shared is False or self._polling:
+                    return
+            try:
+                epoch = query_dicts(FEED_EPOCH_SQL)[0]["Epoch"]
+                tail = query_dicts(FEED_TAIL_SQL, (self._events.maxlen,))
+            except mysql.connector.Error as e:
+                if e.errno != 1146:
+                    raise
+                self._local_only()
+                return
+            with self._cond:
+                self.shared, self._shared_epoch = True, epoch
+                self._events.clear()
+                self._seq = 0
+                for r in reversed(tail):
+                    self._append(r["EventID"], r["Event"], r["Data"])
+                self._polling = True
+            threading.Thread(target=self._run, args=(dict(creds),), name="aid-feed", daemon=True).start()
+
+    def _run(self, creds):
+        """Poll AidFeedEvent while this worker has streams open."""
+        while True:
+            with self._cond:
+                if self.clients == 0:
+                    self._polling = False
+                    return
+                after = self._seq
+            try:
+                with self.app.app_context():
+                    g.db_creds = creds
+                    rows = query_dicts(FEED_POLL_SQL, (self.SETTLE, after, self.POLL_LIMIT))
+                self._deliver(after, rows)
+            except Exception:
+                logging.getLogger("relief").exception("aid feed poll failed")
+            time.sleep(self.poll)
+
+    def _deliver(self, after, rows):
+        with self._cond:
+            for r in rows:
+                if r["EventID"] != after + 1 and not r["Settled"]:
+                    break               # a lower ID may still commit; wait for it
+                self._append(r["EventID"], r["Event"], r["Data"])
+                after = r["EventID"]
+            self._cond.notify_all()
+
+    def _since(self, seq):
+        return [e for e in self._events if e[0] > seq]
+
+    def replay(self, last_event_id):
+        """
+        (events after last_event_id, resync, seq to stream from). resync means the
+        ID can't be continued here: it is from another epoch, older than the
+        backlog or newer than anything published, so the client must refetch.
+        """
+        with self._cond:
+            head = self._seq
+            if last_event_id is None:
+                return [], False, head
+            epoch, _, seq = last_event_id.rpartition("-")
+            if epoch != self.epoch or not seq.isdigit():
+                return [], True, head
+            seq = int(seq)
+            oldest = self._events[0][0] if self._events else head + 1
+            if seq < oldest - 1 or seq > head:
+                return [], True, head
+            return self._since(seq), False, seq
+
+    def event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def join(self):
+        """Take a client slot; False when all max_clients are in use."""
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def leave(self):
+        with self._cond:
+            self.clients -= 1
+
+    def wait(self, seq, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq, timeout)
+            return self._since(seq)
+
+def _reset_feeds_after_fork():
+    for feed in list(_FEEDS):
+        feed._reset()
+
+_FEEDS = weakref.WeakSet()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_feeds_after_fork)
+
+AID_FEED_ROW = """
+    SELECT a.DistDate AS Date, vol.Name AS Volunteer, vic.Name AS Victim,
+           r.ItemName AS Resource, a.Qty, vic.CampID
+    FROM AidDistribution a
+    JOIN Volunteer vol ON vol.VolunteerID = a.VolunteerID
+    JOIN Victim    vic ON vic.VictimID    = a.VictimID
+    JOIN Resource  r   ON r.ResourceID    = a.ResourceID
+    WHERE a.VolunteerID = %s AND a.VictimID = %s AND a.ResourceID = %s
+      AND a.DistDate = COALESCE(%s, CURDATE())
+"""
+
+def publish_aid(volunteer_id, victim_id, resource_id, dist_date, source):
+    """Publish one new aid row, shaped like a dashboard "Recent Aid" row (one PK lookup)."""
+    ids = {"VolunteerID": volunteer_id, "VictimID": victim_id, "ResourceID": resource_id}
+    try:
+        rows = query_dicts(AID_FEED_ROW, (volunteer_id, victim_id, resource_id, dist_date or None))
+    except mysql.connector.Error:
+        rows = []                                # the write stands; send what we know
+    state().aid_feed.publish("aid", {**ids, **(rows[0] if rows else {"Date": dist_date}), "source": source})
+
+def _sse(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+def _feed_stream(feed, heartbeat, seq, backlog, resync):
+    """Runs after the request's app context is gone, so it is handed the hub it reads."""
+    yield "retry: 3000\n\n"
+    if resync:
+        yield _sse(feed.event_id(seq), "resync", "{}")
+    for seq, event_id, event, data in backlog:
+        yield _sse(event_id, event, data)
+    while True:
+        events = feed.wait(seq, heartbeat)
+        if not events:
+            yield ": keepalive\n\n"
+        for seq, event_id, event, data in events:
+            yield _sse(event_id, event, data)
+
+@bp.get("/feed/aid")
+@login_required(any_of=("Admin", "Operator", "Viewer"))
+def aid_feed_stream():
+    """
+    text/event-stream of "aid", "batch" and "delete" events (plus "resync" when a
+    replay gap means the client should refetch /api/v1/aid/recent).
+    Holds a server thread per client (at most FEED_MAX_CLIENTS); its DB connection
+    goes back to the pool before the stream starts.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id") or None
+    feed = state().aid_feed
+    if not feed.join():
+        return Response("too many feed clients\n", status=503, headers={"Retry-After": "30"})
+    try:
+        feed.ensure(_conn_creds())
+    except Exception:
+        feed.leave()
+        raise
+    backlog, resync, seq = feed.replay(last_event_id)
+    resp = Response(_feed_stream(feed, cfg("FEED_HEARTBEAT"), seq, backlog, resync),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    resp.call_on_close(feed.leave)               # runs even if the stream never started
+    return resp
+
+@bp.cli.command("aid-feed-prune")
+@click.option("--keep-hours", default=24.0, show_default=True, type=float)
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def aid_feed_prune_cmd(keep_hours, account):
+    """Delete AidFeedEvent rows older than --keep-hours (run it from cron)."""
+    use_cli_account(account)
+    total = 0
+    while True:
+        n = execute("DELETE FROM AidFeedEvent WHERE CreatedAt < NOW(6) - INTERVAL %s SECOND "
+                    "ORDER BY EventID LIMIT 10000", (int(keep_hours * 3600),))
+        total += n
+        if n < 10000:
+            break
+    click.echo(f"{total} event(s) deleted")
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CRUD (Admin only)
 # ─────────────────────────────────────────────────────────────────────────────
-@app.route("/crud/<string:tab>", methods=["GET", "POST"])
+def pk_cols(pk):
+    return pk if isinstance(pk, tuple) else (pk,)
+
+def keyset_after(keys, values):
+    """
+    WHERE fragment for "row key > values" in (k1, k2, ...) order, spelled out as
+    k1 > v1 OR (k1 = v1 AND k2 > v2) OR ... so MySQL can range-scan the PK.
+    """
+    ors, params = [], []
+    for i, k in enumerate(keys):
+        terms = [f"{prev}=%s" for prev in keys[:i]] + [f"{k}>%s"]
+        ors.append("(" + " AND ".join(terms) + ")")
+        params.extend(values[:i + 1])
+    return "(" + " OR ".join(ors) + ")", params
+
+class KeysetPage:
+    """
+    One page of a table in PK order, streamed from the DB.
+    Iterate it once; after that, next_key holds the key to seek from (or None).
+    """
+    def __init__(self, table, pk, cols, filters=None, after=None, size=DEFAULTS["CRUD_PAGE_SIZE"],
+                 filterable=None):
+        self.keys = pk_cols(pk)
+        self.size = size
+        allowed = set(cols if filterable is None else filterable)
+        self.filters = {c: v for c, v in (filters or {}).items() if c in allowed and v != ""}
+        self.after = list(after or [])
+        self.next_key = None
+
+        where, params = [], []
+        for c, v in self.filters.items():
+            where.append(f"{c}=%s")
+            params.append(v)
+        if len(self.after) == len(self.keys):
+            frag, p = keyset_after(self.keys, self.after)
+            where.append(frag)
+            params.extend(p)
+        self.sql = (
+            f"SELECT {', '.join(cols)} FROM {table}"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY {', '.join(self.keys)} LIMIT {int(size) + 1}"
+        )
+        self.params = params
+
+    def __iter__(self):
+        last = None
+        for i, row in enumerate(iter_dicts(self.sql, self.params)):
+            if i == self.size:          # the +1 row only tells us there is a next page
+                self.next_key = [str(last[k]) for k in self.keys]
+                break
+            last = row
+            yield row
+
+@bp.route("/crud/<string:tab>", methods=["GET", "POST"])
 @login_required(role="Admin")
 def crud_list(tab):
     if tab not in TABLES:
         flash("Unknown tab.", "danger")
-        return redirect(url_for("index"))
+        return redirect(url_for("relief.index"))
 
     table, pk, cols = TABLES[tab]
     action = request.form.get("action")
@@ -256,6 +1167,12 @@ def crud_list(tab):
                 col_list = ", ".join(cols)
                 sql = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})"
                 execute(sql, [form_vals[c] for c in cols])
+                note_write(table, +1)
+                if table == "AidDistribution":
+                    publish_aid(form_vals["VolunteerID"], form_vals["VictimID"], form_vals["ResourceID"],
+                                form_vals["DistDate"], source="crud")
+                elif table == "Victim":
+                    state().victim_index.upsert(form_vals)
                 flash("Row added.", "success")
 
             elif action == "update":
@@ -265,33 +1182,1184 @@ def crud_list(tab):
                     set_list = ", ".join([f"{c}=%s" for c in cols if c != pk])
                     sql = f"UPDATE {table} SET {set_list} WHERE {pk}=%s"
                     params = [form_vals[c] for c in cols if c != pk] + [form_vals[pk]]
-                    execute(sql, params)
+                    n = execute(sql, params)
+                    note_write(table, 0)
+                    if table == "Victim" and n:
+                        state().victim_index.upsert(form_vals)
                     flash("Row updated.", "success")
 
             elif action == "delete":
                 if isinstance(pk, tuple):
                     where = " AND ".join([f"{k}=%s" for k in pk])
                     sql = f"DELETE FROM {table} WHERE {where}"
-                    execute(sql, [form_vals[k] for k in pk])
+                    n = execute(sql, [form_vals[k] for k in pk])
                 else:
-                    execute(f"DELETE FROM {table} WHERE {pk}=%s", (form_vals[pk],))
+                    n = execute(f"DELETE FROM {table} WHERE {pk}=%s", (form_vals[pk],))
+                note_write(table, -n)
+                if table == "AidDistribution" and n:
+                    state().aid_feed.publish("delete", {**{k: form_vals[k] for k in pk}, "rows": n, "source": "crud"})
+                elif table == "Victim" and n:
+                    state().victim_index.remove(form_vals[pk])
                 flash("Row deleted.", "success")
 
         except Exception as e:
             flash(f"{action.capitalize()} failed: {e}", "danger")
 
-        return redirect(url_for("crud_list", tab=tab))
+        return redirect(url_for("relief.crud_list", tab=tab))
+
+    filterable = CRUD_FILTERS.get(tab, pk_cols(pk))
+    filters = {c: (request.args.get(f"f_{c}") or "").strip() for c in filterable}
+    page = KeysetPage(table, pk, cols, filters=filters, after=request.args.getlist("after"),
+                      size=cfg("CRUD_PAGE_SIZE"), filterable=filterable)
+    return stream_template(
+        "crud_list.html", tab=tab, table=table, pk=pk, cols=cols, page=page,
+        filterable=filterable,
+        filter_args={f"f_{c}": v for c, v in page.filters.items()},
+    )
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Bulk import (Admin only)  → /import and `flask import-data`
+# ─────────────────────────────────────────────────────────────────────────────
+IMPORT_TABLES = ("Victim", "Resource", "Stocked_At", "AidDistribution")
+
+class ImportReport:
+    def __init__(self, tab, max_errors=DEFAULTS["IMPORT_MAX_ERRORS"]):
+        self.tab = tab
+        self.max_errors = max_errors
+        self.rows_read = 0
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []                # (line/record no, message), capped at max_errors
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def error(self, line_no, msg):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_no, msg))
+
+    @property
+    def rows_per_sec(self):
+        return round(self.rows_read / self.elapsed, 1) if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"{self.tab}: read {self.rows_read}, inserted {self.inserted}, "
+                f"failed {self.failed} in {self.batches} batches, "
+                f"{self.elapsed:.2f}s ({self.rows_per_sec} rows/s)")
+
+def _iter_json_records(text):
+    """
+    Stream objects from either a top-level JSON array or NDJSON (one object per line).
+    Yields (record no, dict). A bad NDJSON line yields (line no, JSONDecodeError) and
+    reading goes on; a bad array raises, since there is no next record to find.
+    """
+    first = ""
+    while not first:
+        ch = text.read(1)
+        if ch == "":
+            return
+        first = ch.strip()
+
+    if first != "[":
+        line_no = 1
+        rest = first + text.readline()
+        while rest:
+            if rest.strip():
+                try:
+                    rec = json.loads(rest)
+                except json.JSONDecodeError as e:
+                    rec = e
+                yield line_no, rec
+            line_no += 1
+            rest = text.readline()
+        return
+
+    decoder = json.JSONDecoder()
+    buf, n = "", 0
+    while True:
+        chunk = text.read(64 * 1024)
+        buf += chunk
+        while True:
+            buf = buf.lstrip().lstrip(",").lstrip()
+            if buf.startswith("]") or not buf:
+                break
+            try:
+                obj, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break                   # object continues in the next chunk
+            n += 1
+            yield n, obj
+            buf = buf[end:]
+        if not chunk or buf.startswith("]"):
+            return
+
+def iter_import_records(fileobj, fmt):
+    """
+    Yield (line/record no, dict) from a binary file object without reading it all.
+    fmt: "csv" (header row required) or "json" (array or NDJSON).
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for rec in reader:
+            yield reader.line_num, rec
+    else:
+        yield from _iter_json_records(text)
+
+def _import_row(rec, cols, keys):
+    """
+    Validate one record against the TABLES column list.
+    Returns (values in column order, None) or (None, error message).
+    """
+    if isinstance(rec, ValueError):
+        return None, f"parse error: {rec}"
+    if not isinstance(rec, dict):
+        return None, "record is not an object"
+    if None in rec:                     # csv.DictReader puts surplus fields under None
+        return None, "more fields than the header"
+    unknown = [k for k in rec if k not in cols]
+    if unknown:
+        return None, f"unknown column(s): {', '.join(map(str, unknown))}"
+    values = []
+    for c in cols:
+        v = rec.get(c)
+        if isinstance(v, str):
+            v = v.strip() or None
+        values.append(v)
+    missing = [k for k in keys if values[cols.index(k)] is None]
+    if missing:
+        return None, f"missing key column(s): {', '.join(missing)}"
+    return values, None
+
+def _flush_import_batch(table, cols, batch, report):
+    """
+    Insert one batch in a single transaction. If the multi-row insert fails,
+    replay it row by row in one transaction so only the bad rows are rejected.
+    """
+    sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})"
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        try:
+            with track_statement("executemany", sql) as rec:
+                cur.executemany(sql, [values for _, values in batch])
+                conn.commit()
+                ok = rec["rows"] = len(batch)
+            inserted = [values for _, values in batch]
+        except mysql.connector.Error:
+            conn.rollback()
+            inserted = []
+            for line_no, values in batch:
+                try:
+                    with track_statement("execute", sql):
+                        cur.execute(sql, values)
+                    inserted.append(values)
+                except mysql.connector.Error as e:
+                    report.error(line_no, str(e))
+            conn.commit()
+            ok = len(inserted)
+    finally:
+        cur.close()
+    report.batches += 1
+    report.inserted += ok
+    if ok:
+        note_write(table, ok)
+        if table == "Victim":
+            for values in inserted:
+                state().victim_index.upsert(dict(zip(cols, values)))
+
+def bulk_import(tab, records, batch_size=None):
+    """
+    records: iterable of (line/record no, dict), e.g. from iter_import_records().
+    batch_size defaults to IMPORT_BATCH.
+    """
+    table, pk, cols = TABLES[tab]
+    keys = pk_cols(pk)
+    batch_size = batch_size or cfg("IMPORT_BATCH")
+    report = ImportReport(tab, cfg("IMPORT_MAX_ERRORS"))
+    batch = []
+    try:
+        for line_no, rec in records:
+            report.rows_read += 1
+            values, err = _import_row(rec, cols, keys)
+            if err:
+                report.error(line_no, err)
+                continue
+            batch.append((line_no, values))
+            if len(batch) >= batch_size:
+                _flush_import_batch(table, cols, batch, report)
+                batch = []
+    except (ValueError, csv.Error) as e:        # malformed file: stop, but keep the rows before it
+        report.error(report.rows_read + 1, f"parse error: {e}")
+    if batch:
+        _flush_import_batch(table, cols, batch, report)
+    report.elapsed = time.monotonic() - report.started
+    return report
+
+def _import_format(filename, fmt=None):
+    if fmt:
+        return fmt
+    return "csv" if (filename or "").lower().endswith(".csv") else "json"
+
+@bp.route("/import", methods=["GET", "POST"])
+@login_required(role="Admin")
+def import_data():
+    report = None
+    if request.method == "POST":
+        tab = request.form.get("tab")
+        upload = request.files.get("file")
+        if tab not in IMPORT_TABLES:
+            flash("Pick a table to import into.", "warning")
+        elif not upload or not upload.filename:
+            flash("Choose a CSV or JSON file.", "warning")
+        else:
+            try:
+                batch_size = max(1, int(request.form.get("batch_size") or cfg("IMPORT_BATCH")))
+                fmt = _import_format(upload.filename, request.form.get("format"))
+                report = bulk_import(tab, iter_import_records(upload.stream, fmt), batch_size)
+                flash(report.summary(), "success" if not report.failed else "warning")
+            except Exception as e:
+                flash(f"Import failed: {e}", "danger")
+    return render_template("import.html", tables=IMPORT_TABLES, report=report,
+                           batch_size=cfg("IMPORT_BATCH"), cols={t: TABLES[t][2] for t in IMPORT_TABLES})
+
+@bp.cli.command("import-data")
+@click.argument("tab", type=click.Choice(IMPORT_TABLES))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default=None,
+              help="Defaults to the file extension (.csv → csv, anything else → json).")
+@click.option("--batch-size", type=int, default=None, help="Rows per transaction [default: IMPORT_BATCH]")
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def import_data_cmd(tab, path, fmt, batch_size, account):
+    """Bulk-load a CSV / JSON / NDJSON file into TAB."""
+    use_cli_account(account)
+    with open(path, "rb") as fh:
+        report = bulk_import(tab, iter_import_records(fh, _import_format(path, fmt)), batch_size)
+    for line_no, msg in report.errors:
+        click.echo(f"  line {line_no}: {msg}", err=True)
+    if report.failed > len(report.errors):
+        click.echo(f"  ... {report.failed - len(report.errors)} more errors", err=True)
+    click.echo(report.summary())
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Mass distribution  → one transaction for a whole camp or victim list
+#   Validation is set-based, stock is taken once per camp via TakeStock(), and
+#   the inserted rows spend that connection's grant instead of each decrementing
+#   stock (see migrations/0005_bulk_aid_grant.sql). EndBulkAid() refuses to let a
+#   batch commit with a grant unspent (migrations/0008_bulk_aid_spent_check.sql).
+# ─────────────────────────────────────────────────────────────────────────────
+IN_CHUNK = 1000                 # max ids per IN (...) list
+
+# Statements distribute_batch runs; {ids} is a "%s, %s, ..." list of one chunk.
+# The victim reads lock their rows (and, for a camp, the camp's index range) until
+# the batch commits, so nobody changes camp between the stock taken and the inserts.
+BATCH_CAMP_VICTIMS_SQL = "SELECT VictimID, CampID FROM Victim WHERE CampID = %s ORDER BY VictimID FOR UPDATE"
+BATCH_VICTIMS_SQL = "SELECT VictimID, CampID FROM Victim WHERE VictimID IN ({ids}) ORDER BY VictimID FOR UPDATE"
+BATCH_REFS_SQL = """
+    SELECT EXISTS(SELECT 1 FROM Volunteer WHERE VolunteerID = %s) AS vol_ok,
+           EXISTS(SELECT 1 FROM Resource  WHERE ResourceID  = %s) AS res_ok
+"""
+BATCH_DUPLICATES_SQL = ("SELECT VictimID FROM AidDistribution WHERE VolunteerID = %s AND VictimID IN ({ids}) "
+                        "AND ResourceID = %s AND DistDate = %s")
+BATCH_STOCK_SQL = "SELECT CampID, CurrentQty FROM Stocked_At WHERE ResourceID = %s AND CampID IN ({ids})"
+BATCH_INSERT_SQL = ("INSERT INTO AidDistribution (VolunteerID, VictimID, ResourceID, DistDate, Qty) "
+                    "VALUES (%s, %s, %s, %s, %s)")
+
+def _placeholders(n):
+    return ", ".join(["%s"] * n)
+
+def _chunks(seq, n):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+def parse_id_list(text):
+    ids, seen = [], set()
+    for tok in re.split(r"[\s,;]+", text or ""):
+        if tok:
+            v = int(tok)
+            if v not in seen:
+                seen.add(v)
+                ids.append(v)
+    return ids
+
+class BatchDistribution:
+    """
+    Outcome of distribute_batch(). Nothing is written unless `applied`;
+    otherwise the lists say exactly why.
+    """
+    def __init__(self, volunteer_id, resource_id, qty, dist_date):
+        self.volunteer_id = volunteer_id
+        self.resource_id = resource_id
+        self.qty = qty
+        self.dist_date = dist_date
+        self.victims = 0
+        self.per_camp = {}          # CampID -> victims in this batch
+        self.missing = []           # VictimIDs that don't exist
+        self.unplaced = []          # VictimIDs with no camp (no stock to draw from)
+        self.duplicates = []        # VictimIDs already given this resource by this volunteer that day
+        self.shortfalls = []        # (CampID, needed, available or None if not stocked)
+        self.errors = []
+        self.applied = False
+        self.elapsed = 0.0
+
+    @property
+    def total_qty(self):
+        return self.victims * (self.qty or 0)
+
+    def summary(self):
+        if self.applied:
+            return (f"✅ Distributed {self.qty} × resource {self.resource_id} to {self.victims} victims "
+                    f"in {len(self.per_camp)} camp(s) ({self.total_qty} total) in {self.elapsed:.2f}s.")
+        parts = list(self.errors)
+        if self.missing:
+            parts.append(f"unknown victims: {_id_preview(self.missing)}")
+        if self.unplaced:
+            parts.append(f"victims not in any camp: {_id_preview(self.unplaced)}")
+        if self.duplicates:
+            parts.append(f"already given this resource by this volunteer on {self.dist_date}: "
+                         f"{_id_preview(self.duplicates)}")
+        for camp, need, have in self.shortfalls:
+            parts.append(f"camp {camp} needs {need}, has {'none stocked' if have is None else have}"
+                         f" (short {need - (have or 0)})")
+        return "❌ Batch not applied — " + "; ".join(parts)
+
+def _id_preview(ids, n=20):
+    shown = ", ".join(map(str, ids[:n]))
+    return shown + (f" … (+{len(ids) - n} more)" if len(ids) > n else "")
+
+def _stock_for(resource_id, camps):
+    have = {}
+    for chunk in _chunks(camps, IN_CHUNK):
+        for r in query_dicts(BATCH_STOCK_SQL.format(ids=_placeholders(len(chunk))), [resource_id, *chunk]):
+            have[r["CampID"]] = r["CurrentQty"]
+    return have
+
+def distribute_batch(volunteer_id, resource_id, qty, dist_date=None, camp_id=None, victim_ids=None,
+                     batch_size=None):
+    """
+    Give `qty` of one resource to every victim in `camp_id` (or in `victim_ids`), all or nothing.
+    Rows are inserted `batch_size` (default IMPORT_BATCH) per executemany().
+    """
+    dist_date = dist_date or date.today().isoformat()
+    report = BatchDistribution(volunteer_id, resource_id, qty, dist_date)
+    started = time.monotonic()
+
+    if qty is None or qty <= 0:
+        report.errors.append("quantity must be greater than zero")
+    if volunteer_id is None or resource_id is None:
+        report.errors.append("volunteer and resource are required")
+    if camp_id is None and not victim_ids:
+        report.errors.append("give a camp or a list of victims")
+    if report.errors:
+        return report
+
+    conn = get_conn()
+    conn.rollback()                 # fresh transaction: the locks below are held until it ends
+
+    # 1) Victims, with their camps — one indexed pass, locked
+    if camp_id is not None:
+        victims = query_dicts(BATCH_CAMP_VICTIMS_SQL, (camp_id,))
+        if not victims:
+            report.errors.append(f"camp {camp_id} has no victims")
+    else:
+        victims = []
+        for chunk in _chunks(sorted(victim_ids), IN_CHUNK):     # ascending → same lock order everywhere
+            victims += query_dicts(BATCH_VICTIMS_SQL.format(ids=_placeholders(len(chunk))), chunk)
+        found = {v["VictimID"] for v in victims}
+        report.missing = [v for v in victim_ids if v not in found]
+    report.unplaced = [v["VictimID"] for v in victims if v["CampID"] is None]
+    victims = [v for v in victims if v["CampID"] is not None]
+    report.victims = len(victims)
+    for v in victims:
+        report.per_camp[v["CampID"]] = report.per_camp.get(v["CampID"], 0) + 1
+
+    # 2) Volunteer / resource exist
+    ok = query_dicts(BATCH_REFS_SQL, (volunteer_id, resource_id))[0]
+    if not ok["vol_ok"]:
+        report.errors.append(f"volunteer {volunteer_id} does not exist")
+    if not ok["res_ok"]:
+        report.errors.append(f"resource {resource_id} does not exist")
+
+    # 3) Rows that would collide with the AidDistribution PK
+    ids = [v["VictimID"] for v in victims]
+    for chunk in _chunks(ids, IN_CHUNK):
+        report.duplicates += [r["VictimID"] for r in query_dicts(
+            BATCH_DUPLICATES_SQL.format(ids=_placeholders(len(chunk))),
+            [volunteer_id, *chunk, resource_id, dist_date])]
+
+    # 4) Stock per camp for the batch total
+    have = _stock_for(resource_id, list(report.per_camp))
+    for camp, n in sorted(report.per_camp.items()):
+        need = n * qty
+        if have.get(camp) is None or have[camp] < need:
+            report.shortfalls.append((camp, need, have.get(camp)))
+
+    if report.errors or report.missing or report.unplaced or report.duplicates or report.shortfalls:
+        conn.rollback()             # release the victim locks
+        report.elapsed = time.monotonic() - started
+        return report
+
+    # 5) Apply: take stock once per camp, bulk insert, check every grant was spent — one transaction
+    sql = BATCH_INSERT_SQL
+    rows = [(volunteer_id, vid, resource_id, dist_date, qty) for vid in ids]
+    cur = conn.cursor()
+    try:
+        for camp, n in sorted(report.per_camp.items()):       # fixed order → no lock-order deadlocks
+            with track_statement("procedure", "CALL TakeStock"):
+                cur.callproc("TakeStock", (camp, resource_id, n * qty))
+        for chunk in _chunks(rows, batch_size or cfg("IMPORT_BATCH")):
+            with track_statement("executemany", sql) as rec:
+                cur.executemany(sql, chunk)
+                rec["rows"] = len(chunk)
+        with track_statement("procedure", "CALL EndBulkAid"):
+            cur.callproc("EndBulkAid")
+        conn.commit()
+        report.applied = True
+    except mysql.connector.Error as e:
+        conn.rollback()
+        if "Insufficient stock" in str(e):          # stock moved since step 4 → report it as it is now
+            have = _stock_for(resource_id, list(report.per_camp))
+            report.shortfalls = [(c, n * qty, have.get(c)) for c, n in sorted(report.per_camp.items())
+                                 if have.get(c) is None or have[c] < n * qty]
+        if not report.shortfalls:
+            report.errors.append(str(e))
+    finally:
+        cur.close()
+
+    if report.applied:
+        note_write("AidDistribution", len(rows))
+        note_write("Stocked_At", 0)
+    report.elapsed = time.monotonic() - started
+    return report
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Victim search (in-process index over name / village / taluk / district / camp)
+# Lookups never touch MySQL: the index is loaded once per worker (or once in the
+# gunicorn master, see VICTIM_INDEX_PRELOAD), patched by the write paths
+# (crud_list, bulk import) and kept current from the VictimChanges log.
+# ─────────────────────────────────────────────────────────────────────────────
+VICTIM_CAMPS_SQL = "SELECT CampID, Name FROM ReliefCamp"
+VICTIM_ROWS_SQL = "SELECT VictimID, Name, Village, Taluk, District, CampID FROM Victim ORDER BY VictimID"
+VICTIM_REFETCH_SQL = ("SELECT VictimID, Name, Village, Taluk, District, CampID FROM Victim "
+                      "WHERE VictimID IN ({ids})")
+VICTIM_CHANGES_SQL = "SELECT DISTINCT VictimID FROM VictimChanges WHERE ChangedAt >= %s LIMIT %s"
+
+_WORD = re.compile(r"[^\W\d_]+")               # letters only; numbers are IDs, matched exactly
+_NUMBER = re.compile(r"\d+")
+
+def search_words(text):
+    return [sys.intern(w) for w in _WORD.findall((text or "").casefold())]
+
+def _one_letter_off(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def _within_one_edit(a, b):
+    """Damerau distance ≤ 1: one substitution, insertion, deletion or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                                  and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+FUZZY_MIN = 4                   # shorter words only match exactly / by prefix
+
+def _insert_sorted(ids, vid):
+    if not ids or ids[-1] < vid:
+        ids.append(vid)
+    else:
+        i = bisect.bisect_left(ids, vid)
+        if i == len(ids) or ids[i] != vid:
+            ids.insert(i, vid)
+
+def _delete_sorted(ids, vid):
+    i = bisect.bisect_left(ids, vid)
+    if i < len(ids) and ids[i] == vid:
+        del ids[i]
+
+class _VictimIndexData:
+    """
+    The index itself. Not thread-safe; VictimIndex serializes access.
+      victims  VictimID -> (Name, Village, Taluk, District, CampID)
+      postings word -> sorted array of VictimIDs   words  sorted distinct words (prefix range scans)
+      variants word minus one letter -> (word, ...)   (typo lookups, words of FUZZY_MIN+ letters)
+      by_camp  CampID -> sorted array of VictimIDs
+    Arrays and tuples instead of lists and sets keep it to a few dozen bytes per victim.
+    """
+    def __init__(self):
+        self.victims = {}
+        self.postings = {}
+        self.words = []
+        self.variants = {}
+        self.by_camp = {}
+        self.camp_names = {}
+        self.camp_words = {}    # word -> {CampID}
+        self._strings = {}
+        self._sorted = True
+
+    def _share(self, v):
+        """One copy of each place name (names themselves rarely repeat exactly)."""
+        return self._strings.setdefault(v, v) if isinstance(v, str) else v
+
+    @staticmethod
+    def record_words(rec):
+        return set(search_words(" ".join(str(f) for f in rec[:4] if f)))
 
-    rows = query_dicts(f"SELECT {', '.join(cols)} FROM {table}")
-    return render_template("crud_list.html", tab=tab, table=table, pk=pk, cols=cols, rows=rows)
+    def set_camps(self, rows):
+        self.camp_names, self.camp_words = {}, {}
+        for r in rows:
+            self.camp_names[r["CampID"]] = r["Name"]
+            for w in search_words(r["Name"]):
+                self.camp_words.setdefault(w, set()).add(r["CampID"])
+
+    def add(self, victim_id, name, village, taluk, district, camp_id, bulk=False):
+        if victim_id in self.victims:
+            self.remove(victim_id)
+        rec = (name, self._share(village), self._share(taluk), self._share(district), camp_id)
+        self.victims[victim_id] = rec
+        camp_ids = self.by_camp.get(camp_id)
+        if camp_ids is None:
+            camp_ids = self.by_camp[camp_id] = array("i")
+        _insert_sorted(camp_ids, victim_id)
+        for w in self.record_words(rec):
+            ids = self.postings.get(w)
+            if ids is None:
+                ids = self.postings[w] = array("i")     # 4 bytes an entry, no int objects
+                if bulk:
+                    self._sorted = False
+                    self.words.append(w)
+                else:
+                    bisect.insort(self.words, w)
+                if len(w) >= FUZZY_MIN:
+                    for v in _one_letter_off(w):
+                        self.variants[v] = self.variants.get(v, ()) + (w,)
+            if bulk:
+                ids.append(victim_id)
+            else:
+                _insert_sorted(ids, victim_id)
+
+    def remove(self, victim_id):
+        rec = self.victims.pop(victim_id, None)
+        if rec is None:
+            return
+        _delete_sorted(self.by_camp.get(rec[4], ()), victim_id)
+        for w in self.record_words(rec):
+            ids = self.postings.get(w)
+            if ids is None:
+                continue
+            _delete_sorted(ids, victim_id)
+            if not ids:
+                del self.postings[w]
+                i = bisect.bisect_left(self.words, w)
+                if i < len(self.words) and self.words[i] == w:
+                    del self.words[i]
+                for v in _one_letter_off(w) if len(w) >= FUZZY_MIN else ():
+                    left = tuple(x for x in self.variants.get(v, ()) if x != w)
+                    if left:
+                        self.variants[v] = left
+                    else:
+                        self.variants.pop(v, None)
+
+    def finish(self):
+        """After bulk adds: sort the word list and postings (already ordered when loaded by PK)."""
+        if not self._sorted:
+            self.words.sort()
+            self._sorted = True
+        for w, ids in self.postings.items():
+            self.postings[w] = array("i", sorted(ids))
+
+    # ── lookups ──────────────────────────────────────────────────────────────
+    def _matching_words(self, term):
+        """[(indexed word, score)] best first: exact 3, prefix 2, one typo away 1."""
+        out = [(term, 3)] if term in self.postings else []
+        i = bisect.bisect_left(self.words, term)
+        while i < len(self.words) and self.words[i].startswith(term):
+            if self.words[i] != term:
+                out.append((self.words[i], 2))
+            i += 1
+        if len(term) >= FUZZY_MIN:
+            near = set()
+            for v in _one_letter_off(term) | {term}:    # swap / substitution / missing letter
+                near.update(self.variants.get(v, ()))
+            for v in _one_letter_off(term):             # one letter too many
+                if v in self.postings:
+                    near.add(v)
+            out += [(w, 1) for w in near if w != term and not w.startswith(term) and _within_one_edit(term, w)]
+        return out
+
+    def _matchers(self, term):
+        """
+        Ways a victim can match one query term, best first: (score, kind, payload) with
+        kind "ids" (sorted VictimIDs), "camps" (CampIDs) or "victim" (one VictimID).
+        None → a number that is neither a VictimID nor a CampID (ignored).
+        """
+        if term.isdigit():
+            n = int(term)
+            out = [(4, "victim", n)] if n in self.victims else []
+            if self.by_camp.get(n):
+                out.append((1, "camps", {n}))
+            return out or None
+        out = [(score, "ids", self.postings[w]) for w, score in self._matching_words(term)]
+        camps = {c for w, cs in self.camp_words.items() if w.startswith(term) for c in cs}
+        if camps:
+            out.append((1, "camps", camps))
+        return out
+
+    def _size(self, matchers):
+        n = 0
+        for _, kind, payload in matchers:
+            n += (len(payload) if kind == "ids" else 1 if kind == "victim"
+                  else sum(len(self.by_camp.get(c, ())) for c in payload))
+        return n
+
+    def _ids(self, matchers):
+        for score, kind, payload in matchers:
+            if kind == "victim":
+                yield score, payload
+            elif kind == "ids":
+                for vid in payload:
+                    yield score, vid
+            else:
+                for camp in payload:
+                    for vid in self.by_camp.get(camp, ()):
+                        yield score, vid
+
+    def _score(self, matchers, vid):
+        for score, kind, payload in matchers:
+            if kind == "ids":
+                i = bisect.bisect_left(payload, vid)
+                if i < len(payload) and payload[i] == vid:
+                    return score
+            elif kind == "camps":
+                if self.victims[vid][4] in payload:
+                    return score
+            elif vid == payload:
+                return score
+        return 0
+
+    def search(self, query, limit=10, scan=DEFAULTS["VICTIM_SEARCH_SCAN"]):
+        """
+        Every term must match (a word by exact / prefix / typo, a number as VictimID or
+        CampID). The most selective term drives; the others are checked by bisect on
+        their sorted postings. At most `scan` candidates are examined.
+        """
+        terms = [m for m in (self._matchers(t) for t in _NUMBER.findall(query) + search_words(query))
+                 if m is not None]
+        if not terms or not all(terms):
+            return []
+        terms.sort(key=self._size)
+        first, rest = terms[0], terms[1:]
+        found, seen = [], set()
+        for score, vid in self._ids(first):
+            if vid in seen:
+                continue
+            seen.add(vid)
+            for m in rest:
+                s = self._score(m, vid)
+                if not s:
+                    break
+                score += s
+            else:
+                found.append((score, vid))
+                if len(found) >= limit:
+                    break
+            if len(seen) >= scan:
+                break
+        found.sort(key=lambda x: (-x[0], x[1]))
+        out = []
+        for score, vid in found:
+            name, village, taluk, district, camp = self.victims[vid]
+            out.append({"VictimID": vid, "Name": name, "Village": village, "Taluk": taluk,
+                        "District": district, "CampID": camp, "Camp": self.camp_names.get(camp),
+                        "score": score})
+        return out
+
+class VictimIndex:
+    """
+    Lifecycle around _VictimIndexData: built in a background thread (in an
+    app context of `app`) on first use, swapped in whole, patched by write
+    paths. Every `poll` s a lookup first refetches the victims listed in
+    VictimChanges since the last poll, so writes from other workers get in
+    without reloading the table. Writes that land while a build runs are
+    replayed onto the new index.
+    """
+    SLACK = 60                          # secs of the log re-read each poll (commits lag ChangedAt)
+
+    def __init__(self, app, ttl=DEFAULTS["VICTIM_INDEX_TTL"], poll=DEFAULTS["VICTIM_INDEX_POLL"],
+                 changes_keep=DEFAULTS["VICTIM_CHANGES_KEEP"], catchup_max=DEFAULTS["VICTIM_CATCHUP_MAX"],
+                 scan=DEFAULTS["VICTIM_SEARCH_SCAN"]):
+        self.app = app
+        self.ttl = ttl
+        self.poll = poll
+        self.changes_keep = changes_keep        # hours
+        self.catchup_max = catchup_max
+        self.scan = scan
+        self._lock = threading.Lock()
+        self._data = None
+        self._built_at = 0.0
+        self._backlog = None            # list while a build runs
+        self._camps_stale = False
+        self._change_log = True         # False once VictimChanges turns out to be missing
+        self._since = None              # DB time the last build / poll started
+        self._polled_at = 0.0
+        self._polling = False
+        self.build_seconds = None
+
+    @property
+    def ready(self):
+        return self._data is not None
+
+    def _expired(self):
+        age = time.monotonic() - max(self._built_at, self._polled_at)
+        if self._change_log:
+            return age >= self.changes_keep * 3600       # the log we'd need may be pruned
+        return age >= self.ttl
+
+    def ensure(self, creds):
+        """Start a (re)build if there is no index yet or it has expired; else catch up if a poll is due."""
+        with self._lock:
+            if self._backlog is not None:
+                return
+            if self._data is None or self._expired():
+                self._backlog = []
+                build = True
+            elif (self._change_log and not self._polling
+                  and time.monotonic() - self._polled_at >= self.poll):
+                self._polling = True
+                build = False
+            else:
+                return
+        if build:
+            threading.Thread(target=self._build, args=(dict(creds),), name="victim-index", daemon=True).start()
+        else:
+            self._catch_up()
+
+    def build_now(self, creds):
+        """Build in the calling thread (VICTIM_INDEX_PRELOAD)."""
+        with self._lock:
+            self._backlog = []
+        self._build(creds)
+
+    def _db_now(self):
+        return query_dicts("SELECT NOW(6) AS now")[0]["now"]
+
+    def _build(self, creds):
+        started = time.monotonic()
+        data = _VictimIndexData()
+        try:
+            with self.app.app_context():
+                g.db_creds = creds
+                since = self._db_now()
+                data.set_camps(query_dicts(VICTIM_CAMPS_SQL))
+                for r in iter_dicts(VICTIM_ROWS_SQL, batch=5000):
+                    data.add(r["VictimID"], r["Name"], r["Village"], r["Taluk"], r["District"], r["CampID"],
+                             bulk=True)
+            data.finish()
+        except Exception:
+            logging.getLogger("relief").exception("victim index build failed")
+            with self._lock:
+                self._backlog = None
+            return
+        with self._lock:
+            for method, args in self._backlog:
+                getattr(data, method)(*args)
+            self._data, self._backlog = data, None
+            self._since = since
+            self._built_at = self._polled_at = time.monotonic()
+            self.build_seconds = self._built_at - started
+
+    def _catch_up(self):
+        """Refetch the victims VictimChanges lists since the last build / poll."""
+        try:
+            now = self._db_now()
+            changed = [r["VictimID"] for r in query_dicts(
+                VICTIM_CHANGES_SQL, (self._since - timedelta(seconds=self.SLACK), self.catchup_max + 1))]
+            if len(changed) > self.catchup_max:               # cheaper to reload: next lookup rebuilds
+                with self._lock:
+                    self._built_at = self._polled_at = float("-inf")
+                return
+            rows = {}
+            for chunk in _chunks(changed, IN_CHUNK):
+                for r in query_dicts(VICTIM_REFETCH_SQL.format(ids=_placeholders(len(chunk))), chunk):
+                    rows[r["VictimID"]] = r
+            with self._lock:
+                for vid in changed:
+                    r = rows.get(vid)
+                    if r is None:
+                        self._data.remove(vid)
+                    else:
+                        self._data.add(vid, r["Name"], r["Village"], r["Taluk"], r["District"], r["CampID"])
+                self._since = now
+                self._polled_at = time.monotonic()
+        except mysql.connector.Error as e:
+            if e.errno == 1146:                          # no VictimChanges: fall back to TTL rebuilds
+                self._change_log = False
+            logging.getLogger("relief").warning("victim index catch-up failed: %s", e)
+        finally:
+            self._polling = False
+
+    def _patch(self, method, *args):
+        with self._lock:
+            if self._data is not None:
+                getattr(self._data, method)(*args)
+            if self._backlog is not None:
+                self._backlog.append((method, args))
+
+    def upsert(self, row):
+        """row: dict with Victim columns (form values or an import record)."""
+        try:
+            victim_id = int(row["VictimID"])
+            camp_id = int(row["CampID"]) if row.get("CampID") not in (None, "") else None
+        except (KeyError, TypeError, ValueError):
+            return
+        self._patch("add", victim_id, row.get("Name"), row.get("Village"), row.get("Taluk"),
+                    row.get("District"), camp_id)
+
+    def remove(self, victim_id):
+        try:
+            self._patch("remove", int(victim_id))
+        except (TypeError, ValueError):
+            pass
+
+    def note_write(self, table, delta=None):
+        if table == "ReliefCamp":
+            self._camps_stale = True    # camp names are reloaded on the next lookup
+
+    def search(self, query, limit=10):
+        if self._camps_stale and self._data is not None:
+            self._camps_stale = False
+            camps = query_dicts(VICTIM_CAMPS_SQL)
+            with self._lock:
+                self._data.set_camps(camps)
+        with self._lock:
+            if self._data is None:
+                return None
+            return self._data.search(query, limit, self.scan)
+
+def preload_victim_index(app, account=None):
+    """
+    Build `app`'s index in this process before the server forks its workers
+    (wsgi.py, with gunicorn's preload_app). Workers then share its pages
+    copy-on-write and only catch up from VictimChanges.
+    account defaults to VICTIM_INDEX_PRELOAD.
+    """
+    with app.app_context():
+        acct = cfg("LOGIN_ACCOUNTS")[account or cfg("VICTIM_INDEX_PRELOAD")]
+        creds = _db_creds(acct["db_user"], acct["db_pass"])
+        state().victim_index.build_now(creds)
+        pool = state().pools.pop(creds["user"])
+    if pool is not None:
+        pool.close_idle()                        # the master keeps no MySQL sockets
+    gc.freeze()                                  # keep the collector from touching (and copying) them
+
+@bp.cli.command("victim-changes-prune")
+@click.option("--keep-hours", type=float, default=None, help="[default: VICTIM_CHANGES_KEEP_HOURS]")
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def victim_changes_prune_cmd(keep_hours, account):
+    """Delete VictimChanges rows older than --keep-hours (run it from cron)."""
+    use_cli_account(account)
+    keep_hours = cfg("VICTIM_CHANGES_KEEP") if keep_hours is None else keep_hours
+    total = 0
+    while True:
+        n = execute("DELETE FROM VictimChanges WHERE ChangedAt < NOW(6) - INTERVAL %s SECOND "
+                    "ORDER BY ChangedAt LIMIT 10000", (int(keep_hours * 3600),))
+        total += n
+        if n < 10000:
+            break
+    click.echo(f"{total} change(s) deleted")
+
+@bp.before_app_request
+def _warm_victim_index():
+    if cfg("VICTIM_INDEX_WARM") and "db_user" in session and not state().victim_index.ready:
+        state().victim_index.ensure(_conn_creds())
+
+@bp.get("/victims/search")
+@login_required(any_of=("Admin", "Operator", "Viewer"))
+def victim_search():
+    """?q=<name / place / camp words, or an ID>&limit=10 → JSON matches, best first."""
+    q = (request.args.get("q") or "").strip()
+    try:
+        limit = max(1, min(int(request.args.get("limit") or 10), 50))
+    except ValueError:
+        limit = 10
+    index = state().victim_index
+    index.ensure(_conn_creds())
+    started = time.perf_counter()
+    results = index.search(q, limit) if q else []
+    took = (time.perf_counter() - started) * 1000
+    if results is None:
+        return json_response({"ready": False, "results": []}, status=503)
+    return json_response({"ready": True, "query": q, "took_ms": round(took, 3), "results": results})
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Write-behind intake (optional, INTAKE_JOURNAL=<path>)
+# dbops "distribute" / "assign_volunteer" are appended to a local SQLite journal
+# and acknowledged at once. A background drainer applies them to MySQL in
+# journal order, retrying while MySQL is unreachable.
+# ─────────────────────────────────────────────────────────────────────────────
+intake_log = logging.getLogger("relief.intake")
+
+class IntakeOp:
+    """
+    A journaled dbops action: the form fields it takes (date last), the procedure
+    that applies it, and the natural-key lookup that proves it already has.
+    """
+    def __init__(self, proc, fields, table, exists_sql, key):
+        self.proc = proc
+        self.fields = fields
+        self.table = table
+        self.exists_sql = exists_sql
+        self.key = key              # param positions for exists_sql
+
+    def params(self, val):
+        """Read the form; a blank date is fixed to today so a replay means the same row."""
+        *ids, date_field = self.fields
+        params = [val(f) for f in ids]
+        missing = [f for f, v in zip(ids, params) if v is None]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        day = val(date_field, cast=None) or date.today().isoformat()
+        return params + [date.fromisoformat(day).isoformat()]
+
+INTAKE_OPS = {
+    "distribute": IntakeOp(
+        "DistributeAid", ("volunteer_id", "victim_id", "resource_id", "qty", "date"), "AidDistribution",
+        "SELECT 1 FROM AidDistribution WHERE VolunteerID=%s AND VictimID=%s AND ResourceID=%s AND DistDate=%s",
+        (0, 1, 2, 4)),
+    "assign_volunteer": IntakeOp(
+        "assign_volunteer", ("assign_camp_id", "assign_volunteer_id", "assign_date"), "AssignedTo",
+        "SELECT 1 FROM AssignedTo WHERE CampID=%s AND VolunteerID=%s AND Date=%s",
+        (0, 1, 2)),
+}
+
+def _transient(e):
+    """Worth retrying: MySQL unreachable / pool full / lock timeout or deadlock."""
+    return (isinstance(e, (PoolExhausted, mysql.connector.InterfaceError, mysql.connector.OperationalError))
+            or getattr(e, "errno", None) in (1205, 1213))
+
+class _ClosingSqlite:
+    """sqlite3's own context manager only ends the transaction; this also closes."""
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        self.db.close()
+
+class IntakeJournal:
+    """
+    Durable FIFO of dbops writes (SQLite, WAL, synchronous=FULL), drained into
+    `app`'s database. Several workers may share one journal file; a lease row
+    makes sure only one of them drains at a time, so journal order is apply order.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS intake_ops (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            op          TEXT NOT NULL,
+            params      TEXT NOT NULL,
+            db_user     TEXT NOT NULL,
+            status      TEXT NOT NULL DEFAULT 'pending',     -- pending | applied | rejected
+            error       TEXT,
+            attempts    INTEGER NOT NULL DEFAULT 0,
+            created_at  TEXT NOT NULL,
+            applied_at  TEXT,
+            next_try_at REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS ix_intake_status ON intake_ops (status, id);
+        CREATE TABLE IF NOT EXISTS intake_lease (
+            id    INTEGER PRIMARY KEY CHECK (id = 1),
+            owner TEXT NOT NULL,
+            until REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, app, batch=DEFAULTS["INTAKE_BATCH"], retry_max=DEFAULTS["INTAKE_RETRY_MAX"],
+                 lease=DEFAULTS["INTAKE_LEASE"], keep_days=DEFAULTS["INTAKE_KEEP_DAYS"]):
+        self.path = path
+        self.app = app
+        self.batch = batch
+        self.retry_max = retry_max
+        self.lease = lease
+        self.keep_days = keep_days
+        self.token = os.urandom(4).hex()
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(self.SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)   # autocommit
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=FULL")
+        return _ClosingSqlite(db)
+
+    @property
+    def owner(self):
+        return f"{os.getpid()}-{self.token}"        # differs in every forked worker
+
+    def enqueue(self, op, params, db_user):
+        with self._connect() as db:
+            cur = db.execute(
+                "INSERT INTO intake_ops (op, params, db_user, created_at) VALUES (?, ?, ?, ?)",
+                (op, json.dumps(params), db_user, datetime.now().isoformat(timespec="seconds")))
+            op_id = cur.lastrowid
+        self.ensure_started()
+        self._wake.set()
+        return op_id
+
+    def ops(self, status=None, op_id=None, limit=200):
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if op_id:
+            where.append("id = ?")
+            params.append(op_id)
+        sql = ("SELECT * FROM intake_ops" + (f" WHERE {' AND '.join(where)}" if where else "")
+               + " ORDER BY id DESC LIMIT ?")
+        with self._connect() as db:
+            rows = [dict(r) for r in db.execute(sql, params + [limit])]
+        for r in rows:
+            r["params"] = json.loads(r["params"])
+        return rows
+
+    def counts(self):
+        with self._connect() as db:
+            return {r["status"]: r["n"] for r in
+                    db.execute("SELECT status, COUNT(*) AS n FROM intake_ops GROUP BY status")}
+
+    # ── drainer ──────────────────────────────────────────────────────────────
+    def ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():   # threads don't survive fork
+                self._thread = threading.Thread(target=self._run, name="intake-drainer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            applied = 0
+            try:
+                applied = self.drain_once()
+            except Exception:
+                intake_log.exception("intake drain failed")
+            if not applied:
+                self._wake.wait(min(self.retry_max, self.lease / 3))
+                self._wake.clear()
+
+    def _take_lease(self, db):
+        now = time.time()
+        cur = db.execute("""
+            INSERT INTO intake_lease (id, owner, until) VALUES (1, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET owner = excluded.owner, until = excluded.until
+            WHERE intake_lease.until < ? OR intake_lease.owner = excluded.owner
+        """, (self.owner, now + self.lease, now))
+        return cur.rowcount == 1
+
+    def drain_once(self):
+        """Apply up to `batch` pending ops in order; stop at the first one that must wait."""
+        done = 0
+        with self._connect() as db:
+            if not self._take_lease(db):
+                return 0
+            batch = db.execute("SELECT * FROM intake_ops WHERE status = 'pending' ORDER BY id LIMIT ?",
+                               (self.batch,)).fetchall()
+            for row in batch:
+                if row["next_try_at"] > time.time() or not self._take_lease(db):
+                    break
+                status, error = self._apply(row)
+                if status == "pending":
+                    delay = min(self.retry_max, 2 ** row["attempts"])
+                    db.execute("UPDATE intake_ops SET attempts = attempts + 1, error = ?, next_try_at = ? "
+                               "WHERE id = ?", (error, time.time() + delay, row["id"]))
+                    intake_log.warning("intake #%s will retry in %ss: %s", row["id"], delay, error)
+                    break                               # keep journal order: nothing overtakes it
+                db.execute("UPDATE intake_ops SET status = ?, error = ?, attempts = attempts + 1, "
+                           "applied_at = ? WHERE id = ?",
+                           (status, error, datetime.now().isoformat(timespec="seconds"), row["id"]))
+                done += 1
+            if done:
+                db.execute("DELETE FROM intake_ops WHERE status = 'applied' AND applied_at < ?",
+                           (datetime.fromtimestamp(time.time() - self.keep_days * 86400)
+                            .isoformat(timespec="seconds"),))
+        return done
+
+    def _apply(self, row):
+        """→ (status, error text). Runs as the MySQL user that submitted the op."""
+        op = INTAKE_OPS.get(row["op"])
+        accounts = self.app.config["LOGIN_ACCOUNTS"].values()
+        account = next((a for a in accounts if a["db_user"] == row["db_user"]), None)
+        if op is None or account is None:
+            return "rejected", f"unknown operation or account ({row['op']}, {row['db_user']})"
+        params = json.loads(row["params"])
+        with self.app.app_context():
+            g.db_creds = _db_creds(account["db_user"], account["db_pass"])
+            try:
+                if query_dicts(op.exists_sql, [params[i] for i in op.key]):
+                    return "applied", "already recorded; not applied twice"
+                call_proc(op.proc, params)
+            except mysql.connector.Error as e:
+                if _transient(e):
+                    return "pending", str(e)
+                return "rejected", getattr(e, "msg", None) or str(e)
+            except Exception as e:                      # not MySQL's verdict → retry, but show it
+                intake_log.exception("intake #%s failed", row["id"])
+                return "pending", str(e)
+            note_write(op.table, +1)
+            if row["op"] == "distribute":
+                publish_aid(params[0], params[1], params[2], params[4], source="intake")
+        return "applied", None
+
+@bp.before_app_request
+def _start_intake_drainer():
+    intake = state().intake
+    if intake is not None:
+        intake.ensure_started()         # once per worker; picks up ops left by a restart
+
+@bp.get("/intake")
+@login_required(any_of=("Admin", "Operator"))
+def intake_status():
+    intake = state().intake
+    if intake is None:
+        flash("Intake queue is off (set INTAKE_JOURNAL to enable it).", "warning")
+        return redirect(url_for("relief.dbops"))
+    status = (request.args.get("status") or "").strip()
+    op_id = (request.args.get("id") or "").strip()
+    rows = intake.ops(status=status or None, op_id=int(op_id) if op_id.isdigit() else None)
+    counts = intake.counts()
+    if request.args.get("format") == "json":
+        return json_response({"counts": counts, "ops": rows})
+    return render_template("intake.html", rows=rows, counts=counts, status=status, op_id=op_id)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # DB Operations (Admin + Operator)
 # ─────────────────────────────────────────────────────────────────────────────
-@app.route("/dbops", methods=["GET", "POST"])
+AID_DELETE_LATEST_SQL = """
+    DELETE FROM AidDistribution
+    WHERE VolunteerID=%s AND VictimID=%s AND ResourceID=%s
+    ORDER BY DistDate DESC
+    LIMIT 1
+"""
+
+@bp.route("/dbops", methods=["GET", "POST"])
 @login_required(any_of=("Admin", "Operator"))
 def dbops():
     notice = None
+    batch  = None
 
     def _val(name, cast=int):
         v = (request.form.get(name) or "").strip()
@@ -299,23 +2367,48 @@ def dbops():
             return None
         return cast(v) if cast is not None else v
 
+    intake = state().intake
     if request.method == "POST":
         action = (request.form.get("action") or "").strip()
         try:
-            if action == "distribute":
+            if intake is not None and action in INTAKE_OPS:
+                op_id = intake.enqueue(action, INTAKE_OPS[action].params(_val), session["db_user"])
+                notice = f"📥 Queued as #{op_id}; it is applied in the background (see Intake status)."
+
+            elif action == "distribute":
                 vol_id = _val("volunteer_id")
                 vic_id = _val("victim_id")
                 res_id = _val("resource_id")
                 qty    = _val("qty")
                 date_s = _val("date", cast=None)
                 call_proc("DistributeAid", [vol_id, vic_id, res_id, qty, date_s])
+                note_write("AidDistribution", +1)
+                publish_aid(vol_id, vic_id, res_id, date_s, source="dbops")
                 notice = "✅ Aid distributed successfully."
 
+            elif action == "distribute_batch":
+                batch = distribute_batch(
+                    volunteer_id=_val("batch_volunteer_id"),
+                    resource_id=_val("batch_resource_id"),
+                    qty=_val("batch_qty"),
+                    dist_date=_val("batch_date", cast=None),
+                    camp_id=_val("batch_camp_id"),
+                    victim_ids=parse_id_list(request.form.get("batch_victim_ids")),
+                )
+                if batch.applied:
+                    state().aid_feed.publish("batch", {
+                        "VolunteerID": batch.volunteer_id, "ResourceID": batch.resource_id,
+                        "Qty": batch.qty, "Date": batch.dist_date, "victims": batch.victims,
+                        "camps": sorted(batch.per_camp), "source": "dbops",
+                    })
+                notice = batch.summary()
+
             elif action == "assign_volunteer":
                 camp_id = _val("assign_camp_id")
                 vol_id  = _val("assign_volunteer_id")
                 date_s  = _val("assign_date", cast=None)
                 call_proc("assign_volunteer", [camp_id, vol_id, date_s])
+                note_write("AssignedTo", +1)
                 notice = "✅ Volunteer assigned."
 
             elif action == "occ":
@@ -343,31 +2436,324 @@ def dbops():
                 qty    = _val("trig_qty")
                 date_s = _val("trig_date", cast=None)
                 call_proc("DistributeAid", [vol_id, vic_id, res_id, qty, date_s])
+                note_write("AidDistribution", +1)
+                publish_aid(vol_id, vic_id, res_id, date_s, source="dbops")
                 notice = "✅ Valid insert done (AFTER INSERT should decrement stock)."
 
             elif action == "trig_after_delete":
                 vol_id = _val("trig_volunteer_id")
                 vic_id = _val("trig_victim_id")
                 res_id = _val("trig_resource_id")
-                execute("""
-                    DELETE FROM AidDistribution
-                    WHERE VolunteerID=%s AND VictimID=%s AND ResourceID=%s
-                    ORDER BY DistDate DESC
-                    LIMIT 1
-                """, (vol_id, vic_id, res_id))
-                notice = "✅ One recent row deleted (AFTER DELETE should restore stock)."
+                n = execute(AID_DELETE_LATEST_SQL, (vol_id, vic_id, res_id))
+                note_write("AidDistribution", -n)
+                if n:
+                    state().aid_feed.publish("delete", {"VolunteerID": vol_id, "VictimID": vic_id,
+                                                "ResourceID": res_id, "rows": n, "source": "dbops"})
+                    notice = "✅ One recent row deleted (AFTER DELETE should restore stock)."
+                else:
+                    notice = "⚠️ No aid row for that volunteer, victim and resource; nothing deleted."
 
             else:
                 notice = "Unknown action."
         except Exception as e:
             notice = f"❌ Operation failed: {e}"
 
-    return render_template("dbops.html", notice=notice)
+    return render_template("dbops.html", notice=notice, batch=batch)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Camp overview (all roles)  → every camp's occupancy in one grouped pass,
+# read from CampCounters (migrations/0003_camp_counters.sql)
+# ─────────────────────────────────────────────────────────────────────────────
+CAMP_FILTERS = {"disaster": "c.DisasterID", "district": "c.District", "state": "c.State", "status": "c.CampStatus"}
+
+def camp_overview_query(**filters):
+    """
+    SQL + params for occupancy, victims, assigned volunteers and capacity headroom per camp.
+    filters: any of CAMP_FILTERS (empty values are ignored).
+    """
+    where, params = [], []
+    for key, col in CAMP_FILTERS.items():
+        v = filters.get(key)
+        if v not in (None, ""):
+            where.append(f"{col} = %s")
+            params.append(v)
+    sql = f"""
+        SELECT c.CampID, c.Name, c.District, c.State, c.DisasterID, c.CampStatus, c.Capacity,
+               COALESCE(k.Victims, 0)    AS Victims,
+               COALESCE(k.Volunteers, 0) AS Volunteers,
+               CASE WHEN c.Capacity IS NULL OR c.Capacity = 0 THEN 0.00
+                    ELSE ROUND(COALESCE(k.Victims, 0) * 100.0 / c.Capacity, 2) END AS OccupancyPct,
+               c.Capacity - COALESCE(k.Victims, 0) AS Headroom
+        FROM ReliefCamp c
+        LEFT JOIN CampCounters k ON k.CampID = c.CampID
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY OccupancyPct DESC, c.CampID
+    """
+    return sql, params
+
+def camp_overview(**filters):
+    return query_dicts(*camp_overview_query(**filters))
+
+def json_response(payload, status=200):
+    return Response(json.dumps(payload, default=json_default), status=status, mimetype="application/json")
+
+@bp.get("/camps")
+@login_required(any_of=("Admin", "Operator", "Viewer"))
+def camps():
+    filters = {k: (request.args.get(k) or "").strip() for k in CAMP_FILTERS}
+    try:
+        rows = camp_overview(**filters)
+    except Exception as e:
+        if request.args.get("format") == "json":
+            return json_response({"error": str(e)}, status=500)
+        flash(f"Camp overview failed: {e}", "danger")
+        rows = []
+    if request.args.get("format") == "json":
+        return json_response({"filters": {k: v for k, v in filters.items() if v}, "camps": rows})
+    return render_template("camps.html", rows=rows, filters=filters)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Low-stock watchlist (all roles)  → reads LowStock (migrations/0004_low_stock_watch.sql),
+# which triggers keep down to exactly the pairs at / below their reorder level.
+# Burn rate comes from AidDailyRollup, so cost follows (low pairs × window days).
+# ─────────────────────────────────────────────────────────────────────────────
+def low_stock_query(days=DEFAULTS["LOW_STOCK_BURN_DAYS"], camp=None, limit=DEFAULTS["LOW_STOCK_LIMIT"]):
+    """
+    SQL + params for the watchlist, most urgent first:
+    fewest days of cover (stock ÷ avg daily use over `days`), then pairs with no recent use.
+    """
+    where, params = [], [days]
+    if camp not in (None, ""):
+        where.append("l.CampID = %s")
+        params.append(camp)
+    sql = f"""
+        SELECT w.*,
+               ROUND(w.UsedRecent / %s, 2) AS DailyBurn,
+               CASE WHEN w.UsedRecent = 0 THEN NULL
+                    ELSE ROUND(GREATEST(w.CurrentQty, 0) / (w.UsedRecent / %s), 1) END AS DaysOfCover
+        FROM (
+          SELECT l.CampID, c.Name AS Camp, l.ResourceID, r.ItemName AS Resource, r.Unit,
+                 l.CurrentQty, l.ReorderLevel, l.Since,
+                 (SELECT COALESCE(SUM(x.TotalQty), 0)
+                  FROM AidDailyRollup x
+                  WHERE x.CampID = l.CampID AND x.ResourceID = l.ResourceID
+                    AND x.DistDate > CURDATE() - INTERVAL %s DAY) AS UsedRecent
+          FROM LowStock l
+          JOIN ReliefCamp c ON c.CampID = l.CampID
+          JOIN Resource   r ON r.ResourceID = l.ResourceID
+          {"WHERE " + " AND ".join(where) if where else ""}
+        ) w
+        ORDER BY DaysOfCover IS NULL, DaysOfCover, w.CurrentQty - w.ReorderLevel, w.CampID, w.ResourceID
+        LIMIT {int(limit)}
+    """
+    return sql, [days, days, *params]
+
+def low_stock_watchlist(**kwargs):
+    return query_dicts(*low_stock_query(**kwargs))
+
+@bp.get("/stock/low")
+@login_required(any_of=("Admin", "Operator", "Viewer"))
+def low_stock():
+    def arg_int(name, default):
+        try:
+            return max(1, int(request.args.get(name) or default))
+        except ValueError:
+            return default
+    days  = arg_int("days", cfg("LOW_STOCK_BURN_DAYS"))
+    limit = arg_int("limit", cfg("LOW_STOCK_LIMIT"))
+    camp  = (request.args.get("camp") or "").strip()
+    try:
+        rows = low_stock_watchlist(days=days, camp=camp, limit=limit)
+    except Exception as e:
+        if request.args.get("format") == "json":
+            return json_response({"error": str(e)}, status=500)
+        flash(f"Low-stock watchlist failed: {e}", "danger")
+        rows = []
+    if request.args.get("format") == "json":
+        return json_response({"burn_days": days, "camp": camp or None, "items": rows})
+    return render_template("low_stock.html", rows=rows, days=days, camp=camp, limit=limit)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Queries (all roles)
 # ─────────────────────────────────────────────────────────────────────────────
-@app.route("/queries", methods=["GET", "POST"])
+REPORT_COLUMNS = {
+    "nested":    ["VictimID", "Name", "total_qty"],
+    "join":      ["Date", "Volunteer", "Victim", "Resource", "Qty", "CampID"],
+    "aggregate": ["Resource", "TotalQty"],
+}
+
+def report_query(report, f):
+    """
+    SQL + params for one of the /queries reports.
+    f(name) reads a field by its form name, from either the POST form or the query string.
+    "nested" and "aggregate" read the trigger-maintained rollups (see rollup-rebuild).
+    """
+    if report == "nested":
+        camp_id  = f("nested_camp")
+        the_date = f("nested_date")
+        sql = """
+        WITH per_victim AS (
+          SELECT d.VictimID, d.TotalQty AS total_qty
+          FROM AidVictimDaily d
+          WHERE d.CampID = %s AND d.DistDate = %s
+        ),
+        av AS (SELECT AVG(total_qty) AS avg_total FROM per_victim)
+        SELECT pv.VictimID,
+               vic.Name AS Name,
+               pv.total_qty
+        FROM per_victim pv
+        JOIN Victim vic ON vic.VictimID = pv.VictimID
+        JOIN av
+        WHERE pv.total_qty > av.avg_total
+        ORDER BY pv.total_qty DESC;
+        """
+        return sql, (camp_id, the_date)
+
+    if report == "join":
+        d_from = f("join_from")
+        d_to   = f("join_to")
+        camp   = f("join_camp")
+        where  = "a.DistDate BETWEEN %s AND %s"
+        params = [d_from, d_to]
+        if camp:
+            where += " AND vic.CampID = %s"
+            params.append(camp)
+        sql = f"""
+        SELECT a.DistDate AS Date,
+               vol.Name   AS Volunteer,
+               vic.Name   AS Victim,
+               r.ItemName AS Resource,
+               a.Qty,
+               vic.CampID AS CampID
+        FROM AidDistribution a
+        JOIN Volunteer vol ON vol.VolunteerID = a.VolunteerID
+        JOIN Victim    vic ON vic.VictimID    = a.VictimID
+        JOIN Resource  r   ON r.ResourceID    = a.ResourceID
+        WHERE {where}
+        ORDER BY a.DistDate, vic.VictimID, r.ItemName;
+        """
+        return sql, tuple(params)
+
+    if report == "aggregate":
+        camp_id = f("agg_camp")
+        d_from  = f("agg_from")
+        d_to    = f("agg_to")
+        sql = """
+        SELECT r.ItemName AS Resource, SUM(x.TotalQty) AS TotalQty
+        FROM AidDailyRollup x
+        JOIN Resource r ON r.ResourceID = x.ResourceID
+        WHERE x.CampID = %s AND x.DistDate BETWEEN %s AND %s
+        GROUP BY r.ItemName
+        ORDER BY r.ItemName;
+        """
+        return sql, (camp_id, d_from, d_to)
+
+    raise ValueError(f"Unknown report: {report}")
+
+# Base tables each report reads, directly or through a rollup (rollups follow AidDistribution)
+REPORT_TABLES = {
+    "nested":    {"AidDistribution", "Victim"},
+    "join":      {"AidDistribution", "Volunteer", "Victim", "Resource"},
+    "aggregate": {"AidDistribution", "Resource"},
+}
+
+def _normalize_param(v):
+    s = str(v).strip()
+    if s.isdigit():
+        return str(int(s))
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return s
+
+class ReportCache:
+    """
+    Bounded LRU + TTL cache for /queries results, keyed on (report, normalized params).
+    Each entry is indexed by the tables it reads, so a write evicts only those entries.
+    """
+    def __init__(self, size=DEFAULTS["REPORT_CACHE_SIZE"], ttl=DEFAULTS["REPORT_CACHE_TTL"],
+                 max_rows=DEFAULTS["REPORT_CACHE_MAX_ROWS"]):
+        self.size = size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries = OrderedDict()       # key -> (stored_at, rows, tables)
+        self._by_table = {}                 # table -> set(keys)
+        self._table_gen = {}                # table -> write generation
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                      "invalidations": 0, "uncacheable": 0}
+
+    def _drop(self, key):
+        _, _, tables = self._entries.pop(key)
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys:
+                keys.discard(key)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                self._drop(key)
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def generation(self, tables):
+        with self._lock:
+            return {t: self._table_gen.get(t, 0) for t in tables}
+
+    def put(self, key, rows, tables, gen):
+        with self._lock:
+            if len(rows) > self.max_rows:
+                self.stats["uncacheable"] += 1
+                return
+            if any(self._table_gen.get(t, 0) != g for t, g in gen.items()):
+                return                      # a write landed while the query ran
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), rows, frozenset(tables))
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while len(self._entries) > self.size:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def note_write(self, table, delta=None):
+        with self._lock:
+            self._table_gen[table] = self._table_gen.get(table, 0) + 1
+            for key in list(self._by_table.get(table, ())):
+                if key in self._entries:
+                    self._drop(key)
+                    self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "size": self.size, "ttl": self.ttl}
+
+def cached_report(report, f):
+    sql, params = report_query(report, f)
+    key = (report, tuple(_normalize_param(p) for p in params))
+    report_cache = state().report_cache
+    rows = report_cache.get(key)
+    if rows is None:
+        tables = REPORT_TABLES[report]
+        gen = report_cache.generation(tables)
+        rows = query_dicts(sql, params)
+        report_cache.put(key, rows, tables, gen)
+    return rows
+
+@bp.get("/queries/cache")
+@login_required(role="Admin")
+def report_cache_stats():
+    return json_response(state().report_cache.snapshot())
+
+@bp.route("/queries", methods=["GET", "POST"])
 @login_required(any_of=("Admin", "Operator", "Viewer"))
 def queries():
     nested_rows = None
@@ -382,67 +2768,13 @@ def queries():
         action = f("action")
         try:
             if action == "nested":
-                camp_id  = f("nested_camp")
-                the_date = f("nested_date")
-                sql = """
-                WITH per_victim AS (
-                  SELECT a.VictimID, SUM(a.Qty) AS total_qty
-                  FROM AidDistribution a
-                  JOIN Victim v ON v.VictimID = a.VictimID
-                  WHERE v.CampID = %s AND a.DistDate = %s
-                  GROUP BY a.VictimID
-                ),
-                av AS (SELECT AVG(total_qty) AS avg_total FROM per_victim)
-                SELECT pv.VictimID,
-                       vic.Name AS Name,
-                       pv.total_qty
-                FROM per_victim pv
-                JOIN Victim vic ON vic.VictimID = pv.VictimID
-                JOIN av
-                WHERE pv.total_qty > av.avg_total
-                ORDER BY pv.total_qty DESC;
-                """
-                nested_rows = query_dicts(sql, (camp_id, the_date))
+                nested_rows = cached_report(action, f)
 
             elif action == "join":
-                d_from = f("join_from")
-                d_to   = f("join_to")
-                camp   = f("join_camp")
-                where  = "a.DistDate BETWEEN %s AND %s"
-                params = [d_from, d_to]
-                if camp:
-                    where += " AND vic.CampID = %s"
-                    params.append(camp)
-                sql = f"""
-                SELECT a.DistDate AS Date,
-                       vol.Name   AS Volunteer,
-                       vic.Name   AS Victim,
-                       r.ItemName AS Resource,
-                       a.Qty,
-                       vic.CampID AS CampID
-                FROM AidDistribution a
-                JOIN Volunteer vol ON vol.VolunteerID = a.VolunteerID
-                JOIN Victim    vic ON vic.VictimID    = a.VictimID
-                JOIN Resource  r   ON r.ResourceID    = a.ResourceID
-                WHERE {where}
-                ORDER BY a.DistDate, vic.VictimID, r.ItemName;
-                """
-                join_rows = query_dicts(sql, tuple(params))
+                join_rows = cached_report(action, f)
 
             elif action == "aggregate":
-                camp_id = f("agg_camp")
-                d_from  = f("agg_from")
-                d_to    = f("agg_to")
-                sql = """
-                SELECT r.ItemName AS Resource, SUM(a.Qty) AS TotalQty
-                FROM AidDistribution a
-                JOIN Victim   v ON v.VictimID   = a.VictimID
-                JOIN Resource r ON r.ResourceID = a.ResourceID
-                WHERE v.CampID = %s AND a.DistDate BETWEEN %s AND %s
-                GROUP BY r.ItemName
-                ORDER BY r.ItemName;
-                """
-                agg_rows = query_dicts(sql, (camp_id, d_from, d_to))
+                agg_rows = cached_report(action, f)
         except Exception as e:
             notice = f"❌ Query failed: {e}"
 
@@ -455,7 +2787,664 @@ def queries():
     )
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Auto-launch browser
+# Aid rollups  → AidDailyRollup / AidVictimDaily, maintained by the
+# ai_aiddist_rollup / ad_aiddist_rollup triggers (migrations/0000); this rebuilds them.
+# ─────────────────────────────────────────────────────────────────────────────
+# Camp each victim-day is already booked to. The triggers book aid to the victim's
+# camp at distribution time and ad_aiddist_rollup reads it back from here, so a
+# rebuild keeps it; only rows with no booking yet (loaded behind the triggers'
+# back) fall back to the victim's current camp, the only camp known for them.
+ROLLUP_BOOKED = """
+    SELECT VictimID, DistDate, MIN(CampID) AS CampID
+    FROM AidVictimDaily
+    WHERE DistDate BETWEEN %s AND %s
+    GROUP BY VictimID, DistDate
+"""
+ROLLUP_BOOKED_TABLE = "AidBookedCamp"           # TEMPORARY, per connection
+
+ROLLUP_REBUILD = [
+    ("AidDailyRollup", f"""
+        INSERT INTO AidDailyRollup (CampID, ResourceID, DistDate, TotalQty, VictimCount, RowCount)
+        SELECT COALESCE(b.CampID, v.CampID), a.ResourceID, a.DistDate,
+               SUM(a.Qty), COUNT(DISTINCT a.VictimID), COUNT(*)
+        FROM AidDistribution a
+        JOIN Victim v ON v.VictimID = a.VictimID
+        LEFT JOIN {ROLLUP_BOOKED_TABLE} b ON b.VictimID = a.VictimID AND b.DistDate = a.DistDate
+        WHERE a.DistDate BETWEEN %s AND %s AND COALESCE(b.CampID, v.CampID) IS NOT NULL
+        GROUP BY COALESCE(b.CampID, v.CampID), a.ResourceID, a.DistDate
+    """),
+    ("AidVictimDaily", f"""
+        INSERT INTO AidVictimDaily (CampID, DistDate, VictimID, TotalQty, RowCount)
+        SELECT COALESCE(b.CampID, v.CampID), a.DistDate, a.VictimID, SUM(a.Qty), COUNT(*)
+        FROM AidDistribution a
+        JOIN Victim v ON v.VictimID = a.VictimID
+        LEFT JOIN {ROLLUP_BOOKED_TABLE} b ON b.VictimID = a.VictimID AND b.DistDate = a.DistDate
+        WHERE a.DistDate BETWEEN %s AND %s AND COALESCE(b.CampID, v.CampID) IS NOT NULL
+        GROUP BY COALESCE(b.CampID, v.CampID), a.DistDate, a.VictimID
+    """),
+]
+
+def rebuild_rollups(d_from="1000-01-01", d_to="9999-12-31"):
+    """
+    Recompute both rollups for a date range in one transaction.
+    Victim-days keep the camp they were booked to (ROLLUP_BOOKED); the rest
+    go to the victim's current camp.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    counts = {}
+    try:
+        cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {ROLLUP_BOOKED_TABLE}")
+        cur.execute(f"CREATE TEMPORARY TABLE {ROLLUP_BOOKED_TABLE} (PRIMARY KEY (VictimID, DistDate)) "
+                    + ROLLUP_BOOKED, (d_from, d_to))
+        for table, insert_sql in ROLLUP_REBUILD:
+            cur.execute(f"DELETE FROM {table} WHERE DistDate BETWEEN %s AND %s", (d_from, d_to))
+            cur.execute(insert_sql, (d_from, d_to))
+            counts[table] = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {ROLLUP_BOOKED_TABLE}")
+        except mysql.connector.Error:
+            pass
+        cur.close()
+    return counts
+
+@bp.cli.command("rollup-rebuild")
+@click.option("--from", "d_from", default="1000-01-01", help="First DistDate to rebuild (YYYY-MM-DD).")
+@click.option("--to", "d_to", default="9999-12-31", help="Last DistDate to rebuild (YYYY-MM-DD).")
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def rollup_rebuild_cmd(d_from, d_to, account):
+    """Backfill / rebuild the aid rollup tables from AidDistribution."""
+    use_cli_account(account)
+    started = time.monotonic()
+    for table, n in rebuild_rollups(d_from, d_to).items():
+        click.echo(f"{table}: {n} rows")
+    click.echo(f"done in {time.monotonic() - started:.2f}s")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Report export (all roles)  → streamed CSV / NDJSON, constant memory
+# ─────────────────────────────────────────────────────────────────────────────
+EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def json_default(v):
+    if isinstance(v, Decimal):
+        return int(v) if v == v.to_integral_value() else float(v)
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return str(v)
+
+def _export_chunks(fmt, cols, first, rows, batch=DEFAULTS["FETCH_BATCH"]):
+    """
+    Header (CSV) goes out straight away; after that rows are written in
+    `batch`-sized chunks so each yield is a reasonable network write.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf) if fmt == "csv" else None
+    if writer:
+        writer.writerow(cols)
+        yield buf.getvalue()
+        buf.seek(0); buf.truncate()
+
+    def write(row):
+        if writer:
+            writer.writerow([row[c] for c in cols])
+        else:
+            buf.write(json.dumps({c: row[c] for c in cols}, default=json_default))
+            buf.write("\n")
+
+    if first is None:
+        return
+    write(first)
+    n = 1
+    for row in rows:
+        write(row)
+        n += 1
+        if n % batch == 0:
+            yield buf.getvalue()
+            buf.seek(0); buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+@bp.get("/queries/export/<string:report>.<string:fmt>")
+@login_required(any_of=("Admin", "Operator", "Viewer"))
+def export_report(report, fmt):
+    if report not in REPORT_COLUMNS or fmt not in EXPORT_MIMETYPES:
+        flash("Unknown report or export format.", "danger")
+        return redirect(url_for("relief.queries"))
+
+    def f(name):
+        return (request.args.get(name) or "").strip()
+
+    try:
+        rows = iter_dicts(*report_query(report, f))
+        first = next(rows, None)        # runs the query now, so errors still get a normal page
+    except Exception as e:
+        flash(f"Export failed: {e}", "danger")
+        return redirect(url_for("relief.queries"))
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return Response(
+        stream_with_context(_export_chunks(fmt, REPORT_COLUMNS[report], first, rows, cfg("FETCH_BATCH"))),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{report}-{stamp}.{fmt}"',
+            "X-Accel-Buffering": "no",          # don't let a reverse proxy buffer the stream
+        },
+    )
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON API (read-only, versioned)
+# Validators come from the TableVersion counters that triggers bump on every
+# write, by any worker or client (migrations/0009_table_versions.sql). A poll
+# whose ETag / Last-Modified still matches costs one PK range read, no payload.
+# ─────────────────────────────────────────────────────────────────────────────
+TABLE_VERSIONS_SQL = """
+    SELECT TableName, SUM(Version) AS Version, UNIX_TIMESTAMP(MAX(ChangedAt)) AS ChangedAt
+    FROM TableVersion
+    WHERE TableName IN ({names})
+    GROUP BY TableName
+"""
+
+class TableVersions:
+    """
+    Reads the shared per-table versions for this app. They are read on the
+    request's own connection, so they come from the same snapshot as the
+    payload. When one has moved since this worker last looked, its caches
+    over that table are dropped (note_write), so a payload never mixes in a
+    view older than the version it is tagged with.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = {}                 # table -> version this worker last saw
+        self.available = True           # False once TableVersion turns out to be missing
+
+    def stamp(self, tables):
+        """(version key, last-modified epoch seconds) for a payload reading `tables`; None without 0009."""
+        if not self.available:
+            return None
+        tables = sorted(tables)
+        try:
+            rows = query_dicts(TABLE_VERSIONS_SQL.format(names=_placeholders(len(tables))), tables)
+        except mysql.connector.Error as e:
+            if e.errno != 1146:
+                raise
+            self.available = False
+            logging.getLogger("relief").warning("TableVersion is missing (migration 0009); "
+                                                "API responses go out without validators")
+            return None
+        found = {r["TableName"]: r for r in rows}
+        versions = [(t, int(found[t]["Version"]) if t in found else 0) for t in tables]
+        with self._lock:
+            moved = [t for t, v in versions if self._seen.get(t) != v]
+            self._seen.update(versions)
+        for t in moved:
+            note_write(t)
+        modified = max((float(r["ChangedAt"]) for r in rows if r["ChangedAt"] is not None), default=0.0)
+        return json.dumps(versions), modified
+
+def api_error(message, status):
+    return json_response({"error": message}, status=status)
+
+def api_login_required(role=None):
+    """login_required for the API: JSON 401 / 403 instead of a redirect."""
+    def wrapper(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            if "db_user" not in session:
+                return api_error("not logged in", 401)
+            if role and session.get("role") != role:
+                return api_error(f"{role} only", 403)
+            return fn(*args, **kwargs)
+        return inner
+    return wrapper
+
+def api_response(tables, build):
+    """
+    Conditional JSON response for a payload that reads `tables`.
+    build() makes the payload and is only called when the client's copy is stale.
+    ETags are strong (same versions → same bytes) and differ per content
+    encoding: the gzip body is tagged "<etag>-gzip".
+    """
+    headers = {"Vary": "Accept-Encoding, Cookie", "Cache-Control": "private, no-cache"}
+    stamp = state().table_versions.stamp(tables)
+    etag = modified = None
+    if stamp is not None:
+        version, modified = stamp
+        key = json.dumps([version, session.get("db_user"), request.path, sorted(request.args.items(multi=True))])
+        etag = hashlib.sha1(key.encode()).hexdigest()[:24]
+
+        not_modified = None
+        if request.if_none_match:
+            for candidate in (etag, etag + "-gzip"):     # one ETag per encoding
+                if request.if_none_match.contains_weak(candidate):
+                    not_modified = candidate
+                    break
+        elif request.if_modified_since and int(modified) <= request.if_modified_since.timestamp():
+            not_modified = etag + "-gzip" if "gzip" in request.accept_encodings else etag
+        if not_modified:
+            resp = Response(status=304, headers=headers)
+            resp.set_etag(not_modified)
+            resp.last_modified = modified
+            return resp
+
+    try:
+        payload = build()
+    except Exception as e:
+        return api_error(str(e), 500)
+    body = json.dumps(payload, default=json_default).encode()
+    resp = Response(body, mimetype="application/json", headers=headers)
+    gzipped = len(body) >= cfg("API_GZIP_MIN") and "gzip" in request.accept_encodings
+    if gzipped:
+        resp.set_data(gzip.compress(body, compresslevel=5, mtime=0))    # mtime=0: same bytes every time
+        resp.headers["Content-Encoding"] = "gzip"
+    if etag is not None:
+        resp.set_etag(etag + "-gzip" if gzipped else etag)
+        if modified:
+            resp.last_modified = modified
+    return resp
+
+@bp.get("/api/v1/dashboard")
+@api_login_required()
+def api_dashboard():
+    return api_response(set(DASHBOARD_COUNTS.values()), state().dashboard.stats)
+
+@bp.get("/api/v1/aid/recent")
+@api_login_required()
+def api_recent_aid():
+    return api_response(RECENT_AID_TABLES, lambda: {"aid": state().dashboard.recent_aid()})
+
+@bp.get("/api/v1/tables/<string:tab>")
+@api_login_required(role="Admin")              # same rule as /crud
+def api_table(tab):
+    """
+    One keyset page: ?<column>=<value> filters (CRUD_FILTERS columns only), ?after=<pk
+    part>... from the last response's "next", ?size=<rows> (max API_MAX_PAGE).
+    """
+    if tab not in TABLES:
+        return api_error(f"unknown table: {tab}", 404)
+    table, pk, cols = TABLES[tab]
+    try:
+        size = max(1, min(int(request.args.get("size") or cfg("CRUD_PAGE_SIZE")), cfg("API_MAX_PAGE")))
+    except ValueError:
+        return api_error("size must be a number", 400)
+
+    def build():
+        filterable = CRUD_FILTERS.get(tab, pk_cols(pk))
+        filters = {c: (request.args.get(c) or "").strip() for c in filterable}
+        page = KeysetPage(table, pk, cols, filters=filters, after=request.args.getlist("after"),
+                          size=size, filterable=filterable)
+        rows = list(page)
+        return {"table": table, "key": list(page.keys), "rows": rows, "next": page.next_key}
+    return api_response({table}, build)
+
+@bp.get("/api/v1/reports/<string:report>")
+@api_login_required()
+def api_report(report):
+    """Same query-string fields as /queries/export (nested_camp, join_from, agg_to, ...)."""
+    if report not in REPORT_COLUMNS:
+        return api_error(f"unknown report: {report}", 404)
+
+    def f(name):
+        return (request.args.get(name) or "").strip()
+
+    return api_response(REPORT_TABLES[report],
+                        lambda: {"report": report, "columns": REPORT_COLUMNS[report],
+                                 "rows": cached_report(report, f)})
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metrics (Prometheus text format)
+# ─────────────────────────────────────────────────────────────────────────────
+@bp.get("/metrics")
+def metrics():
+    token = cfg("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    lines = [m.render() for m in METRICS.values()]
+    lines.append("# HELP relief_db_pool_idle Idle pooled connections per MySQL user.")
+    lines.append("# TYPE relief_db_pool_idle gauge")
+    for user, pool in state().pools.items():
+        lines.append(f'relief_db_pool_idle{{db_user="{_label_escape(user)}"}} {len(pool._idle)}')
+    cache = state().report_cache.snapshot()
+    lines.append("# HELP relief_report_cache_events_total /queries result cache events.")
+    lines.append("# TYPE relief_report_cache_events_total counter")
+    for event in ("hits", "misses", "evictions", "expirations", "invalidations", "uncacheable"):
+        lines.append(f'relief_report_cache_events_total{{event="{event}"}} {cache[event]}')
+    lines.append("# HELP relief_report_cache_entries Entries currently in the /queries result cache.")
+    lines.append("# TYPE relief_report_cache_entries gauge")
+    lines.append(f"relief_report_cache_entries {cache['entries']}")
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Schema migrations  → migrations/NNNN_name.sql, applied in order by `flask db-migrate`
+# ─────────────────────────────────────────────────────────────────────────────
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+def split_sql_script(text):
+    """
+    Split a .sql file into statements. Honours DELIMITER so trigger /
+    procedure bodies can be written the same way as in disaster_relief.sql.
+    """
+    delim, buf, out = ";", [], []
+    in_comment = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not buf and (in_comment or stripped.startswith("/*")):
+            in_comment = not stripped.endswith("*/")       # skip /* ... */ between statements
+            continue
+        if stripped.upper().startswith("DELIMITER "):
+            delim = stripped.split(None, 1)[1]
+            continue
+        if not buf and (not stripped or stripped.startswith("--")):
+            continue
+        buf.append(line)
+        if stripped.endswith(delim):
+            stmt = "\n".join(buf).rstrip()[:-len(delim)].strip()
+            if stmt:
+                out.append(stmt)
+            buf = []
+    tail = "\n".join(buf).strip()
+    if tail:
+        out.append(tail)
+    return out
+
+def list_migrations():
+    """[(version, path)] sorted by version; version is the file name without .sql"""
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    names = sorted(n for n in os.listdir(MIGRATIONS_DIR) if n.endswith(".sql"))
+    return [(n[:-4], os.path.join(MIGRATIONS_DIR, n)) for n in names]
+
+def _checksum(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def applied_migrations():
+    execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+          Version   VARCHAR(100) PRIMARY KEY,
+          Checksum  CHAR(64)     NOT NULL,
+          AppliedAt DATETIME     NOT NULL
+        )
+    """)
+    return {r["Version"]: r["Checksum"] for r in query_dicts("SELECT Version, Checksum FROM SchemaMigrations")}
+
+def apply_migrations(echo=print):
+    """
+    Apply every migration not yet recorded in SchemaMigrations.
+    DDL commits implicitly in MySQL, so each file is recorded right after it runs;
+    a failure stops the run and leaves later files pending.
+    """
+    applied = applied_migrations()
+    done = []
+    for version, path in list_migrations():
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+        if version in applied:
+            if applied[version] != _checksum(text):
+                echo(f"! {version} was edited after it was applied (checksum differs)")
+            continue
+        echo(f"→ {version}")
+        conn = get_conn()
+        cur = conn.cursor()
+        try:
+            for stmt in split_sql_script(text):
+                cur.execute(stmt)
+            cur.execute(
+                "INSERT INTO SchemaMigrations (Version, Checksum, AppliedAt) VALUES (%s, %s, NOW())",
+                (version, _checksum(text)),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        done.append(version)
+    return done
+
+@bp.cli.command("db-migrate")
+@click.option("--status", is_flag=True, help="Only list applied / pending migrations.")
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def db_migrate_cmd(status, account):
+    """Apply pending schema migrations from migrations/."""
+    use_cli_account(account)
+    if status:
+        applied = applied_migrations()
+        for version, _ in list_migrations():
+            click.echo(f"{'applied' if version in applied else 'pending'}  {version}")
+        return
+    done = apply_migrations(echo=click.echo)
+    click.echo(f"{len(done)} migration(s) applied." if done else "Schema is up to date.")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Query plan check  → `flask explain-check`
+#   EXPLAINs every statement the app (and its triggers / functions) issues,
+#   with sample parameters from the seed data, and fails on full scans.
+# ─────────────────────────────────────────────────────────────────────────────
+SAMPLE = {"camp": 101, "victim": 301, "volunteer": 201, "resource": 401,
+          "date": "2024-07-04", "from": "2024-07-01", "to": "2024-07-31"}
+
+# Filters whose index isn't in PK order, and why sorting their rows per page is fine
+CRUD_FILTER_SORTS = {
+    ("AidDistribution", "VictimID"): {
+        "filesort": "ix_aid_victim_date orders by date; one victim's aid history is small"},
+}
+
+def app_queries():
+    """
+    [(name, sql, params, allowed)] — allowed maps a table alias to the reason
+    a full scan of it is acceptable ("filesort" → why a sort under LIMIT is).
+    """
+    out = [
+        ("dashboard.stats", DASHBOARD_STATS_SQL, (),
+         {table: "COUNT(*) is a full index scan by nature; cached by DashboardSummary"
+          for table in DASHBOARD_COUNTS.values()}),
+        ("dashboard.recent_aid", RECENT_AID_SQL, (), {}),
+        ("api.table_versions", TABLE_VERSIONS_SQL.format(names=_placeholders(2)), ("Victim", "Resource"), {}),
+        ("feed.epoch", FEED_EPOCH_SQL, (), {"AidFeedEpoch": "one row"}),
+        ("feed.tail", FEED_TAIL_SQL, (100,), {}),
+        ("feed.poll", FEED_POLL_SQL, (AidFeed.SETTLE, 0, AidFeed.POLL_LIMIT), {}),
+    ]
+
+    form = {
+        "nested_camp": SAMPLE["camp"], "nested_date": SAMPLE["date"],
+        "join_from": SAMPLE["from"], "join_to": SAMPLE["to"], "join_camp": "",
+        "agg_camp": SAMPLE["camp"], "agg_from": SAMPLE["from"], "agg_to": SAMPLE["to"],
+    }
+    for report in REPORT_COLUMNS:
+        out.append((f"queries.{report}", *report_query(report, lambda n: str(form.get(n, ""))), {}))
+    form["join_camp"] = SAMPLE["camp"]
+    out.append(("queries.join+camp", *report_query("join", lambda n: str(form.get(n, ""))), {}))
+
+    for tab, (table, pk, cols) in TABLES.items():
+        keys = pk_cols(pk)
+        first = KeysetPage(table, pk, cols)
+        out.append((f"crud.{tab}.first_page", first.sql, first.params, {}))
+        seek = KeysetPage(table, pk, cols, after=["0"] * len(keys))
+        out.append((f"crud.{tab}.next_page", seek.sql, seek.params, {}))
+        where = " AND ".join(f"{k}=%s" for k in keys)
+        out.append((f"crud.{tab}.delete", f"DELETE FROM {table} WHERE {where}", ["0"] * len(keys), {}))
+        for c in CRUD_FILTERS.get(tab, ()):
+            if c != keys[0]:
+                page = KeysetPage(table, pk, cols, filters={c: "0"}, filterable=(c,))
+                out.append((f"crud.{tab}.filter_{c}", page.sql, page.params,
+                            CRUD_FILTER_SORTS.get((tab, c), {})))
+
+    out.append(("dbops.trig_after_delete", AID_DELETE_LATEST_SQL,
+                (SAMPLE["volunteer"], SAMPLE["victim"], SAMPLE["resource"]), {}))
+    out.append(("camps.overview", *camp_overview_query(), {
+        "c": "the overview lists every camp; CampCounters is joined by PK"}))
+    out.append(("camps.overview.district", *camp_overview_query(district="Chennai"), {}))
+    low_sort = "sorts by computed days of cover; bounded by the LowStock watchlist"
+    out.append(("stock.low", *low_stock_query(), {"l": "LowStock only holds the pairs on the watchlist",
+                                                  "filesort": low_sort}))
+    out.append(("stock.low.camp", *low_stock_query(camp=SAMPLE["camp"]), {"filesort": low_sort}))
+    two = _placeholders(2)
+    out += [
+        ("batch.camp_victims", BATCH_CAMP_VICTIMS_SQL, (SAMPLE["camp"],), {}),
+        ("batch.victims", BATCH_VICTIMS_SQL.format(ids=two), (SAMPLE["victim"], SAMPLE["victim"] + 1), {}),
+        ("batch.refs", BATCH_REFS_SQL, (SAMPLE["volunteer"], SAMPLE["resource"]), {}),
+        ("batch.duplicates", BATCH_DUPLICATES_SQL.format(ids=two),
+         (SAMPLE["volunteer"], SAMPLE["victim"], SAMPLE["victim"] + 1, SAMPLE["resource"], SAMPLE["date"]), {}),
+        ("batch.stock", BATCH_STOCK_SQL.format(ids=two), (SAMPLE["resource"], SAMPLE["camp"], SAMPLE["camp"]), {}),
+    ]
+    out += [
+        ("victim_index.camps", VICTIM_CAMPS_SQL, (),
+         {"ReliefCamp": "loads every camp name into the search index"}),
+        ("victim_index.build", VICTIM_ROWS_SQL, (),
+         {"Victim": "loads every victim into the search index, once per worker (or master)"}),
+        ("victim_index.changes", VICTIM_CHANGES_SQL, (SAMPLE["date"], cfg("VICTIM_CATCHUP_MAX") + 1), {}),
+        ("victim_index.refetch", VICTIM_REFETCH_SQL.format(ids=two), (SAMPLE["victim"], SAMPLE["victim"] + 1), {}),
+    ]
+    out.append(("feed.aid_row", AID_FEED_ROW,
+                (SAMPLE["volunteer"], SAMPLE["victim"], SAMPLE["resource"], SAMPLE["date"]), {}))
+    out += [
+        ("intake.exists.distribute", INTAKE_OPS["distribute"].exists_sql,
+         (SAMPLE["volunteer"], SAMPLE["victim"], SAMPLE["resource"], SAMPLE["date"]), {}),
+        ("intake.exists.assign_volunteer", INTAKE_OPS["assign_volunteer"].exists_sql,
+         (SAMPLE["camp"], SAMPLE["volunteer"], SAMPLE["date"]), {}),
+    ]
+    out.append(("rollup.rebuild.booked", ROLLUP_BOOKED, (SAMPLE["from"], SAMPLE["to"]), {}))
+    for table, insert_sql in ROLLUP_REBUILD:
+        # The temporary table only exists inside rebuild_rollups; EXPLAIN the same
+        # statement reading ROLLUP_BOOKED as a derived table in its place.
+        select_sql = insert_sql[insert_sql.index("SELECT"):].replace(
+            f"{ROLLUP_BOOKED_TABLE} b", f"({ROLLUP_BOOKED}) b")
+        out.append((f"rollup.rebuild.{table}", select_sql, (SAMPLE["from"], SAMPLE["to"]) * 2, {}))
+
+    # Statements inside functions / triggers (EXPLAIN can't see through CALL or fn()).
+    out += [
+        ("fn.camp_occupancy_for.capacity", "SELECT Capacity FROM ReliefCamp WHERE CampID = %s", (SAMPLE["camp"],), {}),
+        ("fn.camp_counters.victims", "SELECT Victims FROM CampCounters WHERE CampID = %s", (SAMPLE["camp"],), {}),
+        ("trg.stock.victim_camp", "SELECT CampID FROM Victim WHERE VictimID = %s", (SAMPLE["victim"],), {}),
+        ("trg.stock.update", "UPDATE Stocked_At SET CurrentQty = CurrentQty - 1 WHERE CampID = %s AND ResourceID = %s",
+         (SAMPLE["camp"], SAMPLE["resource"]), {}),
+        ("proc.end_bulk_aid", "SELECT 1 FROM BulkAidGrant WHERE ConnID = CONNECTION_ID()", (), {}),
+        ("trg.stock.bulk_grant", "UPDATE BulkAidGrant SET Remaining = Remaining - 1 "
+         "WHERE ConnID = CONNECTION_ID() AND CampID = %s AND ResourceID = %s AND Remaining >= 1",
+         (SAMPLE["camp"], SAMPLE["resource"]), {}),
+        ("trg.rollup.same_day", """
+            SELECT 1 FROM AidDistribution
+            WHERE VictimID = %s AND ResourceID = %s AND DistDate = %s AND VolunteerID <> %s
+        """, (SAMPLE["victim"], SAMPLE["resource"], SAMPLE["date"], SAMPLE["volunteer"]), {}),
+        ("trg.rollup.booked_camp", "SELECT CampID FROM AidVictimDaily WHERE VictimID = %s AND DistDate = %s LIMIT 1",
+         (SAMPLE["victim"], SAMPLE["date"]), {}),
+    ]
+    return out
+
+def explain_problems(sql, params, allowed, strict=False):
+    """
+    EXPLAIN one statement and describe any full scans in its plan.
+      type=ALL   → full table scan. Fails if no index was even possible; with
+                   candidate keys it is the optimizer preferring a scan on a
+                   tiny table, reported only under strict.
+      type=index → full index scan; fine under a LIMIT with nothing left to filter
+                   (reads only that many entries). With "Using where" it may read
+                   the whole index to find them, so it fails.
+      filesort   → under a LIMIT the rows come out of a sort, not off an index, so
+                   every matching row is read before the first one is returned
+                   (a keyset page then costs as much as the whole filter). Fails
+                   unless allowed has a "filesort" reason; with no LIMIT only under strict.
+    """
+    problems = []
+    has_limit = re.search(r"\bLIMIT\s+\d+", sql, re.I) is not None
+    for row in query_dicts("EXPLAIN " + sql.strip().rstrip(";"), params):
+        table = row.get("table") or ""
+        if not table or table.startswith("<") or table in allowed:
+            continue
+        kind = row.get("type")
+        extra = row.get("Extra") or ""
+        if kind == "ALL" and (strict or not row.get("possible_keys")):
+            problems.append(f"full table scan of {table} (rows≈{row.get('rows')}, "
+                            f"possible_keys={row.get('possible_keys')})")
+        elif kind == "index" and (not has_limit or "Using where" in extra):
+            problems.append(f"full index scan of {table} via {row.get('key')} (rows≈{row.get('rows')})")
+        if "Using filesort" in extra and (has_limit or strict) and "filesort" not in allowed:
+            problems.append(f"filesort on {table} via {row.get('key')} (rows≈{row.get('rows')})")
+    return problems
+
+@bp.cli.command("explain-check")
+@click.option("--strict", is_flag=True, help="Also fail when the optimizer picks a scan despite usable keys.")
+@click.option("--account", default="admin", show_default=True, help="A LOGIN_ACCOUNTS name.")
+def explain_check_cmd(strict, account):
+    """EXPLAIN every app query; exit 1 if any falls back to a full scan."""
+    use_cli_account(account)
+    failed = 0
+    for name, sql, params, allowed in app_queries():
+        try:
+            problems = explain_problems(sql, params, allowed, strict)
+        except mysql.connector.Error as e:
+            problems = [f"EXPLAIN failed: {e}"]
+        if problems:
+            failed += 1
+            click.echo(f"FAIL {name}")
+            for p in problems:
+                click.echo(f"     {p}")
+        else:
+            click.echo(f"ok   {name}")
+    if failed:
+        raise SystemExit(1)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# App factory  → wsgi.py, `flask --app app ...`, bench.py / seed_data.py, tests
+# ─────────────────────────────────────────────────────────────────────────────
+class ReliefState:
+    """
+    What one app shares between its requests: MySQL pools, caches, the aid
+    feed hub and the write listeners that keep them exact.
+    Lives in app.extensions["relief"]; state() returns the current one.
+    """
+    def __init__(self, app):
+        c = app.config
+        self.pools = PoolRegistry(size=c["POOL_SIZE"], timeout=c["POOL_TIMEOUT"],
+                                  recycle=c["POOL_RECYCLE"], ping_idle=c["POOL_PING_IDLE"])
+        self.dashboard = DashboardSummary(ttl=c["DASHBOARD_TTL"])
+        self.aid_feed = AidFeed(app, backlog=c["FEED_BACKLOG"], max_clients=c["FEED_MAX_CLIENTS"],
+                                poll=c["FEED_POLL"])
+        self.victim_index = VictimIndex(app, ttl=c["VICTIM_INDEX_TTL"], poll=c["VICTIM_INDEX_POLL"],
+                                        changes_keep=c["VICTIM_CHANGES_KEEP"],
+                                        catchup_max=c["VICTIM_CATCHUP_MAX"], scan=c["VICTIM_SEARCH_SCAN"])
+        self.report_cache = ReportCache(size=c["REPORT_CACHE_SIZE"], ttl=c["REPORT_CACHE_TTL"],
+                                        max_rows=c["REPORT_CACHE_MAX_ROWS"])
+        self.table_versions = TableVersions()
+        self.intake = None
+        if c["INTAKE_JOURNAL"]:
+            self.intake = IntakeJournal(c["INTAKE_JOURNAL"], app, batch=c["INTAKE_BATCH"],
+                                        retry_max=c["INTAKE_RETRY_MAX"], lease=c["INTAKE_LEASE"],
+                                        keep_days=c["INTAKE_KEEP_DAYS"])
+        self.write_listeners = []
+        for cache in (self.dashboard, self.victim_index, self.report_cache):
+            self.on_write(cache.note_write)
+
+    def on_write(self, fn):
+        """Call fn(table, delta) on every note_write() in this app."""
+        self.write_listeners.append(fn)
+        return fn
+
+def create_app(config=None):
+    """
+    Build an app: settings from the environment (config_from_env()) with
+    `config` laid over them, then its pools, caches and hubs (ReliefState).
+    Nothing connects to MySQL here; pools open on first use.
+    """
+    app = Flask(__name__)
+    app.config.update(config_from_env())
+    app.config.update(config or {})
+    if "LOGIN_ACCOUNTS" not in app.config:
+        path = app.config["RELIEF_ACCOUNTS"]
+        app.config["LOGIN_ACCOUNTS"] = load_accounts(path) if path else LOGIN_ACCOUNTS
+    if app.config["SLOW_QUERY_LOG"]:
+        _log_slow_queries_to(app.config["SLOW_QUERY_LOG"])
+    app.register_blueprint(bp)
+    app.teardown_appcontext(_release_conn)
+    app.extensions["relief"] = ReliefState(app)
+    return app
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Dev server + auto-launch browser (python app.py only)
 # ─────────────────────────────────────────────────────────────────────────────
 def _open_browser():
     try:
@@ -464,5 +3453,6 @@ def _open_browser():
         webbrowser.open("http://127.0.0.1:5000/", new=2)
 
 if __name__ == "__main__":
-    Timer(0.6, _open_browser).start()
-    app.run(debug=True)
+    if not os.environ.get("WERKZEUG_RUN_MAIN"):  # the reloader re-runs this file; open one tab
+        Timer(0.6, _open_browser).start()
+    create_app().run(debug=True)
@@ -0,0 +1,421 @@
+"""
+Route-level load benchmark, driven through the Flask test client.
+
+    python seed_data.py --victims 1000000 --distributions 20000000   # once
+    python bench.py --concurrency 16 --requests 400
+    python bench.py --compare bench_results/<older>.json
+    python bench.py --url http://127.0.0.1:8000          # a running server (dev or gunicorn)
+
+Every page, JSON API endpoint and dbops action runs as a scenario; left out
+are /logout, /metrics, the /feed/aid event stream (one long-lived response,
+not a request rate) and /intake (only there with INTAKE_JOURNAL). Each one is hit
+--requests times from --concurrency threads, and we record p50/p95/p99
+latency, throughput and DB statements per request. Results are written to
+bench_results/<timestamp>-<commit>.json so runs on different commits can be
+diffed with --compare.
+
+By default requests go through the Flask test client in this process. With
+--url they go over HTTP (one keep-alive connection per thread) to a running
+server, and statements per request come from its X-DB-Queries header (which
+misses statements run while a streamed body is sent). Running the same
+scenarios against `python app.py` and gunicorn compares the two servers.
+
+Write scenarios use dates from BENCH_DATE onwards and IDs from BENCH_ID
+onwards, and they are cleaned up afterwards. Scenarios that delete rows only
+ever see rows a setup step inserted for them (BENCH_VICTIM's aid). Scenarios
+that hand out aid first lend the sample camp the stock they need; cleanup()
+deletes their rows (the triggers put the stock back) and takes the loan back.
+"""
+import http.client, io, json, os, subprocess, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import count
+from urllib.parse import urlencode, urlsplit
+
+import click
+
+import app as relief
+
+flask_app = relief.create_app()      # settings from the environment, like wsgi.py
+
+BENCH_DATE = date(2100, 1, 1)
+BENCH_ID   = 1_900_000_000
+BENCH_VICTIM = BENCH_ID + 99_999_999    # owns the rows dbops.trig_after_delete deletes
+IMPORT_ROWS = 20                        # Victim rows per /import request
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Statement counting (per thread; the test client runs each request on the caller's thread)
+# ─────────────────────────────────────────────────────────────────────────────
+_counts = threading.local()
+
+def _counting(fn):
+    def wrapped(*args, **kwargs):
+        _counts.n = getattr(_counts, "n", 0) + 1
+        return fn(*args, **kwargs)
+    return wrapped
+
+for _name in ("query_dicts", "iter_dicts", "execute", "scalar", "call_proc"):
+    setattr(relief, _name, _counting(getattr(relief, _name)))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Scenarios
+# ─────────────────────────────────────────────────────────────────────────────
+class Scenario:
+    def __init__(self, name, role, method, path, data=None, expect_error=False, setup=None, expect=None):
+        self.name = name
+        self.role = role
+        self.method = method
+        self.path = path
+        self.data = data            # dict, or callable(n) → dict for per-request values
+        self.expect_error = expect_error
+        self.setup = setup          # callable(requests, base_url), run before the timed requests
+        self.expect = expect        # text a successful response must contain (else it's an error)
+
+    def form(self, n):
+        return self.data(n) if callable(self.data) else self.data
+
+
+def sample_ids():
+    """IDs that exist and have stock, so the write scenarios can succeed."""
+    with flask_app.app_context():
+        relief.use_cli_account("admin")
+        row = relief.query_dicts("""
+            SELECT v.VictimID, v.Name, v.CampID, s.ResourceID, a.VolunteerID
+            FROM Victim v
+            JOIN Stocked_At s ON s.CampID = v.CampID
+            JOIN AssignedTo a ON a.CampID = v.CampID
+            WHERE s.CurrentQty > 1000
+            LIMIT 1
+        """)
+        if not row:
+            raise click.ClickException("No camp with victims, stock and volunteers; run seed_data.py first.")
+        batch = relief.query_dicts("SELECT VictimID FROM Victim WHERE CampID = %s AND VictimID < %s "
+                                   "ORDER BY VictimID LIMIT 3", (row[0]["CampID"], BENCH_ID))
+        span = relief.query_dicts("SELECT MIN(DistDate) AS lo, MAX(DistDate) AS hi "
+                                  "FROM AidDistribution WHERE DistDate < %s", (BENCH_DATE,))[0]
+    ids = row[0]
+    ids["batch"] = [r["VictimID"] for r in batch]
+    ids["from"] = str(span["lo"] or "2024-01-01")
+    ids["to"] = str(span["hi"] or "2024-12-31")
+    return ids
+
+
+_stock_loans = []               # (camp, resource, qty) added by lend_stock, returned by cleanup()
+
+def lend_stock(ids, qty):
+    with flask_app.app_context():
+        relief.use_cli_account("admin")
+        relief.execute("UPDATE Stocked_At SET CurrentQty = CurrentQty + %s WHERE CampID = %s AND ResourceID = %s",
+                       (qty, ids["CampID"], ids["ResourceID"]))
+    _stock_loans.append((ids["CampID"], ids["ResourceID"], qty))
+
+
+def seed_bench_aid(ids, requests):
+    """
+    BENCH_VICTIM (in the sample camp) gets one aid row per request, dated from
+    BENCH_DATE, so trig_after_delete never reaches a real distribution.
+    """
+    lend_stock(ids, requests)
+    with flask_app.app_context():
+        relief.use_cli_account("admin")
+        relief.execute("INSERT IGNORE INTO Victim (VictimID, Name, CampID) VALUES (%s, %s, %s)",
+                       (BENCH_VICTIM, "Bench delete target", ids["CampID"]))
+        for n in range(requests):
+            relief.execute("INSERT IGNORE INTO AidDistribution (VolunteerID, VictimID, ResourceID, DistDate, Qty) "
+                           "VALUES (%s, %s, %s, %s, 1)",
+                           (ids["VolunteerID"], BENCH_VICTIM, ids["ResourceID"], BENCH_DATE + timedelta(days=n)))
+
+
+def warm_victim_index(requests, base_url):
+    """Wait for the worker's search index, so the scenario times lookups rather than the build."""
+    client = HttpClient(base_url, "viewer1") if base_url else TestClient("viewer1")
+    deadline = time.monotonic() + 600
+    while client.request("GET", "/victims/search", {"q": "a"})[0] == 503:
+        if time.monotonic() > deadline:
+            raise click.ClickException("victim search index not ready after 10 minutes")
+        time.sleep(1)
+
+
+def import_csv(n):
+    first = BENCH_ID + 10_000_000 + n * IMPORT_ROWS
+    lines = ["VictimID,Name,Age,Gender,CampID"]
+    lines += [f"{first + i},Bench import {n}-{i},40,M," for i in range(IMPORT_ROWS)]
+    return ("bench.csv", ("\n".join(lines) + "\n").encode())
+
+
+def build_scenarios(ids):
+    camp, victim, res, vol = ids["CampID"], ids["VictimID"], ids["ResourceID"], ids["VolunteerID"]
+    day = lambda n: str(BENCH_DATE + timedelta(days=n))
+    lend = lambda per_request: lambda requests, _: lend_stock(ids, requests * per_request)
+    name_word = ((ids.get("Name") or "").split() or ["relief"])[0]
+    reports = {
+        "nested_camp": camp, "nested_date": ids["from"],
+        "join_from": ids["from"], "join_to": ids["to"], "join_camp": camp,
+        "agg_camp": camp, "agg_from": ids["from"], "agg_to": ids["to"],
+    }
+    victim_cols = relief.TABLES["Victim"][2]
+    new_victim = lambda n: {**{c: "" for c in victim_cols}, "VictimID": BENCH_ID + n, "Name": f"Bench {n}",
+                            "Age": 30, "Gender": "F", "CampID": camp, "action": "add"}
+
+    out = [
+        Scenario("login", None, "POST", "/login", {"username": "admin", "password": "admin123"}),
+        Scenario("index", "admin", "GET", "/"),
+    ]
+    for tab in relief.TABLES:
+        out.append(Scenario(f"crud.{tab}", "admin", "GET", f"/crud/{tab}"))
+    out += [
+        Scenario("crud.Victim.add", "admin", "POST", "/crud/Victim", new_victim),
+        Scenario("crud.Victim.delete", "admin", "POST", "/crud/Victim",
+                 lambda n: {"VictimID": BENCH_ID + n, "action": "delete"}),
+        Scenario("dbops.assign_volunteer", "volunteer1", "POST", "/dbops",
+                 lambda n: {"action": "assign_volunteer", "assign_camp_id": camp,
+                            "assign_volunteer_id": vol, "assign_date": day(n)}),
+        Scenario("dbops.distribute", "volunteer1", "POST", "/dbops",
+                 lambda n: {"action": "distribute", "volunteer_id": vol, "victim_id": victim,
+                            "resource_id": res, "qty": 1, "date": day(n)}, setup=lend(1)),
+        Scenario("dbops.distribute_batch", "volunteer1", "POST", "/dbops",
+                 lambda n: {"action": "distribute_batch", "batch_volunteer_id": vol, "batch_resource_id": res,
+                            "batch_qty": 1, "batch_date": day(40_000 + n),
+                            "batch_victim_ids": ", ".join(map(str, ids["batch"]))},
+                 setup=lend(len(ids["batch"]))),
+        # Admin: operators have no DELETE on AidDistribution, so this would only time the refusal
+        Scenario("dbops.trig_after_delete", "admin", "POST", "/dbops",
+                 {"action": "trig_after_delete", "trig_volunteer_id": vol,
+                  "trig_victim_id": BENCH_VICTIM, "trig_resource_id": res},
+                 setup=lambda requests, _: seed_bench_aid(ids, requests), expect="One recent row deleted"),
+        Scenario("dbops.trig_after_insert", "volunteer1", "POST", "/dbops",
+                 lambda n: {"action": "trig_after_insert", "trig_volunteer_id": vol, "trig_victim_id": victim,
+                            "trig_resource_id": res, "trig_qty": 1, "trig_date": day(20_000 + n)},
+                 setup=lend(1)),
+        Scenario("dbops.trig_before", "volunteer1", "POST", "/dbops",
+                 lambda n: {"action": "trig_before", "trig_volunteer_id": vol, "trig_victim_id": victim,
+                            "trig_resource_id": res, "trig_date": day(n)}, expect_error=True),
+        Scenario("dbops.occ", "volunteer1", "POST", "/dbops", {"action": "occ", "occ_camp_id": camp}),
+        Scenario("dbops.count_victims", "volunteer1", "POST", "/dbops",
+                 {"action": "count_victims", "count_camp_id": camp}),
+        Scenario("import.Victim", "admin", "POST", "/import",
+                 lambda n: {"tab": "Victim", "file": import_csv(n)}),
+        Scenario("camps", "viewer1", "GET", "/camps"),
+        Scenario("camps.json", "viewer1", "GET", "/camps", {"format": "json"}),
+        Scenario("stock.low", "viewer1", "GET", "/stock/low"),
+        Scenario("victims.search", "volunteer1", "GET", "/victims/search", {"q": name_word},
+                 setup=warm_victim_index),
+        Scenario("victims.search.typo", "volunteer1", "GET", "/victims/search", {"q": name_word[:-1] + "x"}),
+        Scenario("api.dashboard", "viewer1", "GET", "/api/v1/dashboard"),
+        Scenario("api.aid.recent", "viewer1", "GET", "/api/v1/aid/recent"),
+        Scenario("api.tables.Victim", "admin", "GET", "/api/v1/tables/Victim", {"CampID": camp}),
+    ]
+    for report in relief.REPORT_COLUMNS:
+        out.append(Scenario(f"queries.{report}", "viewer1", "POST", "/queries", {**reports, "action": report}))
+        out.append(Scenario(f"export.{report}.csv", "viewer1", "GET",
+                            f"/queries/export/{report}.csv", reports))
+        out.append(Scenario(f"api.reports.{report}", "viewer1", "GET", f"/api/v1/reports/{report}", reports))
+    return out
+
+
+def cleanup():
+    with flask_app.app_context():
+        relief.use_cli_account("admin")
+        relief.execute("DELETE FROM AidDistribution WHERE DistDate >= %s", (BENCH_DATE,))
+        relief.execute("DELETE FROM AssignedTo WHERE Date >= %s", (BENCH_DATE,))
+        relief.execute("DELETE FROM Victim WHERE VictimID >= %s", (BENCH_ID,))
+        while _stock_loans:
+            camp, res, qty = _stock_loans.pop()
+            relief.execute("UPDATE Stocked_At SET CurrentQty = CurrentQty - %s WHERE CampID = %s AND ResourceID = %s",
+                           (qty, camp, res))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────────────────────────────────────
+class TestClient:
+    """Requests through the Flask test client, on the calling thread."""
+    def __init__(self, role):
+        self.client = flask_app.test_client()
+        if role:
+            account = flask_app.config["LOGIN_ACCOUNTS"][role]
+            with self.client.session_transaction() as s:
+                s["db_user"] = account["db_user"]
+                s["db_pass"] = account["db_pass"]
+                s["role"] = account["role"]
+
+    def request(self, method, path, form):
+        _counts.n = 0
+        if method == "GET":
+            resp = self.client.get(path, query_string=form)
+        else:
+            data = {k: (io.BytesIO(v[1]), v[0]) if isinstance(v, tuple) else v for k, v in (form or {}).items()}
+            resp = self.client.post(path, data=data)
+        body = resp.get_data(as_text=True)          # drains streamed responses too
+        return resp.status_code, body, _counts.n
+
+
+class HttpClient:
+    """Requests over one keep-alive HTTP connection, carrying the session cookie."""
+    def __init__(self, base_url, role):
+        url = urlsplit(base_url)
+        self.conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+        self.cookie = None
+        if role:
+            status, _, _ = self.request("POST", "/login", {"username": role,
+                                                           "password": flask_app.config["LOGIN_ACCOUNTS"][role]["password"]})
+            if status != 302:
+                raise click.ClickException(f"login as {role} failed (HTTP {status})")
+
+    def request(self, method, path, form):
+        headers, body = {}, None
+        if form and method == "GET":
+            path += "?" + urlencode(form)
+        elif form and any(isinstance(v, tuple) for v in form.values()):
+            body, headers["Content-Type"] = _multipart(form)
+        elif form:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        self.conn.request(method, path, body=body, headers=headers)
+        resp = self.conn.getresponse()
+        text = resp.read().decode("utf-8", "replace")
+        cookie = resp.getheader("Set-Cookie")
+        if cookie:
+            self.cookie = cookie.split(";", 1)[0]
+        return resp.status, text, int(resp.getheader("X-DB-Queries") or 0)
+
+
+def _multipart(form):
+    """multipart/form-data body for a form whose (filename, bytes) values are file uploads."""
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for k, v in form.items():
+        out.write(f"--{boundary}\r\n".encode())
+        if isinstance(v, tuple):
+            out.write(f'Content-Disposition: form-data; name="{k}"; filename="{v[0]}"\r\n'
+                      f"Content-Type: application/octet-stream\r\n\r\n".encode())
+            out.write(v[1])
+        else:
+            out.write(f'Content-Disposition: form-data; name="{k}"\r\n\r\n{v}'.encode())
+        out.write(b"\r\n")
+    out.write(f"--{boundary}--\r\n".encode())
+    return out.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def _failed(status, body, expect=None):
+    return status >= 500 or "❌" in body or "failed:" in body or (expect is not None and expect not in body)
+
+
+def run_scenario(sc, concurrency, requests, base_url=None):
+    seq = count()
+    local = threading.local()
+    samples, errors = [], []
+    lock = threading.Lock()
+
+    def one(_):
+        if not hasattr(local, "client"):
+            local.client = HttpClient(base_url, sc.role) if base_url else TestClient(sc.role)
+        n = next(seq)
+        started = time.perf_counter()
+        status, body, queries = local.client.request(sc.method, sc.path, sc.form(n))
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples.append((elapsed, queries))
+            if _failed(status, body, sc.expect) != sc.expect_error:
+                errors.append(n)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return summarize(sc.name, samples, len(errors), wall)
+
+
+def _pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def summarize(name, samples, errors, wall):
+    lat = sorted(s[0] * 1000 for s in samples)
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "errors": errors,
+        "p50_ms": round(_pct(lat, 50), 2),
+        "p95_ms": round(_pct(lat, 95), 2),
+        "p99_ms": round(_pct(lat, 99), 2),
+        "rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "queries_per_req": round(sum(s[1] for s in samples) / len(samples), 2) if samples else 0.0,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_table(rows, baseline=None):
+    base = {r["scenario"]: r for r in (baseline or {}).get("results", [])}
+    click.echo(f"{'scenario':32} {'req':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'q/req':>6}"
+               + ("   Δp95    Δrps" if base else ""))
+    for r in rows:
+        line = (f"{r['scenario']:32} {r['requests']:5} {r['errors']:4} {r['p50_ms']:8.2f} "
+                f"{r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['rps']:8.1f} {r['queries_per_req']:6.2f}")
+        old = base.get(r["scenario"])
+        if old and old["p95_ms"] and old["rps"]:
+            line += (f"   {(r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+6.1f}%"
+                     f" {(r['rps'] - old['rps']) / old['rps'] * 100:+6.1f}%")
+        click.echo(line)
+
+
+@click.command()
+@click.option("--concurrency", default=8, show_default=True)
+@click.option("--requests", "n_requests", default=200, show_default=True, help="Requests per scenario.")
+@click.option("--only", multiple=True, help="Run only scenarios whose name starts with this (repeatable).")
+@click.option("--compare", "compare_path", type=click.Path(exists=True, dir_okay=False),
+              help="Earlier results file to diff p95 against.")
+@click.option("--url", "base_url", default=None,
+              help="Bench a running server over HTTP instead of the in-process test client.")
+@click.option("--out", "out_path", default=None, help="Results file (default: bench_results/<time>-<commit>.json).")
+def main(concurrency, n_requests, only, compare_path, base_url, out_path):
+    ids = sample_ids()
+    scenarios = [s for s in build_scenarios(ids) if not only or s.name.startswith(tuple(only))]
+    results = []
+    try:
+        for sc in scenarios:
+            if sc.setup:
+                sc.setup(n_requests, base_url)
+            results.append(run_scenario(sc, concurrency, n_requests, base_url))
+            click.echo(f"… {sc.name}", err=True)
+    finally:
+        cleanup()
+
+    baseline = None
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print_table(results, baseline)
+
+    report = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": base_url or "test-client",
+        "concurrency": concurrency,
+        "requests_per_scenario": n_requests,
+        "sample_ids": {k: str(v) for k, v in ids.items()},
+        "results": results,
+    }
+    if not out_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out_path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json")
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    click.echo(f"saved {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -777,3 +777,9 @@ INSERT INTO Users (username, password, role) VALUES
   ('admin',      'admin123', 'Admin'),
   ('volunteer1', 'vol123',   'Operator'),
   ('viewer1',    'view123',  'Viewer');
+
+
+/* ===========================================================
+   Further schema changes live in migrations/NNNN_*.sql and are
+   applied in order with:  flask --app app db-migrate
+   =========================================================== */
@@ -0,0 +1,26 @@
+"""
+gunicorn settings for wsgi:app. Every value can be overridden on the command line.
+
+Each worker is a separate process with its own connection pools, caches and
+metrics (pools are dropped after fork, so nothing is shared with the master).
+Threads per worker default to DB_POOL_SIZE + FEED_MAX_CLIENTS: every open
+/feed/aid stream holds a thread for as long as the dashboard is open, and the
+app refuses streams past FEED_MAX_CLIENTS, so DB_POOL_SIZE threads are always
+left for ordinary requests. Keep RELIEF_THREADS at least that sum if you set it.
+"""
+import multiprocessing, os
+
+bind = os.environ.get("RELIEF_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"                  # streamed pages/exports hold a thread, not a process
+threads = int(os.environ.get("RELIEF_THREADS") or
+              int(os.environ.get("DB_POOL_SIZE", "8")) + int(os.environ.get("FEED_MAX_CLIENTS", "64")))
+timeout = int(os.environ.get("RELIEF_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get("RELIEF_MAX_REQUESTS", "5000"))    # recycle workers now and then
+max_requests_jitter = max_requests // 10
+# Import in each worker (nothing heavy runs at import), unless the victim search index
+# is to be built once in the master and shared copy-on-write (VICTIM_INDEX_PRELOAD=<account>)
+preload_app = bool(os.environ.get("VICTIM_INDEX_PRELOAD"))
+accesslog = os.environ.get("RELIEF_ACCESS_LOG", "-")
@@ -0,0 +1,148 @@
+-- 0000: aid rollups read by the aggregate / nested reports on /queries.
+--   AidDailyRollup : per camp / resource / day totals
+--   AidVictimDaily : per camp / day / victim totals
+-- Kept current by AFTER INSERT / DELETE triggers on AidDistribution. Aid is
+-- booked to the camp the victim was in when it was handed out (the same camp
+-- ai_aiddist_decrement takes stock from). Runs ahead of 0002, whose
+-- ai_aiddist_decrement PRECEDES ai_aiddist_rollup.
+-- Safe on a database that already has the rollups: tables are kept, triggers
+-- are recreated and both tables are rebuilt. Rebuild later with:
+--   flask --app app rollup-rebuild
+
+CREATE TABLE IF NOT EXISTS AidDailyRollup (
+  CampID      INT  NOT NULL,
+  ResourceID  INT  NOT NULL,
+  DistDate    DATE NOT NULL,
+  TotalQty    INT  NOT NULL DEFAULT 0,
+  VictimCount INT  NOT NULL DEFAULT 0,   -- distinct victims given this resource that day
+  RowCount    INT  NOT NULL DEFAULT 0,   -- AidDistribution rows folded in
+  PRIMARY KEY (CampID, DistDate, ResourceID)
+);
+
+CREATE TABLE IF NOT EXISTS AidVictimDaily (
+  CampID    INT  NOT NULL,
+  DistDate  DATE NOT NULL,
+  VictimID  INT  NOT NULL,
+  TotalQty  INT  NOT NULL DEFAULT 0,
+  RowCount  INT  NOT NULL DEFAULT 0,
+  PRIMARY KEY (CampID, DistDate, VictimID),
+  KEY ix_avd_victim_date (VictimID, DistDate)
+);
+
+DROP TRIGGER IF EXISTS ai_aiddist_rollup;
+
+DELIMITER $$
+CREATE TRIGGER ai_aiddist_rollup
+AFTER INSERT ON AidDistribution
+FOR EACH ROW
+FOLLOWS ai_aiddist_decrement
+BEGIN
+  DECLARE vCampID INT;
+  DECLARE vNewVictim INT DEFAULT 1;
+
+  SELECT CampID INTO vCampID
+  FROM Victim
+  WHERE VictimID = NEW.VictimID;
+
+  IF vCampID IS NOT NULL THEN
+    -- Same victim already got this resource today from another volunteer?
+    IF EXISTS (SELECT 1 FROM AidDistribution
+               WHERE VictimID = NEW.VictimID AND ResourceID = NEW.ResourceID
+                 AND DistDate = NEW.DistDate AND VolunteerID <> NEW.VolunteerID) THEN
+      SET vNewVictim = 0;
+    END IF;
+
+    INSERT INTO AidDailyRollup (CampID, ResourceID, DistDate, TotalQty, VictimCount, RowCount)
+    VALUES (vCampID, NEW.ResourceID, NEW.DistDate, NEW.Qty, vNewVictim, 1)
+    ON DUPLICATE KEY UPDATE
+      TotalQty    = TotalQty + NEW.Qty,
+      VictimCount = VictimCount + vNewVictim,
+      RowCount    = RowCount + 1;
+
+    INSERT INTO AidVictimDaily (CampID, DistDate, VictimID, TotalQty, RowCount)
+    VALUES (vCampID, NEW.DistDate, NEW.VictimID, NEW.Qty, 1)
+    ON DUPLICATE KEY UPDATE
+      TotalQty = TotalQty + NEW.Qty,
+      RowCount = RowCount + 1;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS ad_aiddist_rollup;
+
+DELIMITER $$
+CREATE TRIGGER ad_aiddist_rollup
+AFTER DELETE ON AidDistribution
+FOR EACH ROW
+FOLLOWS ad_aiddist_restock
+BEGIN
+  DECLARE vCampID INT;
+  DECLARE vGoneVictim INT DEFAULT 1;
+
+  -- Use the camp the row was booked to, even if the victim has moved since
+  SELECT CampID INTO vCampID
+  FROM AidVictimDaily
+  WHERE VictimID = OLD.VictimID AND DistDate = OLD.DistDate
+  LIMIT 1;
+
+  IF vCampID IS NOT NULL THEN
+    IF EXISTS (SELECT 1 FROM AidDistribution
+               WHERE VictimID = OLD.VictimID AND ResourceID = OLD.ResourceID
+                 AND DistDate = OLD.DistDate) THEN
+      SET vGoneVictim = 0;
+    END IF;
+
+    UPDATE AidDailyRollup
+    SET TotalQty    = TotalQty - OLD.Qty,
+        VictimCount = VictimCount - vGoneVictim,
+        RowCount    = RowCount - 1
+    WHERE CampID = vCampID AND DistDate = OLD.DistDate AND ResourceID = OLD.ResourceID;
+
+    DELETE FROM AidDailyRollup
+    WHERE CampID = vCampID AND DistDate = OLD.DistDate AND ResourceID = OLD.ResourceID
+      AND RowCount <= 0;
+
+    UPDATE AidVictimDaily
+    SET TotalQty = TotalQty - OLD.Qty,
+        RowCount = RowCount - 1
+    WHERE CampID = vCampID AND DistDate = OLD.DistDate AND VictimID = OLD.VictimID;
+
+    DELETE FROM AidVictimDaily
+    WHERE CampID = vCampID AND DistDate = OLD.DistDate AND VictimID = OLD.VictimID
+      AND RowCount <= 0;
+  END IF;
+END$$
+DELIMITER ;
+
+-- Backfill from whatever AidDistribution already holds (the seed rows, or a
+-- database that predates this file); same statements as rollup-rebuild.
+-- Victim-days already booked keep that camp (ad_aiddist_rollup reads it back);
+-- the rest go to the victim's current camp, the only camp known for them.
+DROP TEMPORARY TABLE IF EXISTS AidBookedCamp;
+
+CREATE TEMPORARY TABLE AidBookedCamp (PRIMARY KEY (VictimID, DistDate))
+SELECT VictimID, DistDate, MIN(CampID) AS CampID
+FROM AidVictimDaily
+GROUP BY VictimID, DistDate;
+
+DELETE FROM AidDailyRollup;
+DELETE FROM AidVictimDaily;
+
+INSERT INTO AidDailyRollup (CampID, ResourceID, DistDate, TotalQty, VictimCount, RowCount)
+SELECT COALESCE(b.CampID, v.CampID), a.ResourceID, a.DistDate,
+       SUM(a.Qty), COUNT(DISTINCT a.VictimID), COUNT(*)
+FROM AidDistribution a
+JOIN Victim v ON v.VictimID = a.VictimID
+LEFT JOIN AidBookedCamp b ON b.VictimID = a.VictimID AND b.DistDate = a.DistDate
+WHERE COALESCE(b.CampID, v.CampID) IS NOT NULL
+GROUP BY COALESCE(b.CampID, v.CampID), a.ResourceID, a.DistDate;
+
+INSERT INTO AidVictimDaily (CampID, DistDate, VictimID, TotalQty, RowCount)
+SELECT COALESCE(b.CampID, v.CampID), a.DistDate, a.VictimID, SUM(a.Qty), COUNT(*)
+FROM AidDistribution a
+JOIN Victim v ON v.VictimID = a.VictimID
+LEFT JOIN AidBookedCamp b ON b.VictimID = a.VictimID AND b.DistDate = a.DistDate
+WHERE COALESCE(b.CampID, v.CampID) IS NOT NULL
+GROUP BY COALESCE(b.CampID, v.CampID), a.DistDate, a.VictimID;
+
+DROP TEMPORARY TABLE AidBookedCamp;
@@ -0,0 +1,17 @@
+-- 0001: secondary indexes for the hot read paths.
+-- AidDistribution's PK (VolunteerID, VictimID, ResourceID, DistDate) only serves
+-- lookups that start from a volunteer; nothing the app reads does that.
+-- InnoDB appends the PK columns to every secondary index, so the indexes below
+-- also carry VolunteerID / ResourceID for free.
+
+-- Date-range join report, rollup backfill, and the dashboard's
+-- ORDER BY DistDate DESC, VictimID ASC LIMIT 10 (read straight off the index).
+CREATE INDEX ix_aid_date_victim ON AidDistribution (DistDate DESC, VictimID, Qty);
+
+-- Per-victim lookups: rollup triggers (victim + day + resource) and the
+-- camp-filtered join report once it has picked the camp's victims.
+CREATE INDEX ix_aid_victim_date ON AidDistribution (VictimID, DistDate, ResourceID, Qty);
+
+-- Camp-scoped victim reads: camp_occupancy_for / CountVictimsInCamp,
+-- the ai/ad stock triggers' joins and every camp-filtered report.
+CREATE INDEX ix_victim_camp ON Victim (CampID);
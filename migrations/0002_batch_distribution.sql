@@ -0,0 +1,89 @@
+-- 0002: support for one-transaction batch distribution (distribute_batch in app.py).
+-- The app validates the whole batch set-based, takes the stock once per camp
+-- through TakeStock(), then bulk-inserts with @relief_bulk_aid = 1 so the
+-- per-row existence checks and stock decrement are skipped for those rows.
+-- Quantity validation and the rollup trigger still run for every row.
+-- Operators need:  GRANT EXECUTE ON PROCEDURE Disaster_relief2.TakeStock TO 'operator_user'@'localhost';
+
+DROP TRIGGER IF EXISTS bi_aiddist_check;
+
+DELIMITER $$
+CREATE TRIGGER bi_aiddist_check
+BEFORE INSERT ON AidDistribution
+FOR EACH ROW
+BEGIN
+  -- Ensure quantity is positive
+  IF NEW.Qty IS NULL OR NEW.Qty <= 0 THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Invalid quantity: must be greater than zero';
+  END IF;
+
+  -- Ensure volunteer, victim, and resource exist (a batch already checked them as a set)
+  IF @relief_bulk_aid IS NULL THEN
+    IF NOT EXISTS (SELECT 1 FROM Volunteer WHERE VolunteerID = NEW.VolunteerID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Volunteer ID does not exist';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM Victim WHERE VictimID = NEW.VictimID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Victim ID does not exist';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM Resource WHERE ResourceID = NEW.ResourceID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Resource ID does not exist';
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS ai_aiddist_decrement;
+
+DELIMITER $$
+CREATE TRIGGER ai_aiddist_decrement
+AFTER INSERT ON AidDistribution
+FOR EACH ROW
+PRECEDES ai_aiddist_rollup
+BEGIN
+  DECLARE vCampID INT;
+
+  -- A batch takes its stock once, up front, via TakeStock()
+  IF @relief_bulk_aid IS NULL THEN
+    -- Get the camp ID of the victim
+    SELECT CampID INTO vCampID
+    FROM Victim
+    WHERE VictimID = NEW.VictimID;
+
+    -- Reduce stock of the distributed resource in that camp
+    UPDATE Stocked_At
+    SET CurrentQty = CurrentQty - NEW.Qty
+    WHERE CampID = vCampID AND ResourceID = NEW.ResourceID;
+
+    -- Prevent stock from going below zero
+    IF (SELECT CurrentQty FROM Stocked_At
+        WHERE CampID = vCampID AND ResourceID = NEW.ResourceID) < 0 THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Stock level cannot be negative after distribution';
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS TakeStock;
+
+DELIMITER $$
+CREATE PROCEDURE TakeStock(IN pCampID INT, IN pResourceID INT, IN pQty INT)
+MODIFIES SQL DATA
+BEGIN
+  -- Check and decrement in one statement; the row stays locked until the caller commits.
+  UPDATE Stocked_At
+  SET CurrentQty = CurrentQty - pQty
+  WHERE CampID = pCampID AND ResourceID = pResourceID AND CurrentQty >= pQty;
+
+  IF ROW_COUNT() = 0 THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Insufficient stock for batch distribution';
+  END IF;
+END$$
+DELIMITER ;
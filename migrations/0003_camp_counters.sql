@@ -0,0 +1,125 @@
+-- 0003: per-camp counters for the camp overview (camp_overview in app.py).
+-- Victims    → kept current by Victim insert / delete / CampID moves
+-- Volunteers → distinct volunteers with at least one AssignedTo row for the camp
+-- camp_occupancy_for / CountVictimsInCamp read the counter instead of COUNT(*).
+-- Run while writes are paused: the backfill and the triggers start together.
+
+CREATE TABLE CampCounters (
+  CampID     INT PRIMARY KEY,
+  Victims    INT NOT NULL DEFAULT 0,
+  Volunteers INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO CampCounters (CampID, Victims, Volunteers)
+SELECT c.CampID,
+       (SELECT COUNT(*) FROM Victim v WHERE v.CampID = c.CampID),
+       (SELECT COUNT(DISTINCT a.VolunteerID) FROM AssignedTo a WHERE a.CampID = c.CampID)
+FROM ReliefCamp c;
+
+-- Overview filters
+CREATE INDEX ix_camp_district ON ReliefCamp (District);
+
+DELIMITER $$
+CREATE TRIGGER ai_victim_campcount
+AFTER INSERT ON Victim
+FOR EACH ROW
+BEGIN
+  IF NEW.CampID IS NOT NULL THEN
+    INSERT INTO CampCounters (CampID, Victims) VALUES (NEW.CampID, 1)
+    ON DUPLICATE KEY UPDATE Victims = Victims + 1;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_victim_campcount
+AFTER DELETE ON Victim
+FOR EACH ROW
+BEGIN
+  IF OLD.CampID IS NOT NULL THEN
+    UPDATE CampCounters SET Victims = Victims - 1 WHERE CampID = OLD.CampID;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_victim_campcount
+AFTER UPDATE ON Victim
+FOR EACH ROW
+BEGIN
+  -- Victim moved between camps (or into / out of one)
+  IF NOT (OLD.CampID <=> NEW.CampID) THEN
+    IF OLD.CampID IS NOT NULL THEN
+      UPDATE CampCounters SET Victims = Victims - 1 WHERE CampID = OLD.CampID;
+    END IF;
+    IF NEW.CampID IS NOT NULL THEN
+      INSERT INTO CampCounters (CampID, Victims) VALUES (NEW.CampID, 1)
+      ON DUPLICATE KEY UPDATE Victims = Victims + 1;
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_assigned_campcount
+AFTER INSERT ON AssignedTo
+FOR EACH ROW
+BEGIN
+  -- First assignment of this volunteer to this camp?
+  IF NOT EXISTS (SELECT 1 FROM AssignedTo
+                 WHERE CampID = NEW.CampID AND VolunteerID = NEW.VolunteerID AND Date <> NEW.Date) THEN
+    INSERT INTO CampCounters (CampID, Volunteers) VALUES (NEW.CampID, 1)
+    ON DUPLICATE KEY UPDATE Volunteers = Volunteers + 1;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_assigned_campcount
+AFTER DELETE ON AssignedTo
+FOR EACH ROW
+BEGIN
+  -- Last assignment of this volunteer to this camp gone?
+  IF NOT EXISTS (SELECT 1 FROM AssignedTo
+                 WHERE CampID = OLD.CampID AND VolunteerID = OLD.VolunteerID) THEN
+    UPDATE CampCounters SET Volunteers = Volunteers - 1 WHERE CampID = OLD.CampID;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP FUNCTION IF EXISTS camp_occupancy_for;
+
+DELIMITER $$
+CREATE FUNCTION camp_occupancy_for(pCampID INT)
+RETURNS DECIMAL(6,2)
+READS SQL DATA DETERMINISTIC
+BEGIN
+  DECLARE vCap INT;
+  DECLARE vCnt INT DEFAULT 0;
+  DECLARE vPct DECIMAL(6,2);
+
+  SELECT Capacity INTO vCap FROM ReliefCamp WHERE CampID = pCampID;
+  SELECT Victims INTO vCnt FROM CampCounters WHERE CampID = pCampID;
+
+  IF vCap IS NULL OR vCap = 0 THEN
+    SET vPct = 0.00;
+  ELSE
+    SET vPct = ROUND((vCnt * 100.0) / vCap, 2);
+  END IF;
+
+  RETURN vPct;
+END$$
+DELIMITER ;
+
+DROP FUNCTION IF EXISTS CountVictimsInCamp;
+
+DELIMITER $$
+CREATE FUNCTION CountVictimsInCamp(pCampID INT)
+RETURNS INT
+READS SQL DATA DETERMINISTIC
+BEGIN
+  DECLARE vCnt INT DEFAULT 0;
+  SELECT Victims INTO vCnt FROM CampCounters WHERE CampID = pCampID;
+  RETURN vCnt;
+END$$
+DELIMITER ;
@@ -0,0 +1,62 @@
+-- 0004: low-stock watchlist (low_stock_watchlist in app.py).
+-- LowStock holds exactly the (camp, resource) pairs at or below ReorderLevel.
+-- Triggers on Stocked_At keep it current, including the updates made by the
+-- distribution / restock triggers and TakeStock(), so reading the watchlist
+-- never scans Stocked_At.
+
+CREATE TABLE LowStock (
+  CampID       INT      NOT NULL,
+  ResourceID   INT      NOT NULL,
+  CurrentQty   INT      NOT NULL,
+  ReorderLevel INT      NOT NULL,
+  Since        DATETIME NOT NULL,          -- when it first dropped to / below the reorder level
+  PRIMARY KEY (CampID, ResourceID)
+);
+
+INSERT INTO LowStock (CampID, ResourceID, CurrentQty, ReorderLevel, Since)
+SELECT CampID, ResourceID, CurrentQty, ReorderLevel, NOW()
+FROM Stocked_At
+WHERE CurrentQty <= ReorderLevel;
+
+DELIMITER $$
+CREATE TRIGGER ai_stock_lowwatch
+AFTER INSERT ON Stocked_At
+FOR EACH ROW
+BEGIN
+  IF NEW.CurrentQty <= NEW.ReorderLevel THEN
+    INSERT INTO LowStock (CampID, ResourceID, CurrentQty, ReorderLevel, Since)
+    VALUES (NEW.CampID, NEW.ResourceID, NEW.CurrentQty, NEW.ReorderLevel, NOW())
+    ON DUPLICATE KEY UPDATE CurrentQty = NEW.CurrentQty, ReorderLevel = NEW.ReorderLevel;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_stock_lowwatch
+AFTER UPDATE ON Stocked_At
+FOR EACH ROW
+BEGIN
+  -- Key edited: the old pair is gone
+  IF OLD.CampID <> NEW.CampID OR OLD.ResourceID <> NEW.ResourceID THEN
+    DELETE FROM LowStock WHERE CampID = OLD.CampID AND ResourceID = OLD.ResourceID;
+  END IF;
+
+  IF NEW.CurrentQty <= NEW.ReorderLevel THEN
+    INSERT INTO LowStock (CampID, ResourceID, CurrentQty, ReorderLevel, Since)
+    VALUES (NEW.CampID, NEW.ResourceID, NEW.CurrentQty, NEW.ReorderLevel, NOW())
+    ON DUPLICATE KEY UPDATE CurrentQty = NEW.CurrentQty, ReorderLevel = NEW.ReorderLevel;
+  ELSEIF OLD.CurrentQty <= OLD.ReorderLevel THEN
+    -- Restocked above the reorder level
+    DELETE FROM LowStock WHERE CampID = NEW.CampID AND ResourceID = NEW.ResourceID;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_stock_lowwatch
+AFTER DELETE ON Stocked_At
+FOR EACH ROW
+BEGIN
+  DELETE FROM LowStock WHERE CampID = OLD.CampID AND ResourceID = OLD.ResourceID;
+END$$
+DELIMITER ;
@@ -0,0 +1,117 @@
+-- 0005: replace the @relief_bulk_aid session flag from 0002 with a grant only
+-- TakeStock() can issue. Any session could SET @relief_bulk_aid and insert aid
+-- without the per-row stock decrement; now the decrement is only skipped for
+-- stock this connection has already taken.
+--   TakeStock (SQL SECURITY DEFINER) takes the stock and books it to
+--   BulkAidGrant under CONNECTION_ID(); ai_aiddist_decrement spends that grant
+--   before falling back to the normal decrement. App accounts get no privileges
+--   on BulkAidGrant, so the only way to a grant is to pay for it.
+-- Grants are written in the caller's transaction: a rolled back batch leaves
+-- none, and the last row of a committed batch spends it to zero and removes it.
+
+CREATE TABLE BulkAidGrant (
+  ConnID     BIGINT UNSIGNED NOT NULL,
+  CampID     INT             NOT NULL,
+  ResourceID INT             NOT NULL,
+  Remaining  INT             NOT NULL,
+  PRIMARY KEY (ConnID, CampID, ResourceID)
+);
+
+DROP TRIGGER IF EXISTS bi_aiddist_check;
+
+DELIMITER $$
+CREATE TRIGGER bi_aiddist_check
+BEFORE INSERT ON AidDistribution
+FOR EACH ROW
+BEGIN
+  -- Ensure quantity is positive
+  IF NEW.Qty IS NULL OR NEW.Qty <= 0 THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Invalid quantity: must be greater than zero';
+  END IF;
+
+  -- Ensure volunteer, victim, and resource exist (a batch already checked them as a set;
+  -- the foreign keys still hold either way)
+  IF NOT EXISTS (SELECT 1 FROM BulkAidGrant WHERE ConnID = CONNECTION_ID() AND Remaining > 0) THEN
+    IF NOT EXISTS (SELECT 1 FROM Volunteer WHERE VolunteerID = NEW.VolunteerID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Volunteer ID does not exist';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM Victim WHERE VictimID = NEW.VictimID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Victim ID does not exist';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM Resource WHERE ResourceID = NEW.ResourceID) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Resource ID does not exist';
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS ai_aiddist_decrement;
+
+DELIMITER $$
+CREATE TRIGGER ai_aiddist_decrement
+AFTER INSERT ON AidDistribution
+FOR EACH ROW
+PRECEDES ai_aiddist_rollup
+BEGIN
+  DECLARE vCampID INT;
+
+  -- Get the camp ID of the victim
+  SELECT CampID INTO vCampID
+  FROM Victim
+  WHERE VictimID = NEW.VictimID;
+
+  -- Stock already taken by TakeStock() on this connection?
+  UPDATE BulkAidGrant
+  SET Remaining = Remaining - NEW.Qty
+  WHERE ConnID = CONNECTION_ID() AND CampID = vCampID AND ResourceID = NEW.ResourceID
+    AND Remaining >= NEW.Qty;
+
+  IF ROW_COUNT() = 1 THEN
+    DELETE FROM BulkAidGrant
+    WHERE ConnID = CONNECTION_ID() AND CampID = vCampID AND ResourceID = NEW.ResourceID
+      AND Remaining = 0;
+  ELSE
+    -- Reduce stock of the distributed resource in that camp
+    UPDATE Stocked_At
+    SET CurrentQty = CurrentQty - NEW.Qty
+    WHERE CampID = vCampID AND ResourceID = NEW.ResourceID;
+
+    -- Prevent stock from going below zero
+    IF (SELECT CurrentQty FROM Stocked_At
+        WHERE CampID = vCampID AND ResourceID = NEW.ResourceID) < 0 THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Stock level cannot be negative after distribution';
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS TakeStock;
+
+DELIMITER $$
+CREATE PROCEDURE TakeStock(IN pCampID INT, IN pResourceID INT, IN pQty INT)
+MODIFIES SQL DATA
+SQL SECURITY DEFINER
+BEGIN
+  -- Check and decrement in one statement; the row stays locked until the caller commits.
+  UPDATE Stocked_At
+  SET CurrentQty = CurrentQty - pQty
+  WHERE CampID = pCampID AND ResourceID = pResourceID AND CurrentQty >= pQty;
+
+  IF ROW_COUNT() = 0 THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Insufficient stock for batch distribution';
+  END IF;
+
+  -- Let this connection's next inserts for the pair spend what was just taken
+  INSERT INTO BulkAidGrant (ConnID, CampID, ResourceID, Remaining)
+  VALUES (CONNECTION_ID(), pCampID, pResourceID, pQty)
+  ON DUPLICATE KEY UPDATE Remaining = Remaining + pQty;
+END$$
+DELIMITER ;
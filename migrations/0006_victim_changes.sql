@@ -0,0 +1,47 @@
+-- 0006: change log for the in-process victim search index (VictimIndex in app.py).
+-- Every worker used to reload the whole Victim table every VICTIM_INDEX_TTL to
+-- pick up writes made by other workers. Now each one loads it once and then
+-- polls this log every VICTIM_INDEX_POLL seconds, refetching only the victims
+-- listed. Only changes to the searchable columns are logged.
+-- Rows older than VICTIM_CHANGES_KEEP_HOURS (default 168) are removed by:
+--   flask --app app victim-changes-prune
+
+CREATE TABLE VictimChanges (
+  ChangeID  BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  VictimID  INT         NOT NULL,
+  ChangedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  KEY ix_vc_changed (ChangedAt, VictimID)
+);
+
+DELIMITER $$
+CREATE TRIGGER ai_victim_changes
+AFTER INSERT ON Victim
+FOR EACH ROW
+BEGIN
+  INSERT INTO VictimChanges (VictimID) VALUES (NEW.VictimID);
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_victim_changes
+AFTER UPDATE ON Victim
+FOR EACH ROW
+BEGIN
+  IF NOT (OLD.VictimID <=> NEW.VictimID AND OLD.Name <=> NEW.Name AND OLD.Village <=> NEW.Village
+          AND OLD.Taluk <=> NEW.Taluk AND OLD.District <=> NEW.District AND OLD.CampID <=> NEW.CampID) THEN
+    INSERT INTO VictimChanges (VictimID) VALUES (OLD.VictimID);
+    IF NOT (OLD.VictimID <=> NEW.VictimID) THEN
+      INSERT INTO VictimChanges (VictimID) VALUES (NEW.VictimID);
+    END IF;
+  END IF;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_victim_changes
+AFTER DELETE ON Victim
+FOR EACH ROW
+BEGIN
+  INSERT INTO VictimChanges (VictimID) VALUES (OLD.VictimID);
+END$$
+DELIMITER ;
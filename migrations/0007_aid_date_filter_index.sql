@@ -0,0 +1,8 @@
+-- 0007: index for the CRUD / API DistDate filter on AidDistribution.
+-- KeysetPage reads pages in PK order (VolunteerID, VictimID, ResourceID, DistDate).
+-- ix_aid_date_victim leads with DistDate but continues with VictimID, so a
+-- "DistDate = ?" page had to filesort the whole day before applying the LIMIT.
+-- This index has the date first and then the PK order, so each page is a range
+-- read that stops after size+1 entries. InnoDB does not append PK columns that
+-- are already in the index, so it stays at four columns.
+CREATE INDEX ix_aid_date_pk ON AidDistribution (DistDate, VolunteerID, VictimID, ResourceID);
@@ -0,0 +1,27 @@
+-- 0008: a batch must spend every bulk-aid grant it takes before it commits.
+-- If a victim moved camp between distribute_batch's reads and its inserts, the
+-- grant for the old camp was never spent, the row was charged again by the
+-- normal decrement, and the leftover BulkAidGrant row stayed keyed to the
+-- pooled connection's CONNECTION_ID(), where later inserts on that connection
+-- skipped bi_aiddist_check's existence checks. distribute_batch now locks its
+-- victims FOR UPDATE and calls EndBulkAid() just before COMMIT; a grant left
+-- over makes it SIGNAL, and the rollback takes the grant rows with it, so none
+-- is ever committed.
+-- Operators need:  GRANT EXECUTE ON PROCEDURE Disaster_relief2.EndBulkAid TO 'operator_user'@'localhost';
+
+-- Grants committed by earlier versions are stale by definition
+DELETE FROM BulkAidGrant;
+
+DROP PROCEDURE IF EXISTS EndBulkAid;
+
+DELIMITER $$
+CREATE PROCEDURE EndBulkAid()
+READS SQL DATA
+SQL SECURITY DEFINER
+BEGIN
+  IF EXISTS (SELECT 1 FROM BulkAidGrant WHERE ConnID = CONNECTION_ID()) THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Bulk aid grant left unspent; batch rolled back';
+  END IF;
+END$$
+DELIMITER ;
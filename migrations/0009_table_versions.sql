@@ -0,0 +1,270 @@
+-- 0009: shared per-table write versions for the JSON API's ETag / Last-Modified.
+-- Each worker used to count only its own writes, so validators had to roll
+-- over every API_VERSION_TTL seconds to pick up everyone else's. These
+-- triggers bump a counter on every row written to a base table, by anyone.
+-- The counter is split over 16 slots (by connection) so concurrent writers to
+-- one table don't queue on a single row lock; a table's version is the SUM of
+-- its slots and its last write the MAX of their ChangedAt.
+
+CREATE TABLE TableVersion (
+  TableName VARCHAR(64)     NOT NULL,
+  Slot      TINYINT         NOT NULL,
+  Version   BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  ChangedAt DATETIME(6)     NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (TableName, Slot)
+);
+
+INSERT INTO TableVersion (TableName, Slot)
+SELECT t.TableName, s.Slot
+FROM (SELECT 'Disaster' AS TableName
+      UNION ALL SELECT 'ReliefCamp'
+      UNION ALL SELECT 'Volunteer'
+      UNION ALL SELECT 'Victim'
+      UNION ALL SELECT 'Resource'
+      UNION ALL SELECT 'Stocked_At'
+      UNION ALL SELECT 'AssignedTo'
+      UNION ALL SELECT 'AidDistribution') t
+CROSS JOIN (SELECT 0 AS Slot UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+      UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7
+      UNION ALL SELECT 8 UNION ALL SELECT 9 UNION ALL SELECT 10 UNION ALL SELECT 11
+      UNION ALL SELECT 12 UNION ALL SELECT 13 UNION ALL SELECT 14 UNION ALL SELECT 15) s;
+
+DELIMITER $$
+CREATE TRIGGER ai_disaster_version
+AFTER INSERT ON Disaster
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Disaster' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_disaster_version
+AFTER UPDATE ON Disaster
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Disaster' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_disaster_version
+AFTER DELETE ON Disaster
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Disaster' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_camp_version
+AFTER INSERT ON ReliefCamp
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'ReliefCamp' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_camp_version
+AFTER UPDATE ON ReliefCamp
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'ReliefCamp' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_camp_version
+AFTER DELETE ON ReliefCamp
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'ReliefCamp' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_volunteer_version
+AFTER INSERT ON Volunteer
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Volunteer' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_volunteer_version
+AFTER UPDATE ON Volunteer
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Volunteer' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_volunteer_version
+AFTER DELETE ON Volunteer
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Volunteer' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_victim_version
+AFTER INSERT ON Victim
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Victim' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_victim_version
+AFTER UPDATE ON Victim
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Victim' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_victim_version
+AFTER DELETE ON Victim
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Victim' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_resource_version
+AFTER INSERT ON Resource
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Resource' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_resource_version
+AFTER UPDATE ON Resource
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Resource' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_resource_version
+AFTER DELETE ON Resource
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Resource' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_stock_version
+AFTER INSERT ON Stocked_At
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Stocked_At' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_stock_version
+AFTER UPDATE ON Stocked_At
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Stocked_At' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_stock_version
+AFTER DELETE ON Stocked_At
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'Stocked_At' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_assigned_version
+AFTER INSERT ON AssignedTo
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AssignedTo' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_assigned_version
+AFTER UPDATE ON AssignedTo
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AssignedTo' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_assigned_version
+AFTER DELETE ON AssignedTo
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AssignedTo' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ai_aiddist_version
+AFTER INSERT ON AidDistribution
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AidDistribution' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER au_aiddist_version
+AFTER UPDATE ON AidDistribution
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AidDistribution' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
+
+DELIMITER $$
+CREATE TRIGGER ad_aiddist_version
+AFTER DELETE ON AidDistribution
+FOR EACH ROW
+BEGIN
+  UPDATE TableVersion SET Version = Version + 1, ChangedAt = NOW(6)
+  WHERE TableName = 'AidDistribution' AND Slot = CONNECTION_ID() % 16;
+END$$
+DELIMITER ;
@@ -0,0 +1,25 @@
+-- 0010: shared event log for the live aid feed (AidFeed in app.py).
+-- Each worker used to publish aid events to its own in-process hub, so a
+-- stream only saw the writes its worker handled, and a Last-Event-ID from one
+-- worker could be replayed against another worker's unrelated events. Now each
+-- event is one row here; every worker polls it every FEED_POLL seconds while
+-- it has streams open, and the EventID is the event's ID on every worker.
+-- AidFeedEpoch names this sequence: event IDs are "<Epoch>-<EventID>", so IDs
+-- from before the table was recreated are never continued.
+-- Operators publish events too:
+--   GRANT INSERT ON Disaster_relief2.AidFeedEvent TO 'operator_user'@'localhost';
+-- Rows older than --keep-hours (default 24) are removed by:
+--   flask --app app aid-feed-prune
+
+CREATE TABLE AidFeedEvent (
+  EventID   BIGINT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  Event     VARCHAR(16) NOT NULL,
+  Data      TEXT        NOT NULL,
+  CreatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+CREATE TABLE AidFeedEpoch (
+  Epoch CHAR(8) NOT NULL PRIMARY KEY
+);
+
+INSERT INTO AidFeedEpoch (Epoch) VALUES (LEFT(MD5(UUID()), 8));
@@ -0,0 +1,195 @@
+"""
+Synthetic, referentially consistent data at flood scale, for load testing.
+
+    python seed_data.py --victims 1000000 --distributions 20000000
+    python seed_data.py --purge            # remove everything generated
+
+Disaster → ReliefCamp → Victim / Stocked_At / AssignedTo, plus Volunteer,
+Resource and AidDistribution. Everything is derived from the row index and
+--seed, so nothing but the current batch is held in memory, and IDs start at
+--id-base so the demo rows from disaster_relief.sql are left alone.
+
+AidDistribution rows go through the normal triggers (validation, stock
+decrement, rollups), so camps are stocked high enough never to run out.
+"""
+import random, time
+from datetime import date, timedelta
+
+import click
+
+import app as relief
+
+flask_app = relief.create_app()      # settings from the environment, like wsgi.py
+
+DISASTER_TYPES = ["Flood", "Cyclone", "Earthquake", "Landslide", "Drought"]
+SEVERITIES     = ["Moderate", "High", "Severe"]
+PLACES = [  # (city, district, state)
+    ("Chennai", "Chennai", "Tamil Nadu"), ("Cuddalore", "Cuddalore", "Tamil Nadu"),
+    ("Puri", "Puri", "Odisha"), ("Cuttack", "Cuttack", "Odisha"),
+    ("Bhuj", "Kutch", "Gujarat"), ("Guwahati", "Kamrup", "Assam"),
+    ("Patna", "Patna", "Bihar"), ("Kochi", "Ernakulam", "Kerala"),
+]
+FIRST_NAMES = ["Arun", "Lakshmi", "Ravi", "Seema", "Imran", "Asha", "Karthik", "Meena",
+               "Rajesh", "Sunita", "Vikram", "Divya", "Suresh", "Anjali", "Farhan", "Kavya"]
+RESOURCE_KINDS = [("Food", "kg"), ("Medical", "box"), ("Shelter", "unit"),
+                  ("Clothing", "piece"), ("Water", "litre"), ("Hygiene", "kit")]
+AVAILABILITY   = ["Full", "Partial", "OnCall"]
+
+STOCK_QTY        = 1_000_000_000     # high enough that generated aid never hits the negative-stock trigger
+RESOURCES_PER_CAMP = 8
+BASE_DATE        = date(2024, 1, 1)
+
+
+class Scale:
+    def __init__(self, disasters, camps, volunteers, resources, victims, distributions, id_base):
+        self.disasters = disasters
+        self.camps = camps
+        self.volunteers = volunteers
+        self.resources = resources
+        self.victims = victims
+        self.distributions = distributions
+        self.base = id_base
+        self.per_camp = min(RESOURCES_PER_CAMP, resources)
+
+    # Deterministic relationships, so no lookup tables are needed
+    def disaster_id(self, d):    return self.base + d
+    def camp_id(self, c):        return self.base + c
+    def volunteer_id(self, v):   return self.base + v
+    def resource_id(self, r):    return self.base + r
+    def victim_id(self, v):      return self.base + v
+    def camp_of_victim(self, v): return v % self.camps
+    def disaster_of_camp(self, c): return c % self.disasters
+    def start_of_disaster(self, d): return BASE_DATE + timedelta(days=3 * d)
+    def camp_resource(self, c, j): return (c * 3 + j) % self.resources
+    def camp_volunteer(self, c, k):
+        # volunteers v with v % camps == c are assigned to camp c
+        n = len(range(c, self.volunteers, self.camps))
+        return c + self.camps * (k % n) if n else k % self.volunteers
+
+
+def gen_disasters(s, rng):
+    for d in range(s.disasters):
+        city, district, state = PLACES[d % len(PLACES)]
+        start = s.start_of_disaster(d)
+        yield (s.disaster_id(d), rng.choice(DISASTER_TYPES), rng.choice(SEVERITIES),
+               start, start + timedelta(days=30), city, district, state)
+
+def gen_camps(s, rng):
+    per_camp = max(1, s.victims // s.camps)
+    for c in range(s.camps):
+        d = s.disaster_of_camp(c)
+        city, district, state = PLACES[d % len(PLACES)]
+        yield (s.camp_id(c), f"Camp {c}", f"{city} Ward {c % 50}", f"{city} Taluk", district, state,
+               int(per_camp * rng.uniform(1.0, 1.5)) + 10, "Active", s.start_of_disaster(d), None,
+               s.disaster_id(d))
+
+def gen_volunteers(s, rng):
+    for v in range(s.volunteers):
+        yield (s.volunteer_id(v), f"{rng.choice(FIRST_NAMES)} V{v}", f"7{v:09d}", rng.choice(AVAILABILITY))
+
+def gen_resources(s, rng):
+    for r in range(s.resources):
+        cat, unit = RESOURCE_KINDS[r % len(RESOURCE_KINDS)]
+        yield (s.resource_id(r), cat, f"{cat} item {r}", unit)
+
+def gen_stock(s, rng):
+    for c in range(s.camps):
+        for j in range(s.per_camp):
+            yield (s.camp_id(c), s.resource_id(s.camp_resource(c, j)), STOCK_QTY, rng.randint(50, 500))
+
+def gen_assignments(s, rng):
+    for v in range(s.volunteers):
+        c = v % s.camps
+        yield (s.camp_id(c), s.volunteer_id(v), s.start_of_disaster(s.disaster_of_camp(c)))
+
+def gen_victims(s, rng):
+    for v in range(s.victims):
+        c = s.camp_of_victim(v)
+        city, district, state = PLACES[s.disaster_of_camp(c) % len(PLACES)]
+        yield (s.victim_id(v), f"{rng.choice(FIRST_NAMES)} {v}", rng.randint(1, 90), rng.choice("MF"),
+               f"{city} Ward {c % 50}", f"{city} Taluk", district, state, s.camp_id(c))
+
+def gen_distributions(s, rng):
+    # Round k // victims gives every victim at most one row per day → the PK never collides.
+    for k in range(s.distributions):
+        v = k % s.victims
+        day = k // s.victims
+        c = s.camp_of_victim(v)
+        r = s.camp_resource(c, (k * 7) % s.per_camp)
+        vol = s.camp_volunteer(c, k)
+        yield (s.volunteer_id(vol), s.victim_id(v), s.resource_id(r),
+               s.start_of_disaster(s.disaster_of_camp(c)) + timedelta(days=day), rng.randint(1, 5))
+
+
+STEPS = [  # (table, columns, generator)
+    ("Disaster",        relief.TABLES["Disaster"][2],        gen_disasters),
+    ("ReliefCamp",      relief.TABLES["ReliefCamp"][2],      gen_camps),
+    ("Volunteer",       relief.TABLES["Volunteer"][2],       gen_volunteers),
+    ("Resource",        relief.TABLES["Resource"][2],        gen_resources),
+    ("Stocked_At",      relief.TABLES["Stocked_At"][2],      gen_stock),
+    ("AssignedTo",      relief.TABLES["AssignedTo"][2],      gen_assignments),
+    ("Victim",          relief.TABLES["Victim"][2],          gen_victims),
+    ("AidDistribution", relief.TABLES["AidDistribution"][2], gen_distributions),
+]
+
+PURGE = [  # child tables first; (table, id column)
+    ("AidDistribution", "VictimID"), ("AssignedTo", "CampID"), ("Stocked_At", "CampID"),
+    ("Victim", "VictimID"), ("Resource", "ResourceID"), ("Volunteer", "VolunteerID"),
+    ("ReliefCamp", "CampID"), ("Disaster", "DisasterID"),
+]
+
+
+def load(table, cols, rows, batch):
+    sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(['%s'] * len(cols))})"
+    conn = relief.get_conn()
+    cur = conn.cursor()
+    started, n, chunk = time.monotonic(), 0, []
+    try:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= batch:
+                cur.executemany(sql, chunk)
+                conn.commit()
+                n += len(chunk)
+                chunk = []
+                if n % (batch * 50) == 0:
+                    click.echo(f"  {table}: {n:,} rows ({n / (time.monotonic() - started):,.0f}/s)")
+        if chunk:
+            cur.executemany(sql, chunk)
+            conn.commit()
+            n += len(chunk)
+    finally:
+        cur.close()
+    click.echo(f"{table}: {n:,} rows in {time.monotonic() - started:.1f}s")
+
+
+@click.command()
+@click.option("--disasters", default=20, show_default=True)
+@click.option("--camps", default=500, show_default=True)
+@click.option("--volunteers", default=5_000, show_default=True)
+@click.option("--resources", default=60, show_default=True)
+@click.option("--victims", default=100_000, show_default=True)
+@click.option("--distributions", default=1_000_000, show_default=True)
+@click.option("--id-base", default=1_000_000, show_default=True, help="First ID used in every table.")
+@click.option("--batch-size", default=flask_app.config["IMPORT_BATCH"], show_default=True)
+@click.option("--seed", default=42, show_default=True)
+@click.option("--purge", is_flag=True, help="Delete rows with ID >= --id-base instead of generating.")
+@click.option("--account", default="admin", show_default=True, type=click.Choice(list(flask_app.config["LOGIN_ACCOUNTS"])))
+def main(disasters, camps, volunteers, resources, victims, distributions, id_base,
+         batch_size, seed, purge, account):
+    with flask_app.app_context():
+        relief.use_cli_account(account)
+        if purge:
+            for table, col in PURGE:
+                n = relief.execute(f"DELETE FROM {table} WHERE {col} >= %s", (id_base,))
+                click.echo(f"{table}: {n:,} rows deleted")
+            relief.rebuild_rollups()
+            return
+        scale = Scale(disasters, camps, volunteers, resources, victims, distributions, id_base)
+        rng = random.Random(seed)
+        for table, cols, gen in STEPS:
+            load(table, cols, gen(scale, rng), batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+# app.py is a single module at the repo root; importing it needs no database.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def callproc(self, name, args=()):
+        self.conn.log.append(("proc", name, tuple(args)))
+        if name in self.conn.fail:
+            raise self.conn.fail[name]
+
+    def executemany(self, sql, rows):
+        self.conn.log.append(("executemany", sql, len(rows)))
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    """Stands in for the pooled mysql.connector connection; records what was done to it."""
+    def __init__(self):
+        self.log = []
+        self.fail = {}                  # procedure name -> exception to raise
+
+    def cursor(self, **kw):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append(("commit",))
+
+    def rollback(self):
+        self.log.append(("rollback",))
+
+
+@pytest.fixture
+def flask_app():
+    import app
+    return app.create_app({"TESTING": True, "SECRET_KEY": "test"})
+
+
+@pytest.fixture
+def app_ctx(flask_app):
+    with flask_app.app_context():
+        yield flask_app
+
+
+@pytest.fixture
+def fake_conn(monkeypatch, app_ctx):
+    import app
+    conn = FakeConn()
+    monkeypatch.setattr(app, "get_conn", lambda: conn)
+    return conn
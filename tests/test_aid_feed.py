@@ -0,0 +1,110 @@
+import json
+
+import mysql.connector
+import pytest
+
+import app
+
+
+class FeedDB:
+    """AidFeedEvent / AidFeedEpoch, shared by every "worker" in a test."""
+    def __init__(self):
+        self.rows = []                  # (EventID, Event, Data, Settled)
+        self.missing = False
+
+    def _check(self):
+        if self.missing:
+            raise mysql.connector.Error(errno=1146, msg="Table 'AidFeedEvent' doesn't exist")
+
+    def query_dicts(self, sql, params=None):
+        self._check()
+        if sql == app.FEED_EPOCH_SQL:
+            return [{"Epoch": "cafe0001"}]
+        if sql == app.FEED_TAIL_SQL:
+            return [self._row(r) for r in reversed(self.rows)][:params[0]]
+        if sql == app.FEED_POLL_SQL:
+            _, after, limit = params
+            return [self._row(r) for r in self.rows if r[0] > after][:limit]
+        raise AssertionError(sql)
+
+    def execute(self, sql, params=None):
+        self._check()
+        assert sql == app.FEED_INSERT_SQL
+        self.rows.append((len(self.rows) + 1, params[0], params[1], 1))
+        return 1
+
+    @staticmethod
+    def _row(r):
+        return {"EventID": r[0], "Event": r[1], "Data": r[2], "Settled": r[3]}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FeedDB()
+    monkeypatch.setattr(app, "query_dicts", fake.query_dicts)
+    monkeypatch.setattr(app, "execute", fake.execute)
+    return fake
+
+
+def worker():
+    flask_app = app.create_app({"FEED_POLL": 0.01})
+    return flask_app, flask_app.extensions["relief"].aid_feed
+
+
+def connect(flask_app, feed, last_event_id=None):
+    assert feed.join()
+    with flask_app.app_context():
+        feed.ensure({"user": "viewer"})
+    return feed.replay(last_event_id)
+
+
+def test_events_from_one_worker_reach_another_under_the_same_ids(db):
+    app_a, feed_a = worker()
+    app_b, feed_b = worker()
+    _, resync, seq = connect(app_b, feed_b)
+    assert not resync and seq == 0
+    with app_a.app_context():
+        feed_a.publish("aid", {"VictimID": 7})
+    events = feed_b.wait(seq, timeout=2)
+    assert [(e[1], e[2], json.loads(e[3])) for e in events] == [("cafe0001-1", "aid", {"VictimID": 7})]
+    feed_b.leave()
+
+
+def test_last_event_id_from_one_worker_replays_on_another(db):
+    app_a, feed_a = worker()
+    with app_a.app_context():
+        for n in range(3):
+            feed_a.publish("aid", {"n": n})
+    app_b, feed_b = worker()                    # never saw those writes itself
+    backlog, resync, seq = connect(app_b, feed_b, "cafe0001-1")
+    assert not resync and seq == 1
+    assert [e[1] for e in backlog] == ["cafe0001-2", "cafe0001-3"]
+    assert connect(app_b, feed_b, "0ther000-1")[1]       # another epoch
+    assert connect(app_b, feed_b, "1700000000123")[1]    # pre-epoch numeric ID
+    assert connect(app_b, feed_b, "cafe0001-9")[1]       # newer than anything published
+
+
+def test_poll_waits_for_a_lower_id_that_may_still_commit():
+    _, feed = worker()
+    feed.shared = True
+    feed._deliver(0, [{"EventID": 1, "Event": "aid", "Data": "{}", "Settled": 0},
+                      {"EventID": 3, "Event": "aid", "Data": "{}", "Settled": 0}])
+    assert feed._seq == 1
+    feed._deliver(1, [{"EventID": 3, "Event": "aid", "Data": "{}", "Settled": 1}])
+    assert feed._seq == 3
+
+
+def test_without_the_table_each_process_has_its_own_epoch(db):
+    db.missing = True
+    flask_app, feed = worker()
+    with flask_app.app_context():
+        feed.publish("aid", {"n": 1})
+    assert feed.shared is False
+    _, resync, seq = connect(flask_app, feed)
+    epoch = feed.epoch
+    assert seq == 1 and not resync
+    assert not connect(flask_app, feed, f"{epoch}-0")[1]
+
+    app._reset_feeds_after_fork()               # what a forked (preloaded) worker sees
+    assert feed.epoch != epoch
+    assert connect(flask_app, feed, f"{epoch}-1")[1]
@@ -0,0 +1,82 @@
+import mysql.connector
+import pytest
+
+import app
+
+
+class VersionDB:
+    """TableVersion rows plus the dashboard counts query."""
+    def __init__(self):
+        self.versions = {}
+        self.counts = 0
+        self.missing = False
+
+    def query_dicts(self, sql, params=None):
+        if "FROM TableVersion" in sql:
+            if self.missing:
+                raise mysql.connector.Error(errno=1146, msg="Table 'TableVersion' doesn't exist")
+            return [{"TableName": t, "Version": self.versions[t], "ChangedAt": 1700000000.5}
+                    for t in params if t in self.versions]
+        if "COUNT(*)" in sql:
+            self.counts += 1
+            return [{k: self.counts for k in app.DASHBOARD_COUNTS}]
+        raise AssertionError(sql)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = VersionDB()
+    monkeypatch.setattr(app, "query_dicts", fake.query_dicts)
+    return fake
+
+
+def client(api_min=1024):
+    flask_app = app.create_app({"TESTING": True, "API_GZIP_MIN": api_min})
+    c = flask_app.test_client()
+    with c.session_transaction() as s:
+        s.update(db_user="viewer_user", db_pass="x", role="Viewer")
+    return c
+
+
+def test_strong_etag_shared_by_workers_and_304(db):
+    db.versions = {"Victim": 3}
+    a, b = client(), client()                   # two workers, one database
+    first = a.get("/api/v1/dashboard")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert not etag.startswith("W/")
+    assert b.get("/api/v1/dashboard").headers["ETag"] == etag
+    again = b.get("/api/v1/dashboard", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+    assert first.last_modified.timestamp() == 1700000000
+
+
+def test_version_change_moves_etag_and_drops_worker_cache(db):
+    db.versions = {"Victim": 3}
+    c = client()
+    first = c.get("/api/v1/dashboard")
+    assert c.get("/api/v1/dashboard").get_json() == first.get_json()      # served from the cache
+    db.versions["Victim"] = 4                    # another worker wrote
+    second = c.get("/api/v1/dashboard", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json() != first.get_json()
+
+
+def test_gzip_body_has_its_own_etag_and_stable_bytes(db):
+    db.versions = {"Victim": 1}
+    c = client(api_min=1)
+    plain = c.get("/api/v1/dashboard")
+    zipped = c.get("/api/v1/dashboard", headers={"Accept-Encoding": "gzip"})
+    again = c.get("/api/v1/dashboard", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert zipped.get_data() == again.get_data()
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+
+
+def test_without_table_versions_there_are_no_validators(db):
+    db.missing = True
+    resp = client().get("/api/v1/dashboard")
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers and "Last-Modified" not in resp.headers
@@ -0,0 +1,62 @@
+import json
+
+import click
+import pytest
+
+import app
+
+
+def test_config_from_env_reads_and_converts():
+    config = app.config_from_env({"DB_POOL_SIZE": "3", "VICTIM_INDEX_WARM": "1", "FLASK_SECRET": "s"})
+    assert config["POOL_SIZE"] == 3
+    assert config["VICTIM_INDEX_WARM"] is True
+    assert config["SECRET_KEY"] == "s"
+    assert config["REPORT_CACHE_TTL"] == 300.0
+    assert config["INTAKE_JOURNAL"] is None
+
+
+def test_overrides_win_over_the_environment(monkeypatch):
+    monkeypatch.setenv("REPORT_CACHE_SIZE", "7")
+    monkeypatch.setenv("DASHBOARD_TTL", "5")
+    flask_app = app.create_app({"DASHBOARD_TTL": 1.5, "FEED_MAX_CLIENTS": 2})
+    relief = flask_app.extensions["relief"]
+    assert relief.report_cache.size == 7
+    assert relief.dashboard.ttl == 1.5
+    assert relief.aid_feed.max_clients == 2
+    assert relief.intake is None
+    assert flask_app.config["LOGIN_ACCOUNTS"] is app.LOGIN_ACCOUNTS
+
+
+def test_each_app_has_its_own_pools_caches_and_hubs():
+    a, b = app.create_app(), app.create_app()
+    sa, sb = a.extensions["relief"], b.extensions["relief"]
+    for name in ("pools", "dashboard", "aid_feed", "victim_index", "report_cache", "table_versions"):
+        assert getattr(sa, name) is not getattr(sb, name)
+    assert sa.victim_index.app is a
+    with a.app_context():
+        app.state().report_cache.put("k", [1], ("Victim",), {})
+        app.note_write("Victim", 1)
+        assert app.state().report_cache.get("k") is None
+    assert sb.report_cache.snapshot()["invalidations"] == 0
+
+
+def test_accounts_file_and_intake_journal(tmp_path):
+    accounts = tmp_path / "accounts.json"
+    accounts.write_text(json.dumps({"ops": {"password": "p", "role": "Operator",
+                                            "db_user": "op", "db_pass": "q"}}))
+    flask_app = app.create_app({"RELIEF_ACCOUNTS": str(accounts),
+                                "INTAKE_JOURNAL": str(tmp_path / "intake.db"), "INTAKE_BATCH": 5})
+    intake = flask_app.extensions["relief"].intake
+    assert intake.batch == 5 and intake.app is flask_app
+    with flask_app.app_context():
+        app.use_cli_account("ops")
+        assert app.g.db_creds["user"] == "op"
+        with pytest.raises(click.BadParameter):
+            app.use_cli_account("admin")
+
+
+def test_routes_and_commands_are_registered():
+    flask_app = app.create_app({"TESTING": True})
+    assert {"import-data", "db-migrate", "explain-check"} <= set(flask_app.cli.commands)
+    resp = flask_app.test_client().get("/")
+    assert resp.status_code == 302 and resp.headers["Location"] == "/login"
@@ -0,0 +1,66 @@
+import mysql.connector
+import pytest
+
+import app
+
+
+class FakeDB:
+    def __init__(self, victims, stock):
+        self.victims = victims          # VictimID -> CampID
+        self.stock = stock              # CampID -> CurrentQty
+        self.sql = []
+
+    def query_dicts(self, sql, params=None):
+        self.sql.append(sql)
+        if "vol_ok" in sql:
+            return [{"vol_ok": 1, "res_ok": 1}]
+        if "FROM Stocked_At" in sql:
+            return [{"CampID": c, "CurrentQty": self.stock[c]} for c in params[1:] if c in self.stock]
+        if "FROM AidDistribution" in sql:
+            return []
+        if "WHERE CampID" in sql:
+            return [{"VictimID": v, "CampID": c} for v, c in sorted(self.victims.items()) if c == params[0]]
+        if "FROM Victim" in sql:
+            return [{"VictimID": v, "CampID": self.victims[v]} for v in params if v in self.victims]
+        raise AssertionError(sql)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB({1: 10, 2: 10, 3: 20}, {10: 100, 20: 100})
+    monkeypatch.setattr(app, "query_dicts", fake.query_dicts)
+    monkeypatch.setattr(app, "note_write", lambda *a: None)
+    return fake
+
+
+def test_victims_are_read_for_update_in_a_fresh_transaction(db, fake_conn):
+    app.distribute_batch(7, 5, 2, "2024-01-01", victim_ids=[3, 1, 2])
+    victim_reads = [s for s in db.sql if "FROM Victim" in s]
+    assert victim_reads and all(s.rstrip().endswith("FOR UPDATE") for s in victim_reads)
+    assert fake_conn.log[0] == ("rollback",)
+    app.distribute_batch(7, 5, 2, "2024-01-01", camp_id=10)
+    assert app.BATCH_CAMP_VICTIMS_SQL in db.sql
+
+
+def test_grants_are_checked_before_commit(db, fake_conn):
+    report = app.distribute_batch(7, 5, 2, "2024-01-01", victim_ids=[3, 1, 2])
+    assert report.applied
+    steps = [e[:2] for e in fake_conn.log]
+    assert steps == [("rollback",), ("proc", "TakeStock"), ("proc", "TakeStock"),
+                     ("executemany", app.BATCH_INSERT_SQL), ("proc", "EndBulkAid"), ("commit",)]
+    assert [e[2] for e in fake_conn.log if e[:2] == ("proc", "TakeStock")] == [(10, 5, 4), (20, 5, 2)]
+
+
+def test_unspent_grant_rolls_back(db, fake_conn):
+    fake_conn.fail["EndBulkAid"] = mysql.connector.Error(
+        msg="Bulk aid grant left unspent; batch rolled back", errno=1644)
+    report = app.distribute_batch(7, 5, 2, "2024-01-01", victim_ids=[1, 2])
+    assert not report.applied
+    assert "unspent" in " ".join(report.errors)
+    assert fake_conn.log[-1] == ("rollback",) and ("commit",) not in fake_conn.log
+
+
+def test_validation_failure_releases_the_locks(db, fake_conn):
+    report = app.distribute_batch(7, 5, 80, "2024-01-01", victim_ids=[1, 2, 99])
+    assert not report.applied and report.missing == [99] and report.shortfalls
+    assert fake_conn.log == [("rollback",), ("rollback",)]
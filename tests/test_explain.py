@@ -0,0 +1,83 @@
+import re
+
+import pytest
+
+import app
+from app import explain_problems
+
+
+def plan(monkeypatch, *rows):
+    monkeypatch.setattr(app, "query_dicts", lambda sql, params=None: [dict(r) for r in rows])
+
+
+def row(**kw):
+    return {"table": "a", "type": "ref", "possible_keys": "ix", "key": "ix", "rows": 10, "Extra": "", **kw}
+
+
+def test_indexed_lookup_passes(monkeypatch):
+    plan(monkeypatch, row())
+    assert explain_problems("SELECT 1 FROM a WHERE x = %s LIMIT 5", (1,), {}) == []
+
+
+def test_full_table_scan(monkeypatch):
+    plan(monkeypatch, row(type="ALL", possible_keys=None))
+    assert explain_problems("SELECT 1 FROM a", (), {})
+    assert explain_problems("SELECT 1 FROM a", (), {"a": "tiny"}) == []
+
+
+def test_full_index_scan_needs_limit_and_no_filter(monkeypatch):
+    plan(monkeypatch, row(type="index"))
+    assert explain_problems("SELECT 1 FROM a ORDER BY id LIMIT 10", (), {}) == []
+    assert explain_problems("SELECT 1 FROM a ORDER BY id", (), {})
+    plan(monkeypatch, row(type="index", Extra="Using where"))
+    assert explain_problems("SELECT 1 FROM a WHERE y = 1 ORDER BY id LIMIT 10", (), {})
+
+
+@pytest.mark.parametrize("extra", ["Using filesort", "Using index condition; Using filesort"])
+def test_filesort_under_limit_fails(monkeypatch, extra):
+    plan(monkeypatch, row(Extra=extra))
+    problems = explain_problems("SELECT 1 FROM a WHERE d = %s ORDER BY id LIMIT 51", ("2024-01-01",), {})
+    assert problems and "filesort" in problems[0]
+
+
+def test_filesort_allowed_or_unlimited(monkeypatch):
+    plan(monkeypatch, row(Extra="Using filesort"))
+    sql = "SELECT 1 FROM a ORDER BY n"
+    assert explain_problems(sql + " LIMIT 5", (), {"filesort": "small"}) == []
+    assert explain_problems(sql, (), {}) == []
+    assert explain_problems(sql, (), {}, strict=True)
+
+
+def test_crud_filters_have_an_explain_entry_each(app_ctx):
+    names = {name for name, *_ in app.app_queries()}
+    for tab, cols in app.CRUD_FILTERS.items():
+        keys = app.pk_cols(app.TABLES[tab][1])
+        for c in cols:
+            assert c == keys[0] or f"crud.{tab}.filter_{c}" in names
+
+
+def test_explain_check_covers_the_statements_the_app_runs(monkeypatch, fake_conn):
+    ran = []
+
+    def fake_query(sql, params=None):
+        ran.append(sql)
+        if "COUNT(*)" in sql:
+            return [{k: 0 for k in app.DASHBOARD_COUNTS}]
+        if "vol_ok" in sql:
+            return [{"vol_ok": 1, "res_ok": 1}]
+        if "Stocked_At" in sql:
+            return [{"CampID": 1, "CurrentQty": 0}]
+        return [{"VictimID": 5, "CampID": 1}] if "FROM Victim" in sql else []
+
+    monkeypatch.setattr(app, "query_dicts", fake_query)
+    app.DashboardSummary().stats()
+    app.DashboardSummary().recent_aid()
+    report = app.distribute_batch(1, 2, 3, "2024-01-01", victim_ids=[5, 6])   # stops at the shortfall
+    assert report.shortfalls and not report.applied
+
+    def shape(sql):                     # IN lists vary with the chunk size
+        return re.sub(r"IN \((?:%s, )*%s\)", "IN (...)", sql)
+
+    explained = {shape(sql) for _, sql, _, _ in app.app_queries()}
+    missing = [sql for sql in map(shape, ran) if sql not in explained]
+    assert ran and not missing, missing
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+
+import pytest
+
+import app
+from app import _iter_json_records, iter_import_records
+
+
+def records(text):
+    return list(_iter_json_records(io.StringIO(text)))
+
+
+def test_json_array():
+    assert records('[{"a": 1}, {"a": 2}]') == [(1, {"a": 1}), (2, {"a": 2})]
+
+
+def test_json_array_with_whitespace_and_empty():
+    assert records('  \n [\n {"a": 1} ,\n\n {"a": 2}\n ]\n') == [(1, {"a": 1}), (2, {"a": 2})]
+    assert records("[]") == []
+    assert records("") == []
+    assert records("   \n") == []
+
+
+def test_ndjson_numbers_lines_and_skips_blanks():
+    assert records('{"a": 1}\n\n{"a": 2}\n') == [(1, {"a": 1}), (3, {"a": 2})]
+
+
+def test_json_array_objects_split_across_read_chunks():
+    rows = [{"VictimID": i, "Name": "x" * 500} for i in range(400)]    # ~200 KB, several 64 KB reads
+    assert records(json.dumps(rows)) == list(enumerate(rows, 1))
+
+
+def test_truncated_array_raises():
+    with pytest.raises(json.JSONDecodeError):
+        records('[{"a": 1}, {"a": ')
+
+
+def test_bad_ndjson_line_is_yielded_and_reading_goes_on():
+    out = records('{"a": 1}\n{oops}\n{"a": 3}\n')
+    assert out[0] == (1, {"a": 1}) and out[2] == (3, {"a": 3})
+    assert out[1][0] == 2 and isinstance(out[1][1], json.JSONDecodeError)
+
+
+def test_iter_import_records_csv_and_bom():
+    data = "\ufeffVictimID,Name\n1,Asha\n2,Ravi\n".encode("utf-8")
+    assert list(iter_import_records(io.BytesIO(data), "csv")) == [
+        (2, {"VictimID": "1", "Name": "Asha"}), (3, {"VictimID": "2", "Name": "Ravi"})]
+
+
+def test_iter_import_records_json():
+    data = b'[{"VictimID": 1}]'
+    assert list(iter_import_records(io.BytesIO(data), "json")) == [(1, {"VictimID": 1})]
+
+
+# ── bulk_import with the DB insert stubbed out ───────────────────────────────
+@pytest.fixture
+def flushed(monkeypatch, app_ctx):
+    batches = []
+
+    def flush(table, cols, batch, report):
+        batches.append([line_no for line_no, _ in batch])
+        report.batches += 1
+        report.inserted += len(batch)
+
+    monkeypatch.setattr(app, "_flush_import_batch", flush)
+    return batches
+
+
+def test_bad_ndjson_line_is_a_row_error(flushed):
+    data = b'{"ResourceID": 1}\n{"ResourceID": 2\n{"ResourceID": 3}\n'
+    report = app.bulk_import("Resource", iter_import_records(io.BytesIO(data), "json"), batch_size=10)
+    assert (report.rows_read, report.inserted, report.failed) == (3, 2, 1)
+    assert report.errors[0][0] == 2 and report.errors[0][1].startswith("parse error")
+    assert flushed == [[1, 3]]
+
+
+def test_fatal_parse_error_keeps_the_pending_batch(flushed):
+    data = b'[{"ResourceID": 1}, {"ResourceID": 2}, {"ResourceID": '
+    report = app.bulk_import("Resource", iter_import_records(io.BytesIO(data), "json"), batch_size=10)
+    assert (report.rows_read, report.inserted, report.failed, report.batches) == (2, 2, 1, 1)
+    assert flushed == [[1, 2]]
+
+
+def test_csv_error_keeps_the_pending_batch(flushed):
+    data = b'ResourceID,ItemName\n1,Rice\n2,' + b"x" * 200 + b"\n3,Dal\n"
+    old_limit = csv.field_size_limit(100)
+    try:
+        report = app.bulk_import("Resource", iter_import_records(io.BytesIO(data), "csv"), batch_size=10)
+    finally:
+        csv.field_size_limit(old_limit)
+    assert report.inserted == 1 and report.failed == 1
+    assert flushed == [[2]]
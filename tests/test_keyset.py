@@ -0,0 +1,40 @@
+from app import KeysetPage, keyset_after
+
+
+def test_keyset_after_single_key():
+    sql, params = keyset_after(("VictimID",), [41])
+    assert sql == "((VictimID>%s))"
+    assert params == [41]
+
+
+def test_keyset_after_composite_key():
+    sql, params = keyset_after(("CampID", "ResourceID"), [3, 7])
+    assert sql == "((CampID>%s) OR (CampID=%s AND ResourceID>%s))"
+    assert params == [3, 3, 7]
+
+
+def test_keyset_after_three_keys_params_follow_placeholders():
+    sql, params = keyset_after(("a", "b", "c"), [1, 2, 3])
+    assert sql == "((a>%s) OR (a=%s AND b>%s) OR (a=%s AND b=%s AND c>%s))"
+    assert params == [1, 1, 2, 1, 2, 3]
+    assert sql.count("%s") == len(params)
+
+
+def test_page_sql_seeks_after_key_and_reads_one_extra_row():
+    page = KeysetPage("Victim", "VictimID", ["VictimID", "Name"], after=[10], size=25)
+    assert page.sql == "SELECT VictimID, Name FROM Victim WHERE ((VictimID>%s)) ORDER BY VictimID LIMIT 26"
+    assert page.params == [10]
+
+
+def test_page_ignores_partial_after_key():
+    page = KeysetPage("Stocked_At", ("CampID", "ResourceID"), ["CampID", "ResourceID"], after=[3])
+    assert "WHERE" not in page.sql
+
+
+def test_page_only_filters_on_filterable_columns():
+    page = KeysetPage("Victim", "VictimID", ["VictimID", "Name", "CampID"],
+                      filters={"CampID": "2", "Name": "ravi", "VictimID": ""},
+                      filterable=("VictimID", "CampID"))
+    assert page.filters == {"CampID": "2"}
+    assert page.sql.startswith("SELECT VictimID, Name, CampID FROM Victim WHERE CampID=%s ORDER BY")
+    assert page.params == ["2"]
@@ -0,0 +1,83 @@
+import pytest
+
+from app import list_migrations, split_sql_script
+
+
+def test_plain_statements_and_line_comments():
+    text = """
+-- header comment; with a semicolon
+CREATE TABLE T (
+  ID INT PRIMARY KEY   -- inline comment
+);
+
+INSERT INTO T VALUES (1);
+"""
+    assert split_sql_script(text) == [
+        "CREATE TABLE T (\n  ID INT PRIMARY KEY   -- inline comment\n)",
+        "INSERT INTO T VALUES (1)",
+    ]
+
+
+def test_delimiter_keeps_trigger_body_whole():
+    text = """
+DROP TRIGGER IF EXISTS trg;
+DELIMITER $$
+CREATE TRIGGER trg
+AFTER INSERT ON T
+FOR EACH ROW
+BEGIN
+  UPDATE U SET N = N + 1;
+  DELETE FROM V WHERE ID = NEW.ID;
+END$$
+DELIMITER ;
+SELECT 1;
+"""
+    out = split_sql_script(text)
+    assert len(out) == 3
+    assert out[0] == "DROP TRIGGER IF EXISTS trg"
+    assert out[1].startswith("CREATE TRIGGER trg") and out[1].endswith("END")
+    assert "UPDATE U SET N = N + 1;" in out[1] and "DELETE FROM V WHERE ID = NEW.ID;" in out[1]
+    assert out[2] == "SELECT 1"
+
+
+def test_other_delimiters_and_case():
+    text = "delimiter //\nCREATE PROCEDURE p() BEGIN SELECT 1; END//\ndelimiter ;\nSELECT 2;"
+    assert split_sql_script(text) == ["CREATE PROCEDURE p() BEGIN SELECT 1; END", "SELECT 2"]
+
+
+def test_block_comments_between_statements():
+    text = """
+/* one line; not a statement */
+SELECT 1;
+/* ===========
+   several lines;
+   ===========
+*/
+SELECT 2;
+"""
+    assert split_sql_script(text) == ["SELECT 1", "SELECT 2"]
+
+
+def test_unterminated_last_statement_is_kept():
+    assert split_sql_script("SELECT 1;\nSELECT 2") == ["SELECT 1", "SELECT 2"]
+
+
+def test_empty_statements_dropped():
+    assert split_sql_script(";\n\n-- only comments\n") == []
+
+
+@pytest.mark.parametrize("version,path", list_migrations())
+def test_shipped_migrations_split_cleanly(version, path):
+    with open(path, encoding="utf-8") as f:
+        stmts = split_sql_script(f.read())
+    assert stmts, version
+    for s in stmts:
+        assert not s.upper().startswith("DELIMITER"), version
+        assert not s.endswith("$$"), version
+        assert not s.startswith(("--", "/*")), version
+
+
+def test_migrations_listed_in_order():
+    versions = [v for v, _ in list_migrations()]
+    assert versions == sorted(versions)
+    assert versions[0].startswith("0000_")
@@ -0,0 +1,103 @@
+import app
+from app import ReportCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fresh(**kw):
+    return ReportCache(**{"size": 3, "ttl": 60, "max_rows": 10, **kw})
+
+
+def put(cache, key, rows, tables=("Victim",)):
+    cache.put(key, rows, tables, cache.generation(tables))
+
+
+def test_miss_then_hit():
+    cache = fresh()
+    assert cache.get(("nested", ("1",))) is None
+    put(cache, ("nested", ("1",)), [{"a": 1}])
+    assert cache.get(("nested", ("1",))) == [{"a": 1}]
+    assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = fresh()
+    for k in "abc":
+        put(cache, k, [k])
+    cache.get("a")                      # b is now the oldest
+    put(cache, "d", ["d"])
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in "acd"] == [["a"], ["c"], ["d"]]
+    assert cache.stats["evictions"] == 1
+    assert cache.snapshot()["entries"] == 3
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(app.time, "monotonic", clock)
+    cache = fresh()
+    put(cache, "k", [1])
+    clock.now += 59
+    assert cache.get("k") == [1]
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats["expirations"] == 1
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_write_evicts_only_entries_reading_that_table():
+    cache = fresh()
+    put(cache, "victims", [1], ("Victim", "AidDistribution"))
+    put(cache, "resources", [2], ("Resource",))
+    cache.note_write("AidDistribution", 1)
+    assert cache.get("victims") is None
+    assert cache.get("resources") == [2]
+    assert cache.stats["invalidations"] == 1
+    cache.note_write("AidDistribution", 1)   # nothing left to drop
+    assert cache.stats["invalidations"] == 1
+
+
+def test_write_during_query_is_not_cached():
+    cache = fresh()
+    gen = cache.generation({"Victim"})
+    cache.note_write("Victim", 0)           # lands while the query runs
+    cache.put("k", [1], {"Victim"}, gen)
+    assert cache.get("k") is None
+
+
+def test_large_results_are_not_cached():
+    cache = fresh(max_rows=2)
+    put(cache, "k", [1, 2, 3])
+    assert cache.get("k") is None
+    assert cache.stats["uncacheable"] == 1
+
+
+def test_put_replaces_existing_key():
+    cache = fresh()
+    put(cache, "k", [1], ("Victim",))
+    put(cache, "k", [2], ("Resource",))
+    cache.note_write("Victim")
+    assert cache.get("k") == [2]
+
+
+def test_cached_report_normalizes_params_and_follows_note_write(monkeypatch, app_ctx):
+    cache = fresh()
+    app.state().report_cache = cache
+    app.state().write_listeners = [cache.note_write]
+    calls = []
+    monkeypatch.setattr(app, "query_dicts", lambda sql, params=None: calls.append(params) or [{"n": len(calls)}])
+
+    form = {"nested_camp": "007", "nested_date": "2024-01-05"}
+    assert app.cached_report("nested", form.get) == [{"n": 1}]
+    form["nested_camp"] = " 7 "
+    assert app.cached_report("nested", form.get) == [{"n": 1}]      # same key after normalizing
+    assert len(calls) == 1
+
+    app.note_write("Victim", 1)
+    assert app.cached_report("nested", form.get) == [{"n": 2}]
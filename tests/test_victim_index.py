@@ -0,0 +1,260 @@
+import random
+from array import array
+from datetime import datetime
+
+import mysql.connector
+import pytest
+
+import app
+from app import VictimIndex, _VictimIndexData, _within_one_edit, search_words
+
+CAMPS = [{"CampID": 1, "Name": "Govt School Camp"}, {"CampID": 2, "Name": "Riverside Hall"}]
+VICTIMS = [
+    (1, "Asha Kumari", "Kallur", "Hosur", "Krishnagiri", 1),
+    (2, "Ravi Shankar", "Kallur", "Hosur", "Krishnagiri", 2),
+    (3, "Ravindra Rao", "Malur", "Kolar", "Kolar", 1),
+    (4, "Meena Devi", "Malur", "Kolar", "Kolar", 2),
+    (5, "Shankar Gowda", "Anekal", "Anekal", "Bengaluru", 1),
+]
+
+
+def ids(results):
+    return [r["VictimID"] for r in results]
+
+
+@pytest.fixture
+def data():
+    d = _VictimIndexData()
+    d.set_camps(CAMPS)
+    for v in VICTIMS:
+        d.add(*v, bulk=True)
+    d.finish()
+    return d
+
+
+def test_within_one_edit():
+    assert _within_one_edit("shankar", "shankar")
+    assert _within_one_edit("shankar", "shanker")       # substitution
+    assert _within_one_edit("shankar", "shnakar")       # adjacent swap
+    assert _within_one_edit("shankar", "shankr")        # missing letter
+    assert _within_one_edit("shankar", "shankarr")      # extra letter
+    assert not _within_one_edit("shankar", "shenkir")
+    assert not _within_one_edit("shankar", "shan")
+
+
+def test_search_words_casefolds_and_drops_numbers():
+    assert search_words("RAVI  shankar-12 Kallur_x") == ["ravi", "shankar", "kallur", "x"]
+
+
+def test_exact_beats_prefix(data):
+    res = data.search("ravi")
+    assert ids(res) == [2, 3]                   # ravi (exact, 3) before ravindra (prefix, 2)
+    assert [r["score"] for r in res] == [3, 2]
+    assert res[0]["Camp"] == "Riverside Hall"
+
+
+def test_prefix(data):
+    assert ids(data.search("meen")) == [4]
+    assert ids(data.search("krish")) == [1, 2]
+
+
+def test_typo(data):
+    assert ids(data.search("shnakar")) == [2, 5]
+    assert ids(data.search("kumary")) == [1]
+    assert data.search("kumxyz") == []
+
+
+def test_short_words_have_no_typo_match(data):
+    assert data.search("rvi") == []             # below FUZZY_MIN: exact / prefix only
+
+
+def test_every_term_must_match(data):
+    assert ids(data.search("shankar kolar")) == []
+    assert ids(data.search("shankar hosur")) == [2]
+    assert ids(data.search("kallur asha")) == [1]
+
+
+def test_numbers_match_victim_and_camp_ids(data):
+    assert ids(data.search("3")) == [3]         # VictimID first (score 4) ...
+    res = data.search("2")
+    assert res[0]["VictimID"] == 2 and res[0]["score"] == 4
+    assert set(ids(res)) == {2, 4}              # ... then victims in camp 2
+    assert ids(data.search("99")) == []
+    assert ids(data.search("malur 2")) == [4]
+
+
+def test_camp_name_words(data):
+    assert ids(data.search("riverside")) == [2, 4]
+    assert ids(data.search("school malur")) == [3]
+
+
+def test_limit(data):
+    assert len(data.search("1", limit=2)) == 2
+
+
+def test_postings_are_sorted_int_arrays(data):
+    assert isinstance(data.postings["kallur"], array)
+    assert list(data.postings["kallur"]) == [1, 2]
+    assert list(data.by_camp[1]) == [1, 3, 5]
+    assert data.words == sorted(data.words)
+
+
+def test_bulk_add_out_of_order_is_sorted_by_finish():
+    d = _VictimIndexData()
+    for v in reversed(VICTIMS):
+        d.add(*v, bulk=True)
+    d.finish()
+    assert list(d.postings["kallur"]) == [1, 2]
+    assert d.words == sorted(d.words)
+    assert ids(d.search("ravi")) == [2, 3]
+
+
+def test_add_patches_in_place(data):
+    data.add(6, "Ravi Teja", "Anekal", "Anekal", "Bengaluru", 2)
+    assert ids(data.search("ravi")) == [2, 6, 3]
+    assert ids(data.search("teja")) == [6]
+    assert ids(data.search("tejq")) == [6]      # new word is in the typo variants too
+    assert list(data.by_camp[2]) == [2, 4, 6]
+
+
+def test_add_existing_id_replaces_record(data):
+    data.add(4, "Meena Devi", "Kallur", "Hosur", "Krishnagiri", 1)
+    assert ids(data.search("malur")) == [3]
+    assert ids(data.search("kallur")) == [1, 2, 4]
+    assert list(data.by_camp[2]) == [2]
+
+
+def test_remove_drops_words_nobody_else_has(data):
+    data.remove(4)
+    assert data.search("meena") == []
+    assert data.search("meenq") == []
+    assert "meena" not in data.postings and "meena" not in data.words
+    assert not any("meena" in ws for ws in data.variants.values())
+    assert ids(data.search("malur")) == [3]
+    data.remove(4)                              # unknown id: no-op
+
+
+def test_matches_brute_force_on_random_data():
+    rnd = random.Random(7)
+    names = ["asha", "ravi", "ravindra", "meena", "shankar", "lakshmi", "gowda", "devi", "kumar", "rao"]
+    places = ["kallur", "malur", "anekal", "hosur", "kolar"]
+    d, rows = _VictimIndexData(), {}
+    for vid in range(1, 400):
+        rec = (f"{rnd.choice(names)} {rnd.choice(names)}", rnd.choice(places), rnd.choice(places),
+               rnd.choice(places), rnd.randint(1, 5))
+        rows[vid] = rec
+        d.add(vid, *rec, bulk=True)
+    d.finish()
+    for vid in rnd.sample(sorted(rows), 60):    # patch some, drop some
+        if vid % 2:
+            d.remove(vid)
+            del rows[vid]
+        else:
+            rows[vid] = (f"{rnd.choice(names)} {rnd.choice(names)}",) + rows[vid][1:]
+            d.add(vid, *rows[vid])
+    def matches(term, rec):
+        return any(w.startswith(term) or (len(term) >= app.FUZZY_MIN and _within_one_edit(term, w))
+                   for w in search_words(" ".join(rec[:4])))
+
+    for word in ["ravi", "kolar", "lakshmi", "gowd", "kumra"]:
+        want = sorted(v for v, r in rows.items() if matches(word, r))
+        got = d.search(word, limit=1000, scan=10_000)
+        assert sorted(ids(got)) == want
+
+
+# ── VictimIndex over a fake database ─────────────────────────────────────────
+class FakeDB:
+    def __init__(self):
+        self.victims = {v[0]: dict(zip(("VictimID", "Name", "Village", "Taluk", "District", "CampID"), v))
+                        for v in VICTIMS}
+        self.changes = []
+        self.missing_log = False
+
+    def query_dicts(self, sql, params=None):
+        if "NOW(6)" in sql:
+            return [{"now": datetime(2024, 1, 1)}]
+        if "FROM ReliefCamp" in sql:
+            return CAMPS
+        if "FROM VictimChanges" in sql:
+            if self.missing_log:
+                raise mysql.connector.Error(errno=1146, msg="Table 'VictimChanges' doesn't exist")
+            return [{"VictimID": v} for v in dict.fromkeys(self.changes)][:params[1]]
+        if "FROM Victim" in sql:
+            return [self.victims[v] for v in params if v in self.victims]
+        raise AssertionError(sql)
+
+    def iter_dicts(self, sql, params=None, batch=None):
+        yield from (self.victims[v] for v in sorted(self.victims))
+
+
+@pytest.fixture
+def fake_db(monkeypatch, flask_app):
+    db = FakeDB()
+    db.app = flask_app
+    monkeypatch.setattr(app, "query_dicts", db.query_dicts)
+    monkeypatch.setattr(app, "iter_dicts", db.iter_dicts)
+    return db
+
+
+def built_index(db, poll=0, **kw):
+    index = VictimIndex(db.app, poll=poll, **kw)
+    index.build_now({"user": "viewer"})
+    return index
+
+
+def test_build_and_search(fake_db):
+    index = built_index(fake_db)
+    assert index.ready
+    assert ids(index.search("ravi")) == [2, 3]
+
+
+def test_not_ready_returns_none():
+    assert VictimIndex(None).search("ravi") is None
+
+
+def test_catch_up_applies_logged_changes(fake_db):
+    index = built_index(fake_db)
+    fake_db.victims[6] = {"VictimID": 6, "Name": "Ravi Teja", "Village": "Anekal", "Taluk": "Anekal",
+                          "District": "Bengaluru", "CampID": 2}
+    fake_db.victims[1]["Name"] = "Asha Kaur"
+    del fake_db.victims[3]
+    fake_db.changes += [6, 1, 3, 6]
+    index.ensure({"user": "viewer"})
+    assert ids(index.search("ravi")) == [2, 6]
+    assert ids(index.search("kaur")) == [1]
+    assert index.search("kumari") == []
+
+
+def test_catch_up_waits_for_poll_interval(fake_db):
+    index = built_index(fake_db, poll=3600)
+    fake_db.victims[4]["Name"] = "Meena Kumari"
+    fake_db.changes.append(4)
+    index.ensure({"user": "viewer"})
+    assert ids(index.search("kumari")) == [1]
+
+
+def test_too_many_changes_schedules_rebuild(fake_db):
+    index = built_index(fake_db, catchup_max=2)
+    fake_db.changes += [1, 2, 3]
+    index._catch_up()
+    assert index._expired()
+    assert ids(index.search("ravi")) == [2, 3]          # old index keeps serving until the rebuild
+
+
+def test_missing_change_log_falls_back_to_ttl(fake_db):
+    index = built_index(fake_db)
+    fake_db.missing_log = True
+    index.ensure({"user": "viewer"})
+    assert index._change_log is False
+    assert not index._polling
+    assert ids(index.search("ravi")) == [2, 3]
+
+
+def test_write_path_patches(fake_db):
+    index = built_index(fake_db, poll=3600)
+    index.upsert({"VictimID": "7", "Name": "Lakshmi", "Village": "Malur", "Taluk": "Kolar",
+                  "District": "Kolar", "CampID": ""})
+    index.remove("2")
+    index.upsert({"VictimID": "bad"})
+    assert ids(index.search("lakshmi")) == [7]
+    assert ids(index.search("ravi")) == [3]
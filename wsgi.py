@@ -0,0 +1,21 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app             # Linux: worker processes × threads
+    waitress-serve --threads 72 wsgi:app              # Windows: one process, DB_POOL_SIZE + FEED_MAX_CLIENTS threads
+
+create_app() reads the configuration from the environment, so set it before
+the server starts (see README → Production serving). Nothing connects to MySQL
+here; every worker opens its own pools on first use.
+"""
+import logging
+
+from app import create_app, preload_victim_index
+
+app = create_app()
+
+if app.config["SECRET_KEY"] == "dev-secret":
+    logging.getLogger("relief").warning("FLASK_SECRET is not set; sessions are signed with the dev key")
+
+if app.config["VICTIM_INDEX_PRELOAD"]:  # gunicorn.conf.py turns on preload_app for this
+    preload_victim_index(app)